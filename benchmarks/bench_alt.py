@@ -0,0 +1,60 @@
+"""
+benchmark of A* with landmark (ALT) heuristic against plain A*
+
+runs random queries on maze and open maps with four and eight
+directions and prints expanded nodes and time of both, time of
+building landmark tables and of memory mapping them from disk
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from landmarks import *
+from bench_jps import open_walls, maze_walls
+
+SIZES = [(101, 101), (301, 301)]
+QUERIES = 50
+LANDMARKS = 8
+SEED = 0
+
+
+def main():
+    print(f"{'map':>14} {'dirs':>4} {'mode':>6} {'expanded':>9} {'seconds':>9} {'tables':>9}")
+    for cols, rows in SIZES:
+        for kind, make_walls in [("open", open_walls), ("maze", maze_walls)]:
+            rng = random.Random(SEED)
+            walls = make_walls(cols, rows, rng)
+            blocked = set(walls)
+            free = [(x, y) for y in range(rows) for x in range(cols) if (x, y) not in blocked]
+            pairs = [(rng.choice(free), rng.choice(free)) for _ in range(QUERIES)]
+            data = {"start": pairs[0][0], "end": pairs[0][1], "walls": walls}
+            for moore in [False, True]:
+                alg = Astar(cols, rows)
+                alg.load_data(data)
+                alg.set_directions(moore)
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, "map")
+                    begin = time.perf_counter()
+                    landmarks_for(alg, path, LANDMARKS)
+                    built = time.perf_counter() - begin
+                    begin = time.perf_counter()
+                    landmarks = landmarks_for(alg, path, LANDMARKS)
+                    loaded = time.perf_counter() - begin
+                    costs = {}
+                    for mode, tables, note in [("plain", None, ""), ("alt", landmarks, f"{built:.3f}/{loaded:.4f}")]:
+                        alg.set_landmarks(tables)
+                        begin = time.perf_counter()
+                        results = list(alg.solve_pairs(pairs))
+                        elapsed = time.perf_counter() - begin
+                        costs[mode] = [r.cost for r in results]
+                        expanded = sum(r.expanded for r in results)
+                        print(f"{kind} {cols}x{rows:<6} {8 if moore else 4:>4} {mode:>6} "
+                              f"{expanded:>9} {elapsed:>9.4f} {note:>9}")
+                    assert costs["plain"] == costs["alt"]
+                    alg.set_landmarks(None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+benchmark of solve_batch with growing numbers of worker processes
+
+solves random queries with A* on an open map and prints queries per
+second and speedup over one process for 1, 2, 4, ... processes up to
+the number of cores, map is shared with workers through SharedMap
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from batch import solve_batch
+from bench_jps import open_walls
+
+SIZE = (1000, 1000)
+QUERIES = 2000
+SEED = 0
+
+
+def main():
+    cols, rows = SIZE
+    rng = random.Random(SEED)
+    walls = open_walls(cols, rows, rng)
+    blocked = set(walls)
+    free = [(x, y) for y in range(rows) for x in range(cols) if (x, y) not in blocked]
+    pairs = []
+    while len(pairs) < QUERIES:
+        (sx, sy), (ex, ey) = rng.choice(free), rng.choice(free)
+        if abs(sx - ex) + abs(sy - ey) < 100:
+            pairs.append(((sx, sy), (ex, ey)))
+    alg = Astar(cols, rows)
+    alg.load_data({"start": pairs[0][0], "end": pairs[0][1], "walls": walls})
+    print(f"{cols}x{rows} map, {QUERIES} queries, {os.cpu_count()} cores")
+    print(f"{'processes':>9} {'seconds':>9} {'queries/s':>10} {'speedup':>8}")
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    single = None
+    for processes in counts:
+        begin = time.perf_counter()
+        list(solve_batch(alg, pairs, processes, chunksize=64))
+        seconds = time.perf_counter() - begin
+        single = single or seconds
+        print(f"{processes:>9} {seconds:>9.3f} {QUERIES / seconds:>10.0f} {single / seconds:>8.2f}")
+
+if __name__ == "__main__":
+    main()
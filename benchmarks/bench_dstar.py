@@ -0,0 +1,53 @@
+"""
+benchmark of incremental replanning with D* Lite against A* from scratch
+
+on seeded random maps toggles a few random walls between queries
+(start and end stay fixed) and compares total expanded nodes and time
+of repairing the D* Lite search with running A* again
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from dstar import Dstar
+
+SIZES = [(50, 50), (100, 100), (200, 200)]
+DENSITY = 0.25
+QUERIES = 50
+TOGGLES = 3
+SEED = 0
+
+
+def main():
+    print(f"{'size':>8} {'algorithm':>9} {'expanded':>10} {'seconds':>9} {'same cost':>9}")
+    for cols, rows in SIZES:
+        rng = random.Random(SEED)
+        start, end = (0, 0), (cols - 1, rows - 1)
+        walls = [(x, y) for y in range(rows) for x in range(cols)
+                 if rng.random() < DENSITY and (x, y) not in (start, end)]
+        data = {"start": start, "end": end, "walls": walls}
+        toggles = [[(rng.randrange(cols), rng.randrange(rows)) for _ in range(TOGGLES)] for _ in range(QUERIES)]
+        costs = {}
+        for alg_class in [Astar, Dstar]:
+            alg = alg_class(cols, rows)
+            alg.load_data(data)
+            alg.solve()
+            expanded = 0
+            costs[alg_class] = []
+            elapsed = 0
+            for cells in toggles:
+                for x, y in cells:
+                    if (x, y) not in (start, end):
+                        alg.update_cell(x, y, "empty" if alg.cell(x, y) == "wall" else "wall")
+                begin = time.perf_counter()
+                res = alg.solve()
+                elapsed += time.perf_counter() - begin
+                expanded += res.expanded
+                costs[alg_class].append(len(res.path))
+            same = costs[alg_class] == costs[Astar]
+            print(f"{cols}x{rows:<4} {alg_class.__name__:>9} {expanded:>10} {elapsed:>9.4f} {str(same):>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+benchmark of Greedy best first search
+
+prints how many node expansions per second greedy search performs
+on seeded random maps of growing size, once when the end is reachable
+and once when the end is walled off, so the whole reachable area
+(and the largest open heap) has to be processed
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from greedy import Greedy
+
+SIZES = [(20, 15), (50, 50), (100, 100), (200, 200), (400, 400)]
+DENSITY = 0.25
+SEED = 0
+
+
+def make_data(cols, rows, enclose_end):
+    rng = random.Random(SEED)
+    start = (0, 0)
+    end = (cols - 1, rows - 1)
+    walls = set()
+    for y in range(rows):
+        for x in range(cols):
+            if rng.random() < DENSITY:
+                walls.add((x, y))
+    walls.discard(start)
+    walls.discard(end)
+    if enclose_end:
+        walls.update([(cols - 2, rows - 1), (cols - 1, rows - 2), (cols - 2, rows - 2)])
+    return {"start": start, "end": end, "walls": sorted(walls)}
+
+def run(cols, rows, enclose_end):
+    alg = Greedy(cols, rows)
+    alg.load_data(make_data(cols, rows, enclose_end))
+    alg.reset()
+    expansions = 0
+    begin = time.perf_counter()
+    while alg.next_step() not in [True, False]:
+        expansions += 1
+    elapsed = time.perf_counter() - begin
+    return expansions, elapsed
+
+def main():
+    print(f"{'size':>10} {'case':>10} {'expansions':>12} {'seconds':>10} {'exp/s':>12}")
+    for cols, rows in SIZES:
+        for enclose_end, case in [(False, "route"), (True, "exhaust")]:
+            expansions, elapsed = run(cols, rows, enclose_end)
+            rate = expansions / elapsed if elapsed > 0 else float("inf")
+            print(f"{cols}x{rows:<6} {case:>10} {expansions:>12} {elapsed:>10.4f} {rate:>12.0f}")
+
+if __name__ == "__main__":
+    main()
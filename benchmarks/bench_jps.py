@@ -0,0 +1,63 @@
+"""
+benchmark of Jump Point Search against A*
+
+runs both algorithms headless (solve) corner to corner on open maps
+(few random walls) and on maze maps, with four and eight directions,
+and prints expanded nodes, path cost and time
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from jps import Jps
+
+SIZES = [(101, 101), (301, 301)]
+SEED = 0
+
+
+def open_walls(cols, rows, rng, density=0.05):
+    return [(x, y) for y in range(rows) for x in range(cols) if rng.random() < density]
+
+def maze_walls(cols, rows, rng):
+    """walls of a maze carved by randomized depth first search on odd cells"""
+    free = set()
+    stack = [(1, 1)]
+    free.add((1, 1))
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, dx, dy) for dx, dy in [(2, 0), (-2, 0), (0, 2), (0, -2)]
+                   if 0 < x + dx < cols - 1 and 0 < y + dy < rows - 1 and (x + dx, y + dy) not in free]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, dx, dy = rng.choice(options)
+        free.add((x + dx // 2, y + dy // 2))
+        free.add((nx, ny))
+        stack.append((nx, ny))
+    return [(x, y) for y in range(rows) for x in range(cols) if (x, y) not in free]
+
+def run(alg_class, cols, rows, data, moore):
+    alg = alg_class(cols, rows)
+    alg.load_data(data)
+    alg.set_directions(moore)
+    begin = time.perf_counter()
+    res = alg.solve()
+    return res, time.perf_counter() - begin
+
+def main():
+    print(f"{'map':>14} {'dirs':>4} {'algorithm':>9} {'expanded':>9} {'moves':>6} {'seconds':>9}")
+    for cols, rows in SIZES:
+        for kind, make_walls in [("open", open_walls), ("maze", maze_walls)]:
+            start, end = (1, 1), (cols - 2, rows - 2)
+            walls = [w for w in make_walls(cols, rows, random.Random(SEED)) if w not in (start, end)]
+            data = {"start": start, "end": end, "walls": walls}
+            for moore in [False, True]:
+                for alg_class in [Astar, Jps]:
+                    res, elapsed = run(alg_class, cols, rows, data, moore)
+                    print(f"{kind} {cols}x{rows:<6} {8 if moore else 4:>4} {alg_class.__name__:>9} "
+                          f"{res.expanded:>9} {len(res.path) - 1:>6} {elapsed:>9.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+load test of the path query service
+
+    python benchmarks/load_service.py
+    python benchmarks/load_service.py --executor process --concurrency 64 --repeat 0.5
+    python benchmarks/load_service.py --port 8765 --map maze --size 512x512
+
+without --port or --unix a service is started in this process on
+a seeded open map and the client connects to it over TCP, every
+client connection keeps one request in flight, --repeat is the share
+of queries picked from a small set of hot pairs, so cache hits and
+coalescing show up, latencies are measured from sending a request
+to reading its response and printed as p50 and p99 with throughput
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from grid import Grid, WALL
+from service import PathService
+from bench_jps import open_walls
+
+SEED = 0
+# number of hot pairs drawn by --repeat
+HOT = 32
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+def make_pairs(cols, rows, walls, count, repeat, rng):
+    blocked = set(walls)
+    def cell():
+        while True:
+            node = (rng.randrange(cols), rng.randrange(rows))
+            if node not in blocked:
+                return node
+    hot = [(cell(), cell()) for _ in range(HOT)]
+    return [rng.choice(hot) if rng.random() < repeat else (cell(), cell()) for _ in range(count)]
+
+async def client(connect, requests, latencies):
+    reader, writer = await connect()
+    try:
+        for message in requests:
+            begin = time.perf_counter()
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - begin)
+            if "error" in response:
+                raise RuntimeError(response["error"])
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+async def load(args, connect, pairs):
+    requests = [{"id": i, "map": args.map, "start": s, "end": e, "algorithm": args.algorithm, "moore": args.moore}
+                for i, (s, e) in enumerate(pairs)]
+    latencies = []
+    begin = time.perf_counter()
+    await asyncio.gather(*(client(connect, requests[i::args.concurrency], latencies)
+                           for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - begin
+    print(f"{len(latencies)} queries, {args.concurrency} connections, {elapsed:.3f} s, "
+          f"{len(latencies) / elapsed:.0f} queries/s")
+    print(f"p50 {percentile(latencies, 50) * 1000:.3f} ms, p99 {percentile(latencies, 99) * 1000:.3f} ms, "
+          f"max {max(latencies) * 1000:.3f} ms")
+
+async def run(args):
+    cols, rows = map(int, args.size.split("x"))
+    rng = random.Random(SEED)
+    if args.port is None and args.unix is None:
+        walls = open_walls(cols, rows, rng)
+        pairs = make_pairs(cols, rows, walls, args.queries, args.repeat, rng)
+        grid = Grid(cols, rows)
+        for x, y in walls:
+            grid.set_code(x, y, WALL)
+        with PathService(args.executor, args.workers) as service:
+            service.add_map(args.map, grid)
+            server = await service.serve("127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                await load(args, lambda: asyncio.open_connection("127.0.0.1", port), pairs)
+            print(service.stats)
+        return
+    # walls of a remote map are unknown, so some pairs can be on walls
+    pairs = make_pairs(cols, rows, [], args.queries, args.repeat, rng)
+    if args.unix is not None:
+        await load(args, lambda: asyncio.open_unix_connection(args.unix), pairs)
+    else:
+        await load(args, lambda: asyncio.open_connection(args.host, args.port), pairs)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="load test of the path query service")
+    parser.add_argument("--host", default="127.0.0.1", help="address of a running service")
+    parser.add_argument("--port", type=int, help="port of a running service")
+    parser.add_argument("--unix", help="Unix socket of a running service")
+    parser.add_argument("--map", default="open", help="id of the map queried")
+    parser.add_argument("--size", default="500x500", help="size of the map, as COLSxROWS")
+    parser.add_argument("--algorithm", default="astar", help="algorithm of the queries")
+    parser.add_argument("--moore", action="store_true", help="search in eight directions")
+    parser.add_argument("--queries", type=int, default=2000, help="number of queries")
+    parser.add_argument("--concurrency", type=int, default=16, help="number of client connections")
+    parser.add_argument("--repeat", type=float, default=0.2, help="share of queries from hot pairs")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="executor of the service started here")
+    parser.add_argument("--workers", type=int, help="workers of the service started here")
+    asyncio.run(run(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
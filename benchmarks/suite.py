@@ -0,0 +1,214 @@
+"""
+benchmark suite of pathfinding algorithms
+
+generates seeded random, open and maze maps of every size, runs
+every algorithm of the registry with four and eight directions
+and records:
+
+    seconds, expanded, pushed     headless solve
+    steps_per_second              next_step loop as driven by the GUI,
+                                  capped at --max-steps steps
+    peak_bytes                    peak memory allocated during solve
+                                  (tracemalloc, separate run which is
+                                  about 20 times slower, skipped on maps
+                                  larger than --memory-cells)
+    cost, moves, optimal          optimal is True when cost matches
+                                  Dijkstra for weighted algorithms
+                                  and Bfs for the others
+
+results are written as JSON, with --baseline results of an earlier
+run are compared and runs which got slower (by more than SLOWER times
+and NOISE seconds) or changed expansions or cost are printed and
+the exit status is 1
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --sizes 200x150 --algorithms bfs,astar --output small.json
+    python benchmarks/suite.py --output new.json --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from grid import *
+from registry import ALGORITHMS
+
+SIZES = [(20, 15), (200, 150), (1000, 750), (2000, 1500)]
+KINDS = ["random", "open", "maze"]
+SLOWER = 1.2
+NOISE = 0.005
+
+
+def random_cells(cols, rows, rng, density=0.3):
+    """return cells with every cell a wall with probability density"""
+    return bytearray(WALL if rng.random() < density else EMPTY for _ in range(cols * rows))
+
+def open_cells(cols, rows, rng):
+    return random_cells(cols, rows, rng, 0.05)
+
+def maze_cells(cols, rows, rng):
+    """return cells of a maze carved by randomized depth first search on odd cells"""
+    cells = bytearray([WALL]) * (cols * rows)
+    cells[cols + 1] = EMPTY
+    stack = [cols + 1]
+    steps = [(2, 0), (-2, 0), (0, 2), (0, -2)]
+    while stack:
+        u = stack[-1]
+        y, x = divmod(u, cols)
+        options = [(x + dx, y + dy) for dx, dy in steps
+                   if 0 < x + dx < cols - 1 and 0 < y + dy < rows - 1 and cells[(y + dy) * cols + x + dx] == WALL]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        cells[(y + ny) // 2 * cols + (x + nx) // 2] = EMPTY
+        cells[ny * cols + nx] = EMPTY
+        stack.append(ny * cols + nx)
+    return cells
+
+GENERATORS = {"random": random_cells, "open": open_cells, "maze": maze_cells}
+
+def make_map(kind, cols, rows, seed):
+    """return cells, start and end of seeded map, start and end are never walls"""
+    cells = GENERATORS[kind](cols, rows, random.Random(f"{kind}-{cols}x{rows}-{seed}"))
+    start, end = (1, 1), (cols - 2 - (cols % 2 == 0), rows - 2 - (rows % 2 == 0))
+    for x, y in [start, end]:
+        cells[y * cols + x] = EMPTY
+    return cells, start, end
+
+def prepare(alg_class, cols, rows, cells, start, end, moore):
+    alg = alg_class(cols, rows)
+    alg.grid.assign(cells)
+    alg.set_start(start)
+    alg.set_end(end)
+    alg.set_directions(moore)
+    return alg
+
+def count_steps(alg, max_steps):
+    """return number of next_step calls until search ends or max_steps and their time"""
+    alg.reset()
+    steps = 0
+    begin = time.perf_counter()
+    while steps < max_steps:
+        res = alg.next_step()
+        if res is True or res is False:
+            break
+        steps += 1
+    elapsed = time.perf_counter() - begin
+    alg.reset_grid()
+    return steps, elapsed
+
+def peak_memory(alg):
+    tracemalloc.start()
+    alg.solve()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def run(names, sizes, kinds, seed, max_steps, memory_cells):
+    results = []
+    for cols, rows in sizes:
+        for kind in kinds:
+            cells, start, end = make_map(kind, cols, rows, seed)
+            for moore in [False, True]:
+                references = {}
+                for name in names:
+                    alg = prepare(ALGORITHMS[name], cols, rows, cells, start, end, moore)
+                    alg.get_scratch()
+                    alg.grid.get_adjacency()
+                    begin = time.perf_counter()
+                    res = alg.solve()
+                    seconds = time.perf_counter() - begin
+                    reference = "dijkstra" if ALGORITHMS[name].weighted else "bfs"
+                    if reference not in references:
+                        references[reference] = prepare(ALGORITHMS[reference], cols, rows, cells, start, end, moore).solve().cost
+                    steps, step_seconds = count_steps(alg, max_steps)
+                    record = {
+                        "map": kind, "cols": cols, "rows": rows, "moore": moore, "seed": seed,
+                        "algorithm": name, "found": res.found, "cost": res.cost,
+                        "moves": len(res.path) - 1 if res.found else None,
+                        "optimal": res.cost == references[reference],
+                        "expanded": res.expanded, "pushed": res.pushed, "seconds": seconds,
+                        "expanded_per_second": res.expanded / seconds if seconds else None,
+                        "steps": steps, "steps_per_second": steps / step_seconds if step_seconds else None,
+                        "peak_bytes": peak_memory(alg) if cols * rows <= memory_cells else None,
+                    }
+                    results.append(record)
+                    print(f"{kind:>6} {cols}x{rows:<6} {8 if moore else 4:>2} {name:>22} {res.expanded:>9} "
+                          f"{seconds:>9.4f} {record['steps_per_second'] or 0:>11.0f} "
+                          f"{(record['peak_bytes'] or 0) / 2 ** 20:>8.2f} {str(record['optimal']):>7}")
+    return results
+
+def key(record):
+    return record["map"], record["cols"], record["rows"], record["moore"], record["seed"], record["algorithm"]
+
+def compare(results, baseline):
+    """return descriptions of runs which got slower or changed expansions or cost"""
+    old = {key(r): r for r in baseline}
+    problems = []
+    for record in results:
+        before = old.get(key(record))
+        if before is None:
+            continue
+        name = "{} {}x{} {} {} seed {}".format(record["map"], record["cols"], record["rows"],
+                                                 8 if record["moore"] else 4, record["algorithm"], record["seed"])
+        if record["seconds"] > before["seconds"] * SLOWER + NOISE:
+            problems.append(f"{name}: {before['seconds']:.4f} s -> {record['seconds']:.4f} s")
+        for field in ["expanded", "cost"]:
+            if record[field] != before[field]:
+                problems.append(f"{name}: {field} {before[field]} -> {record[field]}")
+    return problems
+
+def revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark pathfinding algorithms")
+    parser.add_argument("--algorithms", default=",".join(ALGORITHMS),
+                        help="comma separated names from: " + ", ".join(ALGORITHMS))
+    parser.add_argument("--sizes", default=",".join(f"{c}x{r}" for c, r in SIZES),
+                        help="comma separated COLSxROWS sizes")
+    parser.add_argument("--maps", default=",".join(KINDS), help="comma separated kinds of maps")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=100000, help="cap on next_step calls per run")
+    parser.add_argument("--memory-cells", type=int, default=10 ** 6,
+                        help="measure peak memory only on maps with at most this many cells")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with results of an earlier run")
+    args = parser.parse_args(argv)
+    names = args.algorithms.split(",")
+    sizes = [tuple(int(n) for n in size.split("x")) for size in args.sizes.split(",")]
+    kinds = args.maps.split(",")
+    for name in names:
+        if name not in ALGORITHMS:
+            parser.error(f"unknown algorithm {name}")
+    for kind in kinds:
+        if kind not in GENERATORS:
+            parser.error(f"unknown map kind {kind}")
+    print(f"{'map':>6} {'size':<11} {'d':>2} {'alg':>22} {'expanded':>9} {'seconds':>9} {'steps/s':>11} "
+          f"{'peak MiB':>8} {'optimal':>7}")
+    results = run(names, sizes, kinds, args.seed, args.max_steps, args.memory_cells)
+    if args.output:
+        meta = {"revision": revision(), "python": platform.python_version(),
+                "platform": platform.platform(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f)["results"])
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
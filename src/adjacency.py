@@ -0,0 +1,123 @@
+"""
+per cell neighbour bitmasks of a grid
+
+bit k of the mask of a cell is set when its neighbour in direction
+DIRECTIONS[k] is inside the grid and is not a wall, tables indexed
+by mask give index offsets of those neighbours, so walking neighbours
+of a cell needs neither bounds checks nor wall lookups
+"""
+
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0), (-1, -1), (1, 1), (1, -1), (-1, 1))
+# bit of every direction, opposite direction of bit k is bit k ^ 1
+BIT = {d: 1 << k for k, d in enumerate(DIRECTIONS)}
+
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
+
+# translation tables which turn byte 1 into bit k and everything else into 0
+_BITS = [bytes(1 << k if value == 1 else 0 for value in range(256)) for k in range(8)]
+
+
+class Adjacency:
+    """
+    A class representing neighbour bitmasks of all cells of a grid
+
+    directions four use the first four bits, eight all of them,
+    masks are built once for the map and patched when a wall
+    is placed or removed
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    masks : bytearray
+        neighbour bitmask of every cell, cell x, y is at index y * cols + x
+    offsets : tuple
+        for four and eight directions, tuple of index offsets of
+        free neighbours for every mask
+    moves : tuple
+        like offsets, but with (offset, STRAIGHT_COST or DIAGONAL_COST) pairs
+
+    Methods
+    -------
+    build(free : bytes) -> None
+        compute masks of all cells
+    patch(index : int, free : bool) -> None
+        update masks of neighbours of cell whose wall changed
+    frozen( ) -> Adjacency
+        return copy with immutable masks sharing the tables
+    """
+    def __init__(self, cols, rows, free, masks=None):
+        """
+        Parameters
+        ----------
+        cols : int
+            numbers of column in the grid
+        rows : int
+            number of rows in the grid
+        free : bytes
+            1 for every cell which is not a wall, 0 for walls
+        masks : bytes-like, optional
+            masks built before (for example in shared memory),
+            used as they are instead of building them from free
+        """
+        self.cols = cols
+        self.rows = rows
+        offsets = [b * cols + a for a, b in DIRECTIONS]
+        steps = [DIAGONAL_COST if a and b else STRAIGHT_COST for a, b in DIRECTIONS]
+        self.offsets = tuple(
+            tuple(tuple(offsets[k] for k in range(n) if mask >> k & 1) for mask in range(256))
+            for n in (4, 8))
+        self.moves = tuple(
+            tuple(tuple((offsets[k], steps[k]) for k in range(n) if mask >> k & 1) for mask in range(256))
+            for n in (4, 8))
+        if masks is None:
+            self.build(free)
+        else:
+            self.masks = masks
+    def build(self, free):
+        """
+        compute masks of all cells from free cells
+
+        every direction is a shifted copy of free with cells whose
+        neighbour is in another row masked out, all of them are
+        combined as big integers instead of looping over cells
+        """
+        cols, rows = self.cols, self.rows
+        size = cols * rows
+        zeros = bytes(size)
+        combined = 0
+        for k, (a, b) in enumerate(DIRECTIONS):
+            d = b * cols + a
+            if d >= 0:
+                shifted = (free[d:] + zeros)[:size]
+            else:
+                shifted = (zeros + free)[size + d:2 * size + d]
+            inside = bytes(255 if 0 <= x + a < cols else 0 for x in range(cols)) * rows
+            combined |= (int.from_bytes(shifted.translate(_BITS[k]), "little") &
+                         int.from_bytes(inside, "little"))
+        self.masks = bytearray(combined.to_bytes(size, "little"))
+    def patch(self, index, free):
+        """
+        update masks of neighbours of cell at index which
+        became free (free is True) or a wall
+        """
+        cols = self.cols
+        masks = self.masks
+        y, x = divmod(index, cols)
+        for k, (a, b) in enumerate(DIRECTIONS):
+            nx, ny = x + a, y + b
+            if 0 <= nx < cols and 0 <= ny < self.rows:
+                v = ny * cols + nx
+                if free:
+                    masks[v] |= 1 << (k ^ 1)
+                else:
+                    masks[v] &= ~(1 << (k ^ 1)) & 255
+    def frozen(self):
+        copy = object.__new__(Adjacency)
+        copy.cols, copy.rows = self.cols, self.rows
+        copy.offsets, copy.moves = self.offsets, self.moves
+        copy.masks = bytes(self.masks)
+        return copy
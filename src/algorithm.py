@@ -1,9 +1,33 @@
 from abc import ABC, abstractmethod
-from collections import deque, defaultdict as dd
+from collections import deque, namedtuple, defaultdict as dd
 from colors import *
+from grid import *
+from adjacency import *
+from scratch import *
+from distance import *
+from stats import *
+from events import *
 import heapq as hq
 import math
 
+SearchResult = namedtuple("SearchResult", ["found", "path", "cost", "expanded", "pushed"])
+SearchResult.__doc__ = """
+Result of a search run to completion by Algorithm.solve
+
+Attributes
+----------
+found : bool
+    True if end was reached
+path : list of (int, int)
+    nodes from start to end (both included), empty if end was not found
+cost : int
+    cost of the path, None if end was not found
+expanded : int
+    number of expanded nodes
+pushed : int
+    number of nodes put on the frontier
+"""
+
 
 class Algorithm(ABC):
     """
@@ -17,15 +41,33 @@ class Algorithm(ABC):
         numbers of column in the grid
     rows : int
         number of rows in the grid
-    grid : list of lost of str
-        two dimentional grid for algorithm, could be
-        "empty", "wall", "visited", "start", "end"
+    grid : Grid
+        grid for algorithm stored as flat array of cell codes,
+        grid[y][x] reads and writes cell names, could be
+        "empty", "wall", "visited", "path", "start", "end"
     end: tuple(int, int)
         position of the end node
     start: tuple(int, int)
         position of the start node
     parents:
         dictionary of parents of visited nodes
+    scratch : Scratch
+        buffers reused by solve, allocated on first use
+    step_state : Scratch
+        buffers of the search driven by next_step, reset starts
+        a new generation of them instead of reallocating
+    map : GridMap
+        immutable snapshot of walls, costs and neighbour masks read by search,
+        taken again after the grid version changes
+    fields : dict
+        cached distance fields by (grid version, directions, source)
+    landmarks : Landmarks
+        landmark tables used by heuristics of A* and greedy search, None if not set
+    stats : SearchStats
+        counters and phase timings collected since enable_stats, None if not enabled
+    weighted : bool
+        True if paths cost STRAIGHT_COST or DIAGONAL_COST times terrain cost
+        of the entered cell for every move, False if they cost number of moves
     
     Methods
     -------
@@ -40,19 +82,61 @@ class Algorithm(ABC):
     reset( ) -> None
         resets all internal data for algorithm, resets grid,
         don't reset walls, start and end position
+    solve(trace=None) -> SearchResult
+        run whole search from start to end without touching the grid and return its result
+    search(start, end, trace=None, state=None) -> SearchResult
+        run whole search between any two cells with its own state
+    events(start=None, end=None, state=None) -> generator of tuple(int, int, int)
+        yield compact events of a search, see events module
+    solve_pairs(pairs) -> generator of SearchResult
+        solve many (start, end) queries on the current map
+    get_map( ) -> GridMap
+        return snapshot of the map for the current grid version
+    new_state( ) -> Scratch
+        return new buffers for one search
+    get_step_state( ) -> Scratch
+        return cleared buffers for the search driven by next_step
+    distance_field(source) -> DistanceField
+        return (cached) distances and parents from source to every cell
+    solve_targets(source, targets) -> generator of SearchResult
+        solve queries from one source to many targets with one search
     reconstruct_path( ) -> list of (int, int)
         return path from start to end node finded by algorithm
         return None if path not founded
+    neighbour_table(grid_map=None) -> (bytearray, tuple)
+        return neighbour masks of the grid and offsets for current directions
+    move_table(grid_map=None) -> (bytearray, tuple)
+        return neighbour masks of the grid and (offset, cost) moves for current directions
+    set_landmarks(landmarks : Landmarks) -> None
+        use landmark tables in heuristics
+    landmark_heuristic(target : int, source : int = None) -> callable
+        return landmark lower bound on cost of getting from cell index to target
+    enable_stats(profiler=None) -> SearchStats
+        start collecting counters and phase timings of searches
+    disable_stats( ) -> SearchStats
+        stop collecting them and return what was collected
+    cost(node1, node2) -> int
+        return cost of moving from node1 to its neighbour node2
+    index_costs(index : int) -> list of (int, int)
+        return indices of neighbours of cell at index with costs of moving to them
     get_data( ) -> dict[str, Any]
-        return dictionary with start, end and walls positions
+        return dictionary with start, end, walls and terrain costs
             "start": tuple(int, int),
             "end": tuple(int, int),
-            "walls": list(tuple(int,int))
+            "walls": list(tuple(int,int)),
+            "costs": list(tuple(int, int, int))
     load_data(data : dict[str, Any]) -> None
-        loads walls, start and and from dictionary
+        loads walls, terrain costs, start and and from dictionary
+    resize(cols : int, rows : int) -> None
+        replace the grid with an empty one of another size
     update_cell(x : int, y : int, value : str) - > None
-        set grid at position x, y to value
+        set grid at position x, y to value, walls should be
+        placed and removed through it so algorithms keeping
+        data built from the map can update it
     """ 
+    field_cache_size = 8
+    stats = None
+    weighted = False
     @abstractmethod
     def __init__(self,cols, rows):
         """
@@ -65,7 +149,7 @@ class Algorithm(ABC):
         """
         self.cols = cols
         self.rows = rows
-        self.grid = [["empty"] * cols for _ in range(rows) ]
+        self.grid = Grid(cols, rows)
         self.start = None
         self.end = None
         self.parents = dd()
@@ -73,7 +157,32 @@ class Algorithm(ABC):
         self.directions8 = [(0,1),(0,-1),(1,0),(-1,0),(-1,-1),(1,1),(1,-1),(-1,1)]
         self.directions = self.directions4
         self.end_found = False
+        self.scratch = None
+        self.step_state = None
+        self.map = None
+        self.fields = {}
+        self.landmarks = None
         super().__init__()
+    def resize(self, cols, rows):
+        """
+        replace the grid with an empty cols x rows one
+
+        directions and settings given to the constructor are kept,
+        start, end, buffers, cached fields and landmarks are dropped,
+        reset should be called before next_step
+        """
+        self.cols = cols
+        self.rows = rows
+        self.grid = Grid(cols, rows)
+        self.start = None
+        self.end = None
+        self.parents = dd()
+        self.end_found = False
+        self.scratch = None
+        self.step_state = None
+        self.map = None
+        self.fields = {}
+        self.landmarks = None
     def set_directions(self, moore):
         if moore:
             self.directions = self.directions8
@@ -90,26 +199,358 @@ class Algorithm(ABC):
         pass
     def set_start(self,node):
         self.start = node
-        x,y = node
-        self.grid[y][x] = "start"
+        self.grid.set_code(*node, START)
     def set_end(self,node):
         self.end = node
-        x,y = node
-        self.grid[y][x] = "end"
+        self.grid.set_code(*node, END)
     def cell(self, x, y):
-        return self.grid[y][x]
+        return NAMES[self.grid.cells[y * self.cols + x]]
+    def solve(self, trace=None):
+        """
+        run search from start until end is found or search gets stuck
+        
+        Parameters
+        ----------
+        trace : callable, optional
+            called with every expanded node (x, y)
+        """
+        self.check_placed()
+        return self.search(self.start, self.end, trace)
+    def search(self, start, end, trace=None, state=None):
+        """
+        run search from start until end is found or search gets stuck
+        
+        subclasses replace this with a loop which works on cell
+        indices of get_map and keeps everything it changes in state,
+        so searches with different states can run at the same time,
+        this implementation places start and end for the time of
+        the search and runs solve of the subclass or solve_steps
+        
+        Parameters
+        ----------
+        start : tuple(int, int)
+            position of the start node
+        end : tuple(int, int)
+            position of the end node
+        trace : callable, optional
+            called with every expanded node (x, y)
+        state : Scratch, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        placed = self.start, self.end
+        self.start, self.end = start, end
+        try:
+            if type(self).solve is not Algorithm.solve:
+                return self.solve(trace)
+            return self.solve_steps(trace)
+        finally:
+            self.start, self.end = placed
+    def solve_steps(self, trace=None):
+        """run search by driving next_step, visited cells are cleared from the grid afterwards"""
+        return run_events(self.step_events(), self.cols, trace)
+    def events(self, start=None, end=None, state=None):
+        """
+        yield events of search from start to end and return its SearchResult
+        
+        events are tuples (kind, cell index, value) of ints described
+        in events module, no colors or texts are made for them,
+        subclasses which search cell indices yield events from
+        search_loop(start, end, trace, state, emit), the one loop of
+        their search, which search runs with emit unset so nothing is
+        yielded and which returns SearchResult, the others have no
+        search_loop, they drive next_step between placed start and end
+        and yield only expand events and the last one
+        
+        Parameters
+        ----------
+        start : tuple(int, int), optional
+            position of the start node, by default the placed one
+        end : tuple(int, int), optional
+            position of the end node, by default the placed one
+        state : Scratch, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        if getattr(type(self), "search_loop", None) is not None:
+            if start is None or end is None:
+                self.check_placed()
+            return self.search_loop(start or self.start, end or self.end, None, state, True)
+        self.check_placed()
+        if (start or self.start) != self.start or (end or self.end) != self.end:
+            raise ValueError(f"{type(self).__name__} yields events only between placed start and end")
+        return self.step_events()
+    def step_events(self):
+        """yield events of search driven by next_step, visited cells are cleared from the grid afterwards"""
+        self.reset()
+        cols = self.cols
+        parents = self.parents
+        expanded = 0
+        while True:
+            res = self.next_step()
+            if res is True or res is False:
+                break
+            expanded += 1
+            node = res[0]
+            parent = parents.get(node, node)
+            yield EXPAND, node[1] * cols + node[0], parent[1] * cols + parent[0]
+        path = self.reconstruct_path()
+        self.reset_grid()
+        end = self.end[1] * cols + self.end[0]
+        if not res:
+            yield EXHAUSTED, end, expanded
+            return SearchResult(False, [], None, expanded, expanded)
+        path.append(self.start)
+        path.reverse()
+        cost = sum(map(self.cost, path, path[1:])) if self.weighted else len(path) - 1
+        yield FOUND, end, cost
+        return SearchResult(True, path, cost, expanded, expanded)
+    def solve_pairs(self, pairs, trace=None):
+        """
+        solve every (start, end) pair on the current map and yield SearchResult
+        
+        grid is not reallocated and all queries share buffers from
+        get_scratch, query with start or end on a wall is not found
+        
+        Parameters
+        ----------
+        pairs : iterable of ((int, int), (int, int))
+            start and end positions of queries
+        trace : callable, optional
+            passed to search
+        """
+        grid = self.grid
+        for s, e in pairs:
+            cells = self.get_map().cells
+            if cells[grid.index(*s)] == WALL or cells[grid.index(*e)] == WALL:
+                yield SearchResult(False, [], None, 0, 0)
+                continue
+            yield self.search(s, e, trace)
+    def distance_field(self, source):
+        """
+        return distance field of search from source run to exhaustion
+        
+        fields are cached by (grid version, directions, source),
+        so they are computed again only after walls change
+        
+        Parameters
+        ----------
+        source : tuple(int, int)
+            position of the source node, must be inside the grid and not a wall
+        """
+        self.check_inside(source)
+        if self.grid.code(*source) == WALL:
+            raise ValueError(f"source {source} is a wall")
+        key = (self.grid.version, self.directions is self.directions8, source)
+        field = self.fields.pop(key, None)
+        if field is None:
+            field = self.sweep(source)
+            for old in [k for k in self.fields if k[0] != key[0]]:
+                del self.fields[old]
+            while len(self.fields) >= self.field_cache_size:
+                del self.fields[next(iter(self.fields))]
+        self.fields[key] = field
+        return field
+    def sweep(self, source):
+        """
+        expand every cell reachable from source breadth first
+        and return DistanceField, subclasses with costs replace it
+        """
+        cols = self.cols
+        dist, parent = empty_field(cols * self.rows)
+        masks, offsets = self.neighbour_table()
+        s = self.grid.index(*source)
+        dist[s] = 0
+        parent[s] = s
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            du = dist[u] + 1
+            for d in offsets[masks[u]]:
+                v = u + d
+                if dist[v] < 0:
+                    dist[v] = du
+                    parent[v] = u
+                    queue.append(v)
+        return DistanceField(cols, source, dist, parent)
+    def solve_targets(self, source, targets):
+        """
+        yield SearchResult for paths from source to every target
+        
+        uses one distance field of source, so every result takes
+        time proportional to length of its path
+        
+        Parameters
+        ----------
+        source : tuple(int, int)
+            position of the source node
+        targets : iterable of (int, int)
+            positions of the end nodes, outside of the grid raise ValueError
+        """
+        self.check_inside(source)
+        if self.grid.code(*source) == WALL:
+            for target in targets:
+                self.check_inside(target)
+                yield SearchResult(False, [], None, 0, 0)
+            return
+        field = self.distance_field(source)
+        for target in targets:
+            path = field.path_to(target)
+            if path:
+                yield SearchResult(True, path, field.distance(target), 0, 0)
+            else:
+                yield SearchResult(False, [], None, 0, 0)
+    def get_scratch(self):
+        """return cleared buffers for one search, reused between searches"""
+        size = self.cols * self.rows
+        if self.scratch is None or self.scratch.size != size:
+            self.scratch = self.new_state()
+        else:
+            self.scratch.clear()
+        return self.scratch
+    def new_state(self):
+        return Scratch(self.cols * self.rows)
+    def get_step_state(self):
+        """return cleared buffers for the search driven by next_step, reused between resets"""
+        size = self.cols * self.rows
+        if self.step_state is None or self.step_state.size != size:
+            self.step_state = Scratch(size)
+        else:
+            self.step_state.clear()
+        return self.step_state
+    def prepare_state(self, state=None):
+        """return state cleared for a new search, buffers from get_scratch if state is None"""
+        if state is None:
+            return self.get_scratch()
+        state.clear()
+        return state
+    def get_map(self):
+        grid_map = self.map
+        if grid_map is None or grid_map.version != self.grid.version:
+            grid_map = self.map = self.grid.snapshot()
+        return grid_map
+    def check_inside(self, node):
+        x, y = node
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            raise ValueError(f"node {node} outside of {self.cols}x{self.rows} grid")
+    def check_placed(self):
+        if self.start is None or self.end is None:
+            raise ValueError("start and end have to be placed before solving")
+    def set_landmarks(self, landmarks):
+        self.landmarks = landmarks
+    def landmark_heuristic(self, target, source=None):
+        """
+        return function giving landmark lower bound on cost of getting
+        from cell index to target index, None if there are no landmarks
+        or they were built for other walls, costs or directions,
+        landmarks are picked for a search from source if it is given
+        """
+        landmarks = self.landmarks
+        if (landmarks is None or landmarks.version != self.grid.version or
+            landmarks.moore != (self.directions is self.directions8)):
+            return None
+        return landmarks.heuristic(target, source)
+    def enable_stats(self, profiler=None):
+        """
+        start counting expansions, frontier operations and neighbours
+        and timing phases of solve and next_step, return SearchStats
+        
+        methods of this instance are replaced by wrappers,
+        without stats no code runs for them at all
+        
+        Parameters
+        ----------
+        profiler : object, optional
+            profiler with enable() and disable() methods, like cProfile.Profile,
+            run around every solve
+        """
+        stats = SearchStats()
+        instrument(self, stats, profiler)
+        return stats
+    def disable_stats(self):
+        stats = self.stats
+        uninstrument(self)
+        return stats
+    def neighbour_table(self, grid_map=None):
+        """
+        return (masks, offsets) for current directions, offsets[masks[i]]
+        are index offsets of neighbours of cell i which are not walls,
+        masks are taken from grid_map if it is given
+        """
+        adjacency = self.grid.get_adjacency() if grid_map is None else grid_map.adjacency
+        return adjacency.masks, adjacency.offsets[self.directions is self.directions8]
+    def move_table(self, grid_map=None):
+        """
+        return (masks, moves) for current directions, moves[masks[i]]
+        are (offset, step cost) pairs of neighbours of cell i which are
+        not walls, step cost times terrain cost of neighbour is cost of move,
+        masks are taken from grid_map if it is given
+        """
+        adjacency = self.grid.get_adjacency() if grid_map is None else grid_map.adjacency
+        return adjacency.masks, adjacency.moves[self.directions is self.directions8]
+    def index_neighbours(self, index):
+        """return indices of cells next to cell at index which are not walls"""
+        masks, offsets = self.neighbour_table()
+        return [index + d for d in offsets[masks[index]]]
+    def cost(self, node1, node2):
+        """
+        return cost of moving from node1 to its neighbour node2
+
+        STRAIGHT_COST for vertical and horizontal move, DIAGONAL_COST
+        for diagonal one, multiplied by terrain cost of node2
+        """
+        x1, y1 = node1
+        x2, y2 = node2
+        step = DIAGONAL_COST if x1 != x2 and y1 != y2 else STRAIGHT_COST
+        return step * self.grid.costs[y2 * self.cols + x2]
+    def index_costs(self, index):
+        """
+        return (index, cost) of cells next to cell at index which are not walls,
+        cost of the move is the same as from cost
+        """
+        masks, moves = self.move_table()
+        costs = self.grid.costs
+        return [(index + d, step * costs[index + d]) for d, step in moves[masks[index]]]
+    def make_result(self, parents, end, expanded, pushed, cost=None, frontier=None, reopened=None):
+        """
+        build SearchResult from parent indices
+        
+        Parameters
+        ----------
+        parents : array or dict[int, int] or None
+            parent index of reached cells by cell index, start is its own parent,
+            None if end was not found
+        end : int
+            index of the end cell
+        expanded : int
+            number of expanded nodes
+        pushed : int
+            number of nodes put on the frontier
+        cost : int, optional
+            cost of the path, by default number of moves
+        frontier : int, optional
+            number of entries left on the frontier, read only by stats
+        reopened : int, optional
+            number of pushes of already reached nodes, read only by stats
+        """
+        if parents is None:
+            return SearchResult(False, [], None, expanded, pushed)
+        cols = self.cols
+        path = []
+        node = end
+        while True:
+            path.append((node % cols, node // cols))
+            parent = parents[node]
+            if parent == node:
+                break
+            node = parent
+        path.reverse()
+        return SearchResult(True, path, len(path) - 1 if cost is None else cost, expanded, pushed)
     def get_neighbours(self, node):
-        """return nodes if four directions
-            N, E, S, W
-        """    
-        neighbours = []
+        """return positions of nodes next to node which are not walls"""
         x, y = node
-        for a,b in self.directions:
-            if ((x + a <self. cols and x + a >= 0) and
-                (y + b < self.rows and y + b >= 0) and
-                (self.grid[y+b][x+a] != "wall")):
-                neighbours.append((a+x, b+y))
-        return neighbours
+        cols = self.cols
+        index = y * cols + x
+        masks, offsets = self.neighbour_table()
+        return [((index + d) % cols, (index + d) // cols) for d in offsets[masks[index]]]
     def reconstruct_path(self):
         path = []
         if not self.end_found:
@@ -122,26 +563,37 @@ class Algorithm(ABC):
         self.update_cell(*self.end,"end")
         return path
     def update_cell(self, x, y, value):
-        self.grid[y][x] = value
+        self.grid.set_code(x, y, CODES[value])
     def reset_grid(self):
-        for i in range(self.rows):
-            for j in range(self.cols):
-                cell = self.grid[i][j]
-                self.grid[i][j] = cell if cell in ["wall", "start", "end"] else "empty"
+        self.grid.clear_marks()
     def get_data(self):
-        walls = []
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self.grid[i][j] == "wall":
-                    walls.append((j,i))
         return {
-            "walls": walls,
+            "walls": list(self.grid.walls()),
+            "costs": list(self.grid.weighted()),
             "start": self.start,
             "end": self.end
         }
     def load_data(self, data):
-        self.__init__(self.cols, self.rows)
+        """
+        replace walls, costs, start and end with data from get_data
+        
+        grid and buffers are reused, cells and costs are built
+        apart and assigned at once, reset should be called before
+        next_step
+        """
+        grid = self.grid
+        size = self.cols * self.rows
+        cells = bytearray(size)
+        costs = bytearray(b"\x01") * size
+        for x, y in data["walls"]:
+            cells[grid.index(x, y)] = WALL
+        for x, y, cost in data.get("costs", []):
+            if not 1 <= cost <= MAX_COST:
+                raise ValueError(f"cost {cost} outside of 1..{MAX_COST}")
+            costs[grid.index(x, y)] = cost
+        grid.assign(cells, costs)
+        self.start = self.end = None
         self.set_start(data["start"])
         self.set_end(data["end"])
-        for x,y in data["walls"]:
-            self.grid[y][x] = "wall"
\ No newline at end of file
+        self.parents = dd()
+        self.end_found = False
\ No newline at end of file
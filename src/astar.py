@@ -8,23 +8,34 @@ class Astar(Algorithm):
     can be seen as an extension of Dijkstra's algorithm. A* achieves better
     performance by using heuristics to guide its search
     
+    moves cost STRAIGHT_COST or DIAGONAL_COST times terrain cost
+    of the entered cell, heuristic is manhattan distance for four
+    directions and octile distance for eight, both in the same units,
+    raised to landmark lower bound when landmarks are set (ALT)
+    
     Attributes
     ----------
-    f : defaultdict
-        the total cost of the node.
-    g : defaultdict
-        the distance between the current node and the start node.
-    open : list(int)
-        list of nodes to vistit
-    cloded : set
-        set of already visited nodes
+    g : CostView
+        the distance between the current node and the start node,
+        read from g of step_state
+    open : list(tuple(int, int, tuple(int, int)))
+        binary heap of (f, h, node) entries of nodes to visit,
+        entries of closed nodes or with f other than g + h are stale and skipped
+    alt : callable
+        landmark heuristic for the end node, None without landmarks
     
     Methods
     -------
     reset( ) -> None
         restores default values for internal data
+    push(node) -> None
+        put node on the open heap
+    pop( ) -> tuple(int, int)
+        remove node with the lowest f value from the open heap
     next_step( ) -> (True,False, None)
         perform one step of pathfinding algorithm
+    search(start, end, trace=None, state=None) -> SearchResult
+        run whole search on the map without touching the grid
     cost(node1, node2) -> int
         return cost of getting from node1 to node2
     h(node) -> int
@@ -32,6 +43,7 @@ class Astar(Algorithm):
     cell_content(x : int, y : int) -> str
         return values of g and h of a node at position x, y
     """
+    weighted = True
     def __init__(self, cols, rows):
         """
         Parameters
@@ -42,26 +54,62 @@ class Astar(Algorithm):
             number of rows in the grid
         """
         super().__init__(cols, rows)
-        self.open = []
-        self.closed = set()
-        self.g = dd(lambda: 0)
-        self.f = dd(lambda: 0)
-        self.g[self.start] = 0
-        self.open.append(self.start)
+        self.reset_open()
     def reset(self):
         """
         reset values in the grid except walls, start, end node
         
         clears grid of visited and path nodes,
-        clears g, f, closed sets and open list
+        starts new generation of step_state and clears open list
         """
         self.reset_grid()
+        self.reset_open()
+    def reset_open(self):
+        """
+        starts new generation of g values and closed cells and clears open heap,
+        puts start node on the open heap if start is placed
+        """
+        state = self.get_step_state()
         self.open = []
-        self.closed = set()
-        self.g = dd(lambda: 0)
-        self.f = dd(lambda: 0)
-        self.g[self.start] = 0
-        self.open.append(self.start)
+        self.g = CostView(state, self.cols)
+        self.alt = None
+        if self.end is not None:
+            self.alt = self.landmark_heuristic(self.end[1] * self.cols + self.end[0],
+                                               None if self.start is None else self.start[1] * self.cols + self.start[0])
+        if self.start is not None:
+            i = self.start[1] * self.cols + self.start[0]
+            state.seen[i] = state.generation
+            state.g[i] = 0
+            self.push(self.start)
+    def push(self, node):
+        """
+        put node on the open heap with its current g value
+        
+        heap entries are (f, h, node) so ties on f are broken
+        by lower h, older entries for the same node have higher f,
+        they become stale and are skipped when popped (lazy decrease-key)
+        
+        Parameters
+        ----------
+        node : tuple(int, int)
+            node on the grid
+        """
+        h = self.h(node)
+        hq.heappush(self.open, (self.step_state.g[node[1] * self.cols + node[0]] + h, h, node))
+    def pop(self):
+        """
+        remove and return node with the lowest f value from the open heap
+        
+        return None if there are no live entries left
+        """
+        state, cols = self.step_state, self.cols
+        g, closed, generation = state.g, state.closed, state.generation
+        while self.open:
+            f, h, node = hq.heappop(self.open)
+            i = node[1] * cols + node[0]
+            if closed[i] != generation and g[i] + h == f:
+                return node
+        return None
     def next_step(self):
         """
         perform one step of A* algorithm
@@ -70,56 +118,142 @@ class Astar(Algorithm):
         if found end in this step return True
         else (x,y), color, content
         
-        find node with lowest f value in the open list
+        pop node with lowest f value (ties broken by h) from the open heap
         add this node to closed set and check if it is end
-        find neighbours of current node and if neighbour is
-        already visited check if it could have lower g value
-        if so update g value and set current as parent of neighbour
-        else add neighbour on open list
+        for every neighbour of current node which is not closed
+        check if it could have lower g value through current node
+        if so update g value, set current as parent of neighbour
+        and push neighbour on the open heap
         
         """
-        if len(self.open) <= 0:
+        current_node = self.pop()
+        if current_node is None:
             return False
-        current_node = self.open[0]
-        current_index = 0
-        for index, item in enumerate(self.open):
-            if self.f[item] < self.f[current_node]:
-                current_node = item
-                current_index = index
-        # pop current, add to closed
-        self.open.pop(current_index)
-        self.closed.add(current_node)
-        if self.cell(*current_node) == "end":
+        state, cols = self.step_state, self.cols
+        seen, closed, g, generation = state.seen, state.closed, state.g, state.generation
+        ix, iy = current_node
+        index = iy * cols + ix
+        closed[index] = generation
+        if self.grid.code(ix, iy) == END:
             self.end_found = True
             return True
-        ix, iy = current_node
-        if self.grid[iy][ix] == "empty":
-            self.grid[iy][ix] = "visited"
+        cells = self.grid.cells
+        if cells[index] == EMPTY:
+            cells[index] = VISITED
+        gu = g[index]
         for v in self.get_neighbours(current_node):
-            if v not in self.closed:
-                self.g[v] = self.g[current_node] + 1
-                self.f[v] = self.g[v] + self.h(v)
-                for open_node in self.open:
-                    if v == open_node and self.g[v] > self.g[open_node]:
-                        continue
+            i = v[1] * cols + v[0]
+            if closed[i] == generation:
+                continue
+            gv = gu + self.cost(current_node, v)
+            if seen[i] != generation or gv < g[i]:
+                seen[i] = generation
+                g[i] = gv
                 self.parents[v] = current_node
-                if v not in self.open:
-                    self.open.append(v)
-        return current_node, CELL_COLOR.get(self.grid[iy][ix]), f"{self.g[current_node]},{self.h(current_node)}"           
-    def cost(self, node1, node2):
-        """return 10 for vertical and horizontal neighbours
-            return 14 for diagonal"""                
-        x1, y1 = node1
-        x2, y2 = node2
-        a = x1 - x2
-        b = y1 - y2
-        return 14 if abs(a) + abs(b) > 1 else 10
+                self.push(v)
+        return current_node, CELL_COLOR.get(NAMES[cells[index]]), f"{gu},{self.h(current_node)}"           
+    def search(self, start, end, trace=None, state=None):
+        """
+        run A* algorithm from start to end without touching the grid
+        
+        works on cell indices of get_map with buffers of state,
+        doesn't change state used by next_step
+        
+        Parameters
+        ----------
+        start : tuple(int, int)
+            position of the start node
+        end : tuple(int, int)
+            position of the end node
+        trace : callable, optional
+            called with every expanded node (x, y)
+        state : Scratch, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        return run_events(self.search_loop(start, end, trace, state), self.cols)
+    def search_loop(self, start, end, trace=None, state=None, emit=False):
+        """loop of A* search shared by search and events, see Algorithm.events"""
+        grid_map = self.get_map()
+        scratch = self.prepare_state(state)
+        parent = scratch.parent
+        cols = self.cols
+        g, closed = scratch.g, scratch.closed
+        sx, sy = start
+        ex, ey = end
+        start = sy * cols + sx
+        end = ey * cols + ex
+        masks, moves = self.move_table(grid_map)
+        costs = grid_map.costs
+        heappush, heappop = hq.heappush, hq.heappop
+        diagonal = DIAGONAL_COST - 2 * STRAIGHT_COST if self.directions is self.directions8 else 0
+        alt = self.landmark_heuristic(end, start)
+        seen, gen = scratch.seen, scratch.generation
+        seen[start] = gen
+        parent[start] = start
+        g[start] = 0
+        if emit:
+            yield PUSH, start, start
+        dx, dy = abs(sx - ex), abs(sy - ey)
+        h = STRAIGHT_COST * (dx + dy) + diagonal * (dx if dx < dy else dy)
+        if alt is not None:
+            h = max(h, alt(start))
+        heap = [(h, h, start)]
+        expanded = 0
+        pushed = 1
+        reopened = 0
+        while heap:
+            _, _, u = heappop(heap)
+            if closed[u] == gen:
+                continue
+            if u == end:
+                if emit:
+                    yield FOUND, end, g[u]
+                return self.make_result(parent, end, expanded, pushed, g[u], len(heap), reopened)
+            closed[u] = gen
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+            if emit:
+                yield EXPAND, u, parent[u]
+            gu = g[u]
+            for d, step in moves[masks[u]]:
+                v = u + d
+                if closed[v] == gen:
+                    continue
+                gv = gu + step * costs[v]
+                if seen[v] != gen:
+                    seen[v] = gen
+                    if emit:
+                        yield PUSH, v, u
+                elif gv >= g[v]:
+                    continue
+                else:
+                    reopened += 1
+                    if emit:
+                        yield RELAX, v, u
+                g[v] = gv
+                parent[v] = u
+                dx = abs(v % cols - ex)
+                dy = abs(v // cols - ey)
+                h = STRAIGHT_COST * (dx + dy) + diagonal * (dx if dx < dy else dy)
+                if alt is not None:
+                    a = alt(v)
+                    if a > h:
+                        h = a
+                heappush(heap, (gv + h, h, v))
+                pushed += 1
+        if emit:
+            yield EXHAUSTED, end, expanded
+        return self.make_result(None, end, expanded, pushed, frontier=0, reopened=reopened)
     def h(self, node):
         """
         return heuristic (estimated) distance from the current node to the end node
         
         return manhattan (sum of horizontal distance and vertical distance)
-        distance from node to end
+        distance from node to end for four directions and octile distance
+        (diagonal moves first, then straight ones) for eight directions,
+        in units of cost, so it never overestimates as terrain costs are at least 1,
+        with landmarks set the higher of it and the landmark bound
         
         Parameters
         ----------
@@ -129,9 +263,15 @@ class Astar(Algorithm):
         """
         x1, y1 = node
         x2, y2 = self.end
-        a = x1 - x2
-        b = y1 - y2
-        return abs(a) + abs(b)
+        a = abs(x1 - x2)
+        b = abs(y1 - y2)
+        if self.directions is self.directions8:
+            h = STRAIGHT_COST * (a + b) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * min(a, b)
+        else:
+            h = STRAIGHT_COST * (a + b)
+        if self.alt is not None:
+            h = max(h, self.alt(y1 * self.cols + x1))
+        return h
     def cell_content(self, x, y):
         """
         return value of the grid at position x, y
@@ -0,0 +1,138 @@
+"""
+solving many (start, end) queries on one map, optionally spread
+across a pool of processes which share the map
+
+walls, terrain costs and neighbour masks are copied once into
+one block of shared memory, every worker maps it read-only and
+keeps only its own search buffers
+"""
+from multiprocessing import Pool, shared_memory
+from algorithm import *
+
+worker_algorithm = None
+worker_map = None
+
+
+class SharedMap:
+    """
+    A class holding cells, costs and neighbour masks of a grid in shared memory
+
+    block holds three arrays of cols * rows bytes one after another,
+    cells (only walls), costs and masks of GridMap of the grid
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    memory : SharedMemory
+        block of shared memory, its name is passed to workers
+
+    Methods
+    -------
+    from_grid(grid : Grid) -> SharedMap
+        create block and copy grid into it
+    views( ) -> tuple(memoryview, memoryview, memoryview)
+        return read-only views of cells, costs and masks
+    close( ) -> None
+        detach from block
+    unlink( ) -> None
+        free block, after every process closed it
+    """
+    def __init__(self, cols, rows, name=None):
+        """
+        Parameters
+        ----------
+        cols : int
+            numbers of column in the grid
+        rows : int
+            number of rows in the grid
+        name : str, optional
+            name of existing block to attach to, by default a new block is created
+        """
+        self.cols = cols
+        self.rows = rows
+        size = cols * rows
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=max(1, 3 * size))
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+    @classmethod
+    def from_grid(cls, grid):
+        shared = cls(grid.cols, grid.rows)
+        size = grid.cols * grid.rows
+        grid_map = grid.snapshot()
+        buf = shared.memory.buf
+        buf[:size] = grid_map.cells
+        buf[size:2 * size] = grid_map.costs
+        buf[2 * size:3 * size] = grid_map.adjacency.masks
+        return shared
+    def views(self):
+        size = self.cols * self.rows
+        buf = self.memory.buf.toreadonly()
+        return buf[:size], buf[size:2 * size], buf[2 * size:3 * size]
+    def close(self):
+        self.memory.close()
+    def unlink(self):
+        self.memory.unlink()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+def attach(algorithm, shared):
+    """
+    make grid and map of algorithm use read-only views of shared map instead of
+    their own arrays, grid can't be changed afterwards, algorithms solving through next_step mark
+    visited cells, so they get a private copy of cells
+    """
+    grid = algorithm.grid
+    cells, costs, masks = shared.views()
+    cls = type(algorithm)
+    steps = cls.search is Algorithm.search and cls.solve is Algorithm.solve
+    grid.cells = bytearray(cells) if steps else cells
+    grid.costs = costs
+    grid.adjacency = Adjacency(shared.cols, shared.rows, None, masks)
+    algorithm.map = GridMap(shared.cols, shared.rows, cells, costs, grid.adjacency, grid.version)
+
+def init_worker(alg_class, cols, rows, name, moore):
+    """build algorithm on shared map and allocate its search buffers once in every worker process"""
+    global worker_algorithm, worker_map
+    worker_map = SharedMap(cols, rows, name)
+    worker_algorithm = alg_class(cols, rows)
+    attach(worker_algorithm, worker_map)
+    worker_algorithm.set_directions(moore)
+    worker_algorithm.get_scratch()
+
+def solve_pair(pair):
+    return next(worker_algorithm.solve_pairs([pair]))
+
+def solve_batch(algorithm, pairs, processes=None, chunksize=256):
+    """
+    solve every (start, end) pair on map of algorithm and yield SearchResult
+    
+    results are yielded in order of pairs as soon as they are ready,
+    map is shared with workers through SharedMap for the time of the batch
+    
+    Parameters
+    ----------
+    algorithm : Algorithm
+        algorithm with loaded map, its class is used by workers
+    pairs : iterable of ((int, int), (int, int))
+        start and end positions of queries
+    processes : int, optional
+        number of worker processes, by default queries are solved
+        in this process
+    chunksize : int
+        number of queries sent to a worker at once
+    """
+    if not processes or processes == 1:
+        yield from algorithm.solve_pairs(pairs)
+        return
+    moore = algorithm.directions is algorithm.directions8
+    with SharedMap.from_grid(algorithm.grid) as shared:
+        initargs = (type(algorithm), algorithm.cols, algorithm.rows, shared.memory.name, moore)
+        with Pool(processes, init_worker, initargs) as pool:
+            yield from pool.imap(solve_pair, pairs, chunksize)
@@ -3,39 +3,102 @@ from algorithm import *
 class Bfs(Algorithm):
     def __init__(self, cols, rows):
         super().__init__(cols, rows)
-        self.visited = set()
-        self.queue = deque()
-        self.queue.append(self.start)
+        self.reset_queue()
     def cell_content(self, x, y):
         return self.cell(x,y)
     def next_step(self):
         if len(self.queue) < 1:
             return False
-        node = self.queue.popleft()
-        while len(self.queue) > 1 and self.cell(*node) not in ["empty", "end"]:
-            node = self.queue.popleft()
-        if node in self.visited:
+        node = self.pop()
+        code = self.grid.code
+        while len(self.queue) > 1 and code(*node) not in (EMPTY, END):
+            node = self.pop()
+        x,y = node
+        state = self.step_state
+        visited, generation = state.closed, state.generation
+        if visited[y * self.cols + x] == generation:
             return False
-        if self.cell(*node) == "end":
+        if code(*node) == END:
             self.end_found = True
             return True
-        x,y = node
-        if self.cell(x,y) == "empty":
-            self.visited.add(node)
-            self.grid[y][x] = "visited"
-            self.update_cell(x,y, "visited")
+        if code(x,y) == EMPTY:
+            visited[y * self.cols + x] = generation
+            self.grid.set_code(x, y, VISITED)
         neighbours = self.get_neighbours(node)
         for n in neighbours:
-            self.queue.append(n)
-            if self.cell(*n) != "visited":
+            self.push(n)
+            if code(*n) != VISITED:
                 self.parents[n] = node
-        if self.cell(x,y) == "start":
+        if code(x,y) == START:
             return node, CELL_COLOR.get("start"), "start"
         return node, CELL_COLOR.get("visited"), "visited"
-            
+    def search(self, start, end, trace=None, state=None):
+        """
+        run breadth first search from start to end without touching the grid
+        
+        Parameters
+        ----------
+        start : tuple(int, int)
+            position of the start node
+        end : tuple(int, int)
+            position of the end node
+        trace : callable, optional
+            called with every expanded node (x, y)
+        state : Scratch, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        return run_events(self.search_loop(start, end, trace, state), self.cols)
+    def search_loop(self, start, end, trace=None, state=None, emit=False):
+        """loop of breadth first search shared by search and events, see Algorithm.events"""
+        grid_map = self.get_map()
+        scratch = self.prepare_state(state)
+        parent = scratch.parent
+        cols = self.cols
+        start = start[1] * cols + start[0]
+        end = end[1] * cols + end[0]
+        masks, offsets = self.neighbour_table(grid_map)
+        seen, gen = scratch.seen, scratch.generation
+        seen[start] = gen
+        parent[start] = start
+        if emit:
+            yield PUSH, start, start
+        reached = 1
+        queue = deque([start])
+        expanded = 0
+        while queue:
+            u = queue.popleft()
+            if u == end:
+                res = self.make_result(parent, end, expanded, reached)
+                if emit:
+                    yield FOUND, end, res.cost
+                return res
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+            if emit:
+                yield EXPAND, u, parent[u]
+            for d in offsets[masks[u]]:
+                v = u + d
+                if seen[v] != gen:
+                    seen[v] = gen
+                    parent[v] = u
+                    reached += 1
+                    queue.append(v)
+                    if emit:
+                        yield PUSH, v, u
+        if emit:
+            yield EXHAUSTED, end, expanded
+        return self.make_result(None, end, expanded, reached)
     def reset(self):
         self.reset_grid()
-        self.visited = set()
+        self.reset_queue()
+    def reset_queue(self):
+        """start new generation of visited cells and put start on the queue"""
+        self.get_step_state()
         self.queue = deque()
-        self.queue.append(self.start)
+        self.push(self.start)
+    def push(self, node):
+        self.queue.append(node)
+    def pop(self):
+        return self.queue.popleft()
    
\ No newline at end of file
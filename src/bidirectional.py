@@ -0,0 +1,324 @@
+from algorithm import *
+
+FORWARD = 0
+BACKWARD = 1
+
+class Bidirectional(Algorithm):
+    """
+    An abstract class for pathfinding algorithms searching from
+    start and end at the same time
+
+    forward search grows from start, backward search grows from end,
+    every step expands one node of the side with smaller frontier,
+    when a node reached by both sides is found it becomes candidate
+    meeting node, search stops when no path cheaper than the best
+    candidate can exist (see finished) and parents are rebuilt
+    so reconstruct_path returns the whole path from end to start,
+    search runs the same search on cell indices of get_map with
+    a ScratchPair for state and doesn't touch the grid
+
+    weighted searches pay for moves like Dijkstra, backward search
+    walks moves in reverse, so it pays for the cell it leaves
+
+    Attributes
+    ----------
+    frontier : list
+        frontier of forward and backward search
+    dist : list of dict
+        cost of getting from start (forward) or end (backward) to node
+    side_parents : list of dict
+        parents of nodes in forward and backward search
+    closed : list of set
+        already expanded nodes of both sides
+    best : int
+        cost of the cheapest path found so far
+    meet : tuple(int, int)
+        node where the cheapest path found so far joins both searches
+
+    Methods
+    -------
+    reset( ) -> None
+        restores default values for internal data
+    next_step( ) -> (True,False, None)
+        expand one node of forward or backward search
+    search(start, end, trace=None, state=None) -> SearchResult
+        run whole search on the map without touching the grid
+    new_state( ) -> ScratchPair
+        return new buffers for both sides of one search
+    finished( ) -> bool
+        return True if the cheapest path is already known
+    done(forward : float, backward : float, best : float) -> bool
+        return True if no path cheaper than best can exist for lowest keys of both sides
+    heuristic(target : int) -> callable
+        return lower bound on distance from cell index to target, None without heuristic
+    step_cost(side : int, node, v) -> int
+        return cost of the move between node and its neighbour v made by side
+    """
+    SIDE_COLOR = ("visited", "visited_from_end")
+    weighted = True
+    def __init__(self, cols, rows):
+        super().__init__(cols, rows)
+        self.reset_search()
+    def reset(self):
+        self.reset_grid()
+        self.reset_search()
+    def reset_search(self):
+        self.frontier = [self.new_frontier(), self.new_frontier()]
+        self.dist = [{}, {}]
+        self.side_parents = [{}, {}]
+        self.closed = [set(), set()]
+        self.best = math.inf
+        self.meet = None
+        self.parents = dd()
+        self.end_found = False
+        if self.start is None or self.end is None:
+            return
+        for side, node in [(FORWARD, self.start), (BACKWARD, self.end)]:
+            self.dist[side][node] = 0
+            self.side_parents[side][node] = None
+            self.push(side, node, 0)
+        if self.start == self.end:
+            self.best = 0
+            self.meet = self.start
+    def new_state(self):
+        return ScratchPair(self.cols * self.rows)
+    def new_frontier(self):
+        return []
+    def key(self, side, node, g):
+        """return priority of node on the frontier of side"""
+        return g
+    def push(self, side, node, g):
+        hq.heappush(self.frontier[side], (self.key(side, node, g), node))
+    def top(self, side):
+        """return lowest key on the frontier of side, inf if it is empty"""
+        frontier = self.frontier[side]
+        closed = self.closed[side]
+        while frontier and frontier[0][1] in closed:
+            hq.heappop(frontier)
+        return frontier[0][0] if frontier else math.inf
+    def pop(self, side):
+        self.top(side)
+        return hq.heappop(self.frontier[side])[1]
+    def finished(self):
+        """return True if no path cheaper than best can exist"""
+        return self.done(self.top(FORWARD), self.top(BACKWARD), self.best)
+    def done(self, forward, backward, best):
+        """
+        return True if no path cheaper than best can exist
+
+        every path from start to end goes through a node on each frontier,
+        with keys being distances from start and from end the cheapest
+        one can't be shorter than sum of lowest keys
+        """
+        return forward + backward >= best
+    def heuristic(self, target):
+        return None
+    def step_cost(self, side, node, v):
+        if not self.weighted:
+            return 1
+        return self.cost(node, v) if side == FORWARD else self.cost(v, node)
+    def next_step(self):
+        """
+        perform one step of bidirectional search
+
+        if cant find end return False
+        if shortest path is known return True
+        else (x,y), color, content
+
+        expand node with the lowest key from side with smaller frontier,
+        update distances of its neighbours and check if neighbour
+        reached by other side gives cheaper path from start to end
+        """
+        if self.end_found:
+            return True
+        if self.finished():
+            if self.meet is None:
+                return False
+            self.join()
+            return True
+        side = FORWARD if len(self.frontier[FORWARD]) <= len(self.frontier[BACKWARD]) else BACKWARD
+        if not self.frontier[side] or self.top(side) == math.inf:
+            side = 1 - side
+        node = self.pop(side)
+        self.closed[side].add(node)
+        dist = self.dist[side]
+        other = self.dist[1 - side]
+        g = dist[node]
+        if self.grid.code(*node) == EMPTY:
+            self.grid.set_code(*node, VISITED)
+        for v in self.get_neighbours(node):
+            if v in self.closed[side]:
+                continue
+            gv = g + self.step_cost(side, node, v)
+            if gv < dist.get(v, math.inf):
+                dist[v] = gv
+                self.side_parents[side][v] = node
+                self.push(side, v, gv)
+            if v in other and dist[v] + other[v] < self.best:
+                self.best = dist[v] + other[v]
+                self.meet = v
+        return node, CELL_COLOR.get(self.SIDE_COLOR[side]), str(g)
+    def search(self, start, end, trace=None, state=None):
+        """
+        run bidirectional search from start to end without touching the grid
+
+        both frontiers are binary heaps of (key, index) entries with keys
+        from heuristic, sides are picked and search stops like in next_step
+
+        Parameters
+        ----------
+        start : tuple(int, int)
+            position of the start node
+        end : tuple(int, int)
+            position of the end node
+        trace : callable, optional
+            called with every expanded node (x, y)
+        state : ScratchPair, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        grid_map = self.get_map()
+        pair = self.prepare_state(state)
+        cols = self.cols
+        start = start[1] * cols + start[0]
+        end = end[1] * cols + end[0]
+        masks, moves = self.move_table(grid_map)
+        costs = grid_map.costs if self.weighted else None
+        heappush, heappop = hq.heappush, hq.heappop
+        sides = (pair.forward, pair.backward)
+        heuristics = (self.heuristic(end), self.heuristic(start))
+        heaps = ([], [])
+        for side, source in [(FORWARD, start), (BACKWARD, end)]:
+            scratch, h = sides[side], heuristics[side]
+            scratch.seen[source] = scratch.generation
+            scratch.parent[source] = source
+            scratch.g[source] = 0
+            heaps[side].append((0 if h is None else h(source), source))
+        best = 0 if start == end else math.inf
+        meet = start if start == end else None
+        expanded = 0
+        pushed = 2
+        tops = [0, 0]
+        while True:
+            for side in (FORWARD, BACKWARD):
+                heap = heaps[side]
+                closed, gen = sides[side].closed, sides[side].generation
+                while heap and closed[heap[0][1]] == gen:
+                    heappop(heap)
+                tops[side] = heap[0][0] if heap else math.inf
+            if self.done(tops[FORWARD], tops[BACKWARD], best):
+                break
+            side = FORWARD if len(heaps[FORWARD]) <= len(heaps[BACKWARD]) else BACKWARD
+            if tops[side] == math.inf:
+                side = 1 - side
+            scratch, other, h = sides[side], sides[1 - side], heuristics[side]
+            seen, closed, parent, g, gen = scratch.seen, scratch.closed, scratch.parent, scratch.g, scratch.generation
+            other_seen, other_g, other_gen = other.seen, other.g, other.generation
+            heap = heaps[side]
+            _, u = heappop(heap)
+            closed[u] = gen
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+            gu = g[u]
+            cu = None if costs is None else costs[u]
+            for d, step in moves[masks[u]]:
+                v = u + d
+                if closed[v] == gen:
+                    continue
+                if costs is None:
+                    gv = gu + 1
+                else:
+                    gv = gu + step * (costs[v] if side == FORWARD else cu)
+                if seen[v] != gen or gv < g[v]:
+                    seen[v] = gen
+                    g[v] = gv
+                    parent[v] = u
+                    heappush(heap, (gv if h is None else gv + h(v), v))
+                    pushed += 1
+                if other_seen[v] == other_gen and g[v] + other_g[v] < best:
+                    best = g[v] + other_g[v]
+                    meet = v
+        if meet is None:
+            return self.make_result(None, end, expanded, pushed, frontier=0)
+        # path from meet to end follows backward parents, they become forward ones
+        forward, backward = sides[FORWARD].parent, sides[BACKWARD].parent
+        node = meet
+        while node != end:
+            after = backward[node]
+            forward[after] = node
+            node = after
+        return self.make_result(forward, end, expanded, pushed, best, len(heaps[FORWARD]) + len(heaps[BACKWARD]))
+    def join(self):
+        """set parents along the path through meet node and mark end as found"""
+        forward, backward = self.side_parents
+        node = self.meet
+        while node != self.start:
+            self.parents[node] = forward[node]
+            node = forward[node]
+        node = self.meet
+        while node != self.end:
+            after = backward[node]
+            self.parents[after] = node
+            node = after
+        self.end_found = True
+    def cell_content(self, x, y):
+        return self.cell(x, y)
+
+class BiBfs(Bidirectional):
+    """
+    A class representing bidirectional breadth first search
+
+    both frontiers are FIFO queues, nodes leave them ordered by distance,
+    every move costs 1 and terrain is ignored
+    """
+    weighted = False
+    def new_frontier(self):
+        return deque()
+    def push(self, side, node, g):
+        self.frontier[side].append(node)
+    def top(self, side):
+        frontier = self.frontier[side]
+        return self.dist[side][frontier[0]] if frontier else math.inf
+    def pop(self, side):
+        return self.frontier[side].popleft()
+
+class BiDijkstra(Bidirectional):
+    """
+    A class representing bidirectional Dijkstra algorithm
+
+    both frontiers are priority queues keyed by distance
+    """
+
+class BiAstar(Bidirectional):
+    """
+    A class representing bidirectional A* algorithm
+
+    forward frontier is keyed by g + distance to end, backward
+    frontier by g + distance to start, distances ignore walls
+    (manhattan for four directions, octile for eight) and are
+    in units of cost like heuristic of Astar
+    """
+    def key(self, side, node, g):
+        return g + self.h(node, self.end if side == FORWARD else self.start)
+    def heuristic(self, target):
+        cols = self.cols
+        tx, ty = target % cols, target // cols
+        diagonal = DIAGONAL_COST - 2 * STRAIGHT_COST if self.directions is self.directions8 else 0
+        def h(i):
+            dx, dy = abs(i % cols - tx), abs(i // cols - ty)
+            return STRAIGHT_COST * (dx + dy) + diagonal * (dx if dx < dy else dy)
+        return h
+    def h(self, node, target):
+        a = abs(node[0] - target[0])
+        b = abs(node[1] - target[1])
+        diagonal = DIAGONAL_COST - 2 * STRAIGHT_COST if self.directions is self.directions8 else 0
+        return STRAIGHT_COST * (a + b) + diagonal * min(a, b)
+    def done(self, forward, backward, best):
+        """
+        return True if no path cheaper than best can exist
+
+        keys of both sides are lower bounds on cost of any path
+        through their frontier, so search can stop when either
+        of them is not lower than best
+        """
+        return max(forward, backward) >= best
@@ -3,56 +3,180 @@ class Dijkstra(Algorithm):
     """
     A class represrenting Dijkstra pathfinding algorithm
     
+    moves cost STRAIGHT_COST or DIAGONAL_COST times terrain cost
+    of the entered cell, see Algorithm.cost
+    
     Attributes
     ----------
-    visited : list
-        list of already visited nodes
-    weights : defaultdict
-        dictionary of nodes and cost getting from start to node
+    weights : CostView
+        cost of getting from start to node, read from g of step_state
     heap_queue : list
         list representation of priority queue for nodes to visit
     Methods
     -------
     reset( ) -> None
         restores default values for internal data
+    push(g : int, node) -> None
+        put node on the queue with cost g
+    pop( ) -> (int, tuple(int, int))
+        remove and return (cost, node) entry with the lowest cost
     next_step( ) -> (True,False, None)
         perform one step of pathfinding algorithm
+    search(start, end, trace=None, state=None) -> SearchResult
+        run whole search on the map without touching the grid
+    sweep(source) -> DistanceField
+        run Dijkstra algorithm from source until every reachable node is visited
     cell_content(x : int, y : int) -> str
         return values of g and h of a node at position x, y
     """
+    weighted = True
     def __init__(self, cols, rows):
         super().__init__(cols, rows)
-        self.visited = []
-        self.weights = dd(lambda: math.inf)
-        self.heap_queue = []
-        self.weights[self.start] = 0
-        hq.heappush(self.heap_queue, (0,self.start))
+        self.reset_queue()
     def reset(self):
         self.reset_grid()
-        self.visited = set()
-        self.weights = dd(lambda: math.inf)
+        self.reset_queue()
+    def reset_queue(self):
+        """start new generation of weights and visited cells and put start on the queue"""
+        state = self.get_step_state()
+        self.weights = CostView(state, self.cols)
         self.heap_queue = []
-        self.weights[self.start] = 0
-        hq.heappush(self.heap_queue, (0,self.start))
+        if self.start is not None:
+            i = self.start[1] * self.cols + self.start[0]
+            state.seen[i] = state.generation
+            state.g[i] = 0
+            self.push(0, self.start)
+    def push(self, g, node):
+        hq.heappush(self.heap_queue, (g, node))
+    def pop(self):
+        return hq.heappop(self.heap_queue)
     def next_step(self):
         if len(self.heap_queue) < 1:
             return False
-        g, u = hq.heappop(self.heap_queue)
-        if self.cell(*u) == "end":
+        g, u = self.pop()
+        code = self.grid.code
+        if code(*u) == END:
             self.end_found = True
             return True
-        self.visited.add(u)
-        self.update_cell(*u, "visited")
+        state, cols = self.step_state, self.cols
+        seen, closed, weights, generation = state.seen, state.closed, state.g, state.generation
+        closed[u[1] * cols + u[0]] = generation
+        if code(*u) == EMPTY:
+            self.grid.set_code(*u, VISITED)
         for v in self.get_neighbours(u):
-            if v not in self.visited:
-                f = g + 1
-                if f < self.weights[v]:
-                    self.weights[v] = f
+            i = v[1] * cols + v[0]
+            if closed[i] != generation:
+                f = g + self.cost(u, v)
+                if seen[i] != generation or f < weights[i]:
+                    seen[i] = generation
+                    weights[i] = f
                     self.parents[v] = u
-                    hq.heappush(self.heap_queue, (f, v))
-        if self.cell(*u) == "start":
+                    self.push(f, v)
+        if code(*u) == START:
             return u, CELL_COLOR.get("start"), "start"
         return u, CELL_COLOR.get("visited"), str(g)
+    def search(self, start, end, trace=None, state=None):
+        """
+        run Dijkstra algorithm from start to end without touching the grid
+        
+        Parameters
+        ----------
+        start : tuple(int, int)
+            position of the start node
+        end : tuple(int, int)
+            position of the end node
+        trace : callable, optional
+            called with every expanded node (x, y)
+        state : Scratch, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        return run_events(self.search_loop(start, end, trace, state), self.cols)
+    def search_loop(self, start, end, trace=None, state=None, emit=False):
+        """loop of Dijkstra search shared by search and events, see Algorithm.events"""
+        grid_map = self.get_map()
+        scratch = self.prepare_state(state)
+        parent = scratch.parent
+        cols = self.cols
+        g, closed = scratch.g, scratch.closed
+        start = start[1] * cols + start[0]
+        end = end[1] * cols + end[0]
+        masks, moves = self.move_table(grid_map)
+        costs = grid_map.costs
+        heappush, heappop = hq.heappush, hq.heappop
+        seen, gen = scratch.seen, scratch.generation
+        seen[start] = gen
+        parent[start] = start
+        g[start] = 0
+        if emit:
+            yield PUSH, start, start
+        heap = [(0, start)]
+        expanded = 0
+        pushed = 1
+        reopened = 0
+        while heap:
+            d, u = heappop(heap)
+            if closed[u] == gen:
+                continue
+            if u == end:
+                if emit:
+                    yield FOUND, end, d
+                return self.make_result(parent, end, expanded, pushed, d, len(heap), reopened)
+            closed[u] = gen
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+            if emit:
+                yield EXPAND, u, parent[u]
+            for offset, step in moves[masks[u]]:
+                v = u + offset
+                if closed[v] == gen:
+                    continue
+                f = d + step * costs[v]
+                if seen[v] != gen:
+                    seen[v] = gen
+                    if emit:
+                        yield PUSH, v, u
+                elif f >= g[v]:
+                    continue
+                else:
+                    reopened += 1
+                    if emit:
+                        yield RELAX, v, u
+                g[v] = f
+                parent[v] = u
+                heappush(heap, (f, v))
+                pushed += 1
+        if emit:
+            yield EXHAUSTED, end, expanded
+        return self.make_result(None, end, expanded, pushed, frontier=0, reopened=reopened)
+    def sweep(self, source):
+        """
+        run Dijkstra algorithm from source to exhaustion
+        and return DistanceField of every reachable cell
+        """
+        cols = self.cols
+        dist, parent = empty_field(cols * self.rows)
+        closed = bytearray(cols * self.rows)
+        masks, moves = self.move_table()
+        costs = self.grid.costs
+        heappush, heappop = hq.heappush, hq.heappop
+        s = self.grid.index(*source)
+        dist[s] = 0
+        parent[s] = s
+        heap = [(0, s)]
+        while heap:
+            d, u = heappop(heap)
+            if closed[u]:
+                continue
+            closed[u] = 1
+            for offset, step in moves[masks[u]]:
+                v = u + offset
+                f = d + step * costs[v]
+                if not closed[v] and (dist[v] < 0 or f < dist[v]):
+                    dist[v] = f
+                    parent[v] = u
+                    heappush(heap, (f, v))
+        return DistanceField(cols, source, dist, parent)
     def cell_content(self, x, y):
         return self.cell(x,y)
  
\ No newline at end of file
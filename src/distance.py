@@ -0,0 +1,65 @@
+"""
+distance fields, shortest path trees from one source to every cell
+"""
+from array import array
+
+
+class DistanceField:
+    """
+    A class representing result of a search from one source run to exhaustion
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    source : tuple(int, int)
+        position of the source node
+    dist : array('i') or numpy.ndarray
+        cost of getting from source to every cell by cell index,
+        -1 for cells which cannot be reached
+    parent : array('i') or numpy.ndarray
+        index of the parent of every reached cell, source is its own parent
+
+    Methods
+    -------
+    distance(node) -> int
+        return cost of getting from source to node, None if unreachable
+    path_to(node) -> list of (int, int)
+        return path from source to node (both included), empty if unreachable
+    index(node) -> int
+        return cell index of node, raise ValueError if it is outside of the grid
+    """
+    __slots__ = ("cols", "source", "dist", "parent")
+    def __init__(self, cols, source, dist, parent):
+        self.cols = cols
+        self.source = source
+        self.dist = dist
+        self.parent = parent
+    def index(self, node):
+        x, y = node
+        cols = self.cols
+        if not (0 <= x < cols and 0 <= y < len(self.dist) // cols):
+            raise ValueError(f"node {node} outside of the grid")
+        return y * cols + x
+    def distance(self, node):
+        d = self.dist[self.index(node)]
+        return None if d < 0 else int(d)
+    def path_to(self, node):
+        cols = self.cols
+        i = self.index(node)
+        if self.dist[i] < 0:
+            return []
+        parent = self.parent
+        path = []
+        while True:
+            path.append((i % cols, i // cols))
+            p = int(parent[i])
+            if p == i:
+                break
+            i = p
+        path.reverse()
+        return path
+
+def empty_field(size):
+    """return dist and parent arrays with every cell unreachable"""
+    return array("i", [-1]) * size, array("i", [-1]) * size
@@ -0,0 +1,250 @@
+from algorithm import *
+
+class Dstar(Algorithm):
+    """
+    A class representing D* Lite incremental pathfinding algorithm
+
+    searches backwards from end, g of a node is its distance to end,
+    rhs is one step lookahead value computed from neighbours, node
+    with g != rhs is inconsistent and waits on the priority queue,
+    search state is kept between searches, walls changed through
+    update_cell only make cells around them inconsistent, so next
+    search repairs just the part of the shortest path tree they affect,
+    moves cost like in Dijkstra, STRAIGHT_COST or DIAGONAL_COST times
+    terrain cost of the entered cell
+
+    moving start keeps the state (keys are corrected by km),
+    moving end, changing directions or changing walls without
+    update_cell starts from scratch
+
+    Attributes
+    ----------
+    g : array('d')
+        distance to end by cell index, inf if unknown
+    rhs : array('d')
+        lookahead distance to end by cell index
+    queue : list
+        binary heap of (k1, k2, cell index) entries
+    queued : dict
+        current key of every cell on the queue, other heap entries are stale
+    km : int
+        sum of heuristic distances start moved since initialization
+    pending : list
+        indices of cells whose walls changed since last search
+
+    Methods
+    -------
+    reset( ) -> None
+        clear grid marks and prepare repair of the search state
+    next_step( ) -> (True,False, None)
+        expand one inconsistent cell
+    solve(trace=None) -> SearchResult
+        repair search state and return path without touching the grid
+    update_cell(x : int, y : int, value : str) -> None
+        set cell and remember it if it's wall changed
+    """
+    weighted = True
+    def __init__(self, cols, rows):
+        """
+        Parameters
+        ----------
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        """
+        super().__init__(cols, rows)
+        self.goal = None
+        self.version = None
+        self.moore = None
+        self.pending = []
+    def resize(self, cols, rows):
+        super().resize(cols, rows)
+        self.goal = None
+        self.version = None
+        self.moore = None
+        self.pending = []
+    def update_cell(self, x, y, value):
+        version = self.grid.version
+        super().update_cell(x, y, value)
+        if self.grid.version != version and self.version == version:
+            self.pending.append(y * self.cols + x)
+            self.version = self.grid.version
+    def h(self, a, b):
+        """return octile (eight directions) or manhattan distance between cell indices in units of cost"""
+        cols = self.cols
+        dx = abs(a % cols - b % cols)
+        dy = abs(a // cols - b // cols)
+        if self.moore:
+            return STRAIGHT_COST * (dx + dy) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * min(dx, dy)
+        return STRAIGHT_COST * (dx + dy)
+    def key(self, u):
+        d = min(self.g[u], self.rhs[u])
+        return d + self.h(self.last_start, u) + self.km, d
+    def initialize(self):
+        """start search state from scratch for current end and walls"""
+        size = self.cols * self.rows
+        self.g = array("d", [math.inf]) * size
+        self.rhs = array("d", [math.inf]) * size
+        self.queue = []
+        self.queued = {}
+        self.km = 0
+        self.goal = self.end[1] * self.cols + self.end[0]
+        self.last_start = self.start[1] * self.cols + self.start[0]
+        self.version = self.grid.version
+        self.moore = self.directions is self.directions8
+        self.pending = []
+        self.rhs[self.goal] = 0
+        self.push(self.goal)
+    def push(self, u):
+        k = self.key(u)
+        self.queued[u] = k
+        hq.heappush(self.queue, (k[0], k[1], u))
+    def pop(self):
+        """remove cell with the lowest key from the queue and return its index"""
+        _, _, u = hq.heappop(self.queue)
+        del self.queued[u]
+        return u
+    def top(self):
+        """return key of the cell with the lowest key, (inf, inf) if queue is empty"""
+        queue, queued = self.queue, self.queued
+        while queue:
+            k1, k2, u = queue[0]
+            if queued.get(u) == (k1, k2):
+                return k1, k2
+            hq.heappop(queue)
+        return math.inf, math.inf
+    def update_vertex(self, u):
+        """recompute rhs of u and put it on the queue if it is inconsistent"""
+        g, rhs = self.g, self.rhs
+        if u != self.goal:
+            best = math.inf
+            if self.grid.cells[u] != WALL:
+                for v, cost in self.index_costs(u):
+                    if g[v] + cost < best:
+                        best = g[v] + cost
+            rhs[u] = best
+        self.queued.pop(u, None)
+        if g[u] != rhs[u]:
+            self.push(u)
+    def prepare(self):
+        """
+        bring search state up to date with the grid, start and end
+
+        end, directions or walls changed behind update_cell's back
+        mean new search, moved start increases km, cells from pending
+        and their neighbours are updated
+        """
+        goal = self.end[1] * self.cols + self.end[0]
+        start = self.start[1] * self.cols + self.start[0]
+        if (self.goal != goal or self.version != self.grid.version or
+            self.moore != (self.directions is self.directions8)):
+            self.initialize()
+        if start != self.last_start:
+            self.km += self.h(self.last_start, start)
+            self.last_start = start
+        for u in self.pending:
+            self.update_vertex(u)
+            for v in self.index_neighbours(u):
+                self.update_vertex(v)
+        self.pending = []
+    def expand(self):
+        """
+        perform one iteration of D* Lite main loop
+
+        return index of processed cell, None if shortest path
+        from start is known
+        """
+        s = self.last_start
+        top = self.top()
+        if not (top < self.key(s) or self.rhs[s] != self.g[s]):
+            return None
+        u = self.pop()
+        new = self.key(u)
+        g, rhs = self.g, self.rhs
+        if top < new:
+            self.push(u)
+        elif g[u] > rhs[u]:
+            g[u] = rhs[u]
+            for v in self.index_neighbours(u):
+                self.update_vertex(v)
+        else:
+            g[u] = math.inf
+            self.update_vertex(u)
+            for v in self.index_neighbours(u):
+                self.update_vertex(v)
+        return u
+    def path_indices(self):
+        """return cell indices of path from start to end, empty if end can't be reached"""
+        g = self.g
+        u = self.last_start
+        if g[u] == math.inf:
+            return []
+        path = [u]
+        while u != self.goal:
+            u = min(self.index_costs(u), key=lambda move: g[move[0]] + move[1])[0]
+            path.append(u)
+        return path
+    def reset(self):
+        """
+        clear visited and path cells in the grid and prepare next search,
+        search state is kept and only repaired by following steps
+        """
+        self.reset_grid()
+        self.parents = dd()
+        self.end_found = False
+        self.prepare()
+    def next_step(self):
+        """
+        perform one step of D* Lite
+
+        if cant find end return False
+        if shortest path is known return True
+        else (x,y), color, content
+        """
+        u = self.expand()
+        if u is None:
+            path = self.path_indices()
+            if not path:
+                return False
+            cols = self.cols
+            for a, b in zip(path, path[1:]):
+                self.parents[(b % cols, b // cols)] = (a % cols, a // cols)
+            self.end_found = True
+            return True
+        node = (u % self.cols, u // self.cols)
+        if self.grid.code(*node) == EMPTY:
+            self.grid.set_code(*node, VISITED)
+        return node, CELL_COLOR.get(self.cell(*node)), str(self.g[u])
+    def solve(self, trace=None):
+        """
+        repair search state and return path from start to end
+
+        expanded counts only cells processed by this call,
+        grid is not touched
+
+        Parameters
+        ----------
+        trace : callable, optional
+            called with every processed cell (x, y)
+        """
+        self.check_placed()
+        cells = self.grid.cells
+        if cells[self.grid.index(*self.start)] == WALL or cells[self.grid.index(*self.end)] == WALL:
+            return SearchResult(False, [], None, 0, 0)
+        self.prepare()
+        cols = self.cols
+        expanded = 0
+        while True:
+            u = self.expand()
+            if u is None:
+                break
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+        path = [(i % cols, i // cols) for i in self.path_indices()]
+        if not path:
+            return SearchResult(False, [], None, expanded, expanded)
+        return SearchResult(True, path, int(self.g[self.last_start]), expanded, expanded)
+    def cell_content(self, x, y):
+        return self.cell(x, y)
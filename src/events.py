@@ -0,0 +1,184 @@
+"""
+events of searches for consumers other than the GUI
+
+Algorithm.events yields every event as a tuple of three ints
+(kind, cell, value), cell is the cell index y * cols + x:
+
+    EXPAND     cell was expanded, value is index of its parent
+    PUSH       cell was reached first time and put on the frontier,
+               value is index of its parent
+    RELAX      reached cell got cheaper path and was put on the
+               frontier again, value is index of its new parent
+    FOUND      search ended in end cell, value is cost of the path
+    EXHAUSTED  search ended without reaching end cell, value is
+               number of expanded cells
+
+start cell is its own parent, FOUND or EXHAUSTED is always the
+last event, batched packs events into int64 buffers, a trace file
+is a map file with EVENTS sections of such buffers appended as
+the search goes on
+"""
+import os
+from array import array
+from itertools import chain, islice
+from mapfile import MapFile, write_map, write_section
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EXPAND = 0
+PUSH = 1
+RELAX = 2
+FOUND = 3
+EXHAUSTED = 4
+
+KINDS = ("expand", "push", "relax", "found", "exhausted")
+
+# events in one buffer of batched
+BATCH = 4096
+# tag of sections with buffers of events in trace files
+EVENTS = b"EVNT"
+# bytes of one event in buffers
+EVENT_BYTES = 3 * 8
+
+
+def batched(events, size=BATCH, numpy=False):
+    """
+    pack events into buffers of size events (the last one can be shorter)
+
+    buffers are array('q') of kind, cell, value of every event in turn,
+    with numpy set (size, 3) int64 arrays viewing them, every buffer is new
+    """
+    if numpy and np is None:
+        raise ImportError("batched needs numpy for numpy buffers")
+    events = iter(events)
+    while True:
+        buffer = array("q", chain.from_iterable(islice(events, size)))
+        if not buffer:
+            return
+        yield np.frombuffer(buffer, dtype=np.int64).reshape(-1, 3) if numpy else buffer
+        if len(buffer) < 3 * size:
+            return
+
+def unbatched(buffers):
+    """yield events of buffers made by batched"""
+    for buffer in buffers:
+        if np is not None and isinstance(buffer, np.ndarray):
+            buffer = buffer.ravel().tolist()
+        values = iter(buffer)
+        yield from zip(values, values, values)
+
+def run_events(events, cols, trace=None):
+    """
+    consume events of Algorithm.events and return SearchResult returned by it
+
+    Parameters
+    ----------
+    events : generator of tuple(int, int, int)
+        events of one search
+    cols : int
+        numbers of column in the grid
+    trace : callable, optional
+        called with every expanded node (x, y)
+    """
+    try:
+        while True:
+            kind, cell, _ = next(events)
+            if kind == EXPAND and trace is not None:
+                trace((cell % cols, cell // cols))
+    except StopIteration as stop:
+        return stop.value
+
+def describe(event, cols):
+    """return event as readable tuple(str, (int, int), int)"""
+    kind, cell, value = event
+    return KINDS[kind], (cell % cols, cell // cols), value
+
+
+class TraceRecorder:
+    """
+    A class writing map and events of one search to a trace file
+
+    map is written when the recorder is made, every write appends
+    one EVENTS section, file gets its path only when it is closed
+
+    Attributes
+    ----------
+    path : str
+        path of the trace file
+    count : int
+        number of events written
+
+    Methods
+    -------
+    write(buffer) -> None
+        append buffer of events made by batched
+    close( ) -> None
+        finish the file
+    """
+    def __init__(self, path, grid, start, end):
+        """
+        Parameters
+        ----------
+        path : str
+            path of the trace file
+        grid : Grid
+            grid of the searched map
+        start, end : tuple(int, int)
+            positions of start and end node of the search
+        """
+        self.path = path
+        self.temporary = path + ".tmp"
+        self.file = open(self.temporary, "wb")
+        self.count = 0
+        write_map(self.file, grid, start, end)
+    def write(self, buffer):
+        buffer = memoryview(buffer)
+        write_section(self.file, EVENTS, [buffer])
+        self.count += buffer.nbytes // EVENT_BYTES
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            os.replace(self.temporary, self.path)
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+
+def record(algorithm, path, start=None, end=None, size=BATCH):
+    """
+    run search of algorithm from start to end (placed ones by default),
+    write its trace to path and return number of events
+    """
+    start = algorithm.start if start is None else start
+    end = algorithm.end if end is None else end
+    events = algorithm.events(start, end)
+    with TraceRecorder(path, algorithm.grid, start, end) as recorder:
+        for buffer in batched(events, size):
+            recorder.write(buffer)
+    return recorder.count
+
+
+class Trace(MapFile):
+    """
+    A class representing memory mapped trace file written by TraceRecorder
+
+    Methods
+    -------
+    buffers( ) -> generator of array('q')
+        copies of EVENTS sections in order
+    events( ) -> generator of tuple(int, int, int)
+        recorded events in order
+    """
+    def buffers(self):
+        # no view of the mapping is kept between buffers, so the trace can be closed early
+        i = 0
+        while i < len(self.sections.get(EVENTS, ())):
+            buffer = array("q")
+            buffer.frombytes(self.sections[EVENTS][i])
+            i += 1
+            yield buffer
+    def events(self):
+        return unbatched(self.buffers())
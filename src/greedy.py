@@ -7,29 +7,59 @@ class Greedy(Algorithm):
     Best-first search is a class of search algorithms,
     which explore a graph by expanding the most promising node
     chosen according to heuristic
+    
+    heuristic is manhattan distance, with landmarks set it is
+    the higher of it (in units of cost) and landmark lower bound
+    
+    Attributes
+    ----------
+    open : list(tuple(int, tuple(int, int)))
+        binary heap of (h, node) entries of nodes to visit
+    step_state : Scratch
+        cells which were put on the open heap are seen in the current generation
+    alt : callable
+        landmark heuristic for the end node, None without landmarks
     """
     def __init__(self, cols, rows):
         super().__init__(cols, rows)
-        self.open = []
-        self.closed = set()
-        self.g = dd(lambda: 0)
-        self.f = dd(lambda: 0)
-        self.g[self.start] = 0
-        self.open.append(self.start)
+        self.reset_open()
     def reset(self):
         """
         reset values in the grid except walls, start, end node
         
         clears grid of visited and path nodes,
-        clears g, f, closed sets and open list
+        starts new generation of step_state and clears open heap
         """
         self.reset_grid()
+        self.reset_open()
+    def reset_open(self):
+        """
+        starts new generation of seen cells and clears open heap,
+        puts start node on the open heap if start is placed
+        """
+        self.get_step_state()
         self.open = []
-        self.closed = set()
-        self.g = dd(lambda: 0)
-        self.f = dd(lambda: 0)
-        self.g[self.start] = 0
-        self.open.append(self.start)
+        self.alt = None
+        if self.end is not None:
+            self.alt = self.landmark_heuristic(self.end[1] * self.cols + self.end[0],
+                                               None if self.start is None else self.start[1] * self.cols + self.start[0])
+        if self.start is not None:
+            self.push(self.start)
+    def push(self, node):
+        """
+        put node on the open heap keyed by its heuristic value
+        
+        Parameters
+        ----------
+        node : tuple(int, int)
+            node on the grid
+        """
+        state = self.step_state
+        state.seen[node[1] * self.cols + node[0]] = state.generation
+        hq.heappush(self.open, (self.h(node), node))
+    def pop(self):
+        """remove and return (h, node) entry with the lowest h from the open heap"""
+        return hq.heappop(self.open)
     def next_step(self):
         """
         perform one step of Greedy Bfs algorithm
@@ -38,42 +68,93 @@ class Greedy(Algorithm):
         if found end in this step return True
         else (x,y), color, content
         
-        find node with lowest h value in the open list
-        add this node to closed set and check if it is end
-        find neighbours of current node and if neighbour is
-        already visited check if it could have lower g value
-        if so update g value and set current as parent of neighbour
-        else add neighbour on open list
+        pop node with lowest h value from the open heap
+        and check if it is end
+        push every neighbour of current node which was not
+        seen yet on the open heap and set current as its parent
         
         """
-        if len(self.open) <= 0:
+        if not self.open:
             return False
-        current_node = self.open[0]
-        current_index = 0
-        for index, item in enumerate(self.open):
-            if self.f[item] < self.f[current_node]:
-                current_node = item
-                current_index = index
-        # pop current, add to closed
-        self.open.pop(current_index)
-        self.closed.add(current_node)
-        if self.cell(*current_node) == "end":
+        h, current_node = self.pop()
+        if self.grid.code(*current_node) == END:
             self.end_found = True
             return True
         ix, iy = current_node
-        if self.grid[iy][ix] == "empty":
-            self.grid[iy][ix] = "visited"
+        index = iy * self.cols + ix
+        cells = self.grid.cells
+        if cells[index] == EMPTY:
+            cells[index] = VISITED
+        state, cols = self.step_state, self.cols
+        seen, generation = state.seen, state.generation
         for v in self.get_neighbours(current_node):
-            if v not in self.closed:
-                # self.g[v] = self.g[current_node] + 1
-                self.f[v] = self.h(v)
-                for open_node in self.open:
-                    if v == open_node and self.g[v] > self.g[open_node]:
-                        continue
+            if seen[v[1] * cols + v[0]] != generation:
                 self.parents[v] = current_node
-                if v not in self.open:
-                    self.open.append(v)
-        return current_node, CELL_COLOR.get(self.grid[iy][ix]), f"{self.h(current_node)}"           
+                self.push(v)
+        return current_node, CELL_COLOR.get(NAMES[cells[index]]), f"{h}"
+    def search(self, start, end, trace=None, state=None):
+        """
+        run Greedy Best First Search from start to end without touching the grid
+        
+        Parameters
+        ----------
+        start : tuple(int, int)
+            position of the start node
+        end : tuple(int, int)
+            position of the end node
+        trace : callable, optional
+            called with every expanded node (x, y)
+        state : Scratch, optional
+            buffers of the search, by default the ones from get_scratch
+        """
+        return run_events(self.search_loop(start, end, trace, state), self.cols)
+    def search_loop(self, start, end, trace=None, state=None, emit=False):
+        """loop of Greedy Best First Search shared by search and events, see Algorithm.events"""
+        grid_map = self.get_map()
+        scratch = self.prepare_state(state)
+        parent = scratch.parent
+        cols = self.cols
+        start = start[1] * cols + start[0]
+        ex, ey = end
+        end = ey * cols + ex
+        masks, offsets = self.neighbour_table(grid_map)
+        heappush, heappop = hq.heappush, hq.heappop
+        alt = self.landmark_heuristic(end, start)
+        seen, gen = scratch.seen, scratch.generation
+        seen[start] = gen
+        parent[start] = start
+        if emit:
+            yield PUSH, start, start
+        reached = 1
+        heap = [(0, start)]
+        expanded = 0
+        while heap:
+            _, u = heappop(heap)
+            if u == end:
+                res = self.make_result(parent, end, expanded, reached)
+                if emit:
+                    yield FOUND, end, res.cost
+                return res
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+            if emit:
+                yield EXPAND, u, parent[u]
+            for d in offsets[masks[u]]:
+                v = u + d
+                if seen[v] != gen:
+                    seen[v] = gen
+                    parent[v] = u
+                    reached += 1
+                    h = abs(v % cols - ex) + abs(v // cols - ey)
+                    if alt is not None:
+                        h = max(STRAIGHT_COST * h, alt(v))
+                    heappush(heap, (h, v))
+                    if emit:
+                        yield PUSH, v, u
+        if emit:
+            yield EXHAUSTED, end, expanded
+        return self.make_result(None, end, expanded, reached)
     def h(self, node):
         """
         return heuristic (estimated) distance from the current node to the end node
@@ -91,6 +172,8 @@ class Greedy(Algorithm):
         x2, y2 = self.end
         a = x1 - x2
         b = y1 - y2
+        if self.alt is not None:
+            return max(STRAIGHT_COST * (abs(a) + abs(b)), self.alt(y1 * self.cols + x1))
         return abs(a) + abs(b)
     def cell_content(self, x, y):
         """
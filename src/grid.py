@@ -0,0 +1,217 @@
+"""
+compact grid of cells used by pathfinding algorithms
+
+state of every cell is stored as a small integer code in one flat
+bytearray addressed by y * cols + x, strings are only produced
+by the row view used by the GUI, terrain cost of entering every
+cell is kept in a second bytearray of the same layout
+"""
+from adjacency import Adjacency
+
+EMPTY = 0
+WALL = 1
+VISITED = 2
+PATH = 3
+START = 4
+END = 5
+
+NAMES = ("empty", "wall", "visited", "path", "start", "end")
+CODES = {name: code for code, name in enumerate(NAMES)}
+
+MAX_COST = 255
+
+# translation table which turns visited and path cells back to empty
+_CLEAR_MARKS = bytes(EMPTY if code in (VISITED, PATH) else code for code in range(256))
+# translation table which turns walls into 0 and every other cell into 1
+_FREE = bytes(int(code != WALL) for code in range(256))
+# translation table which turns cost 1 into 0 and every other cost into 1
+_WEIGHTED = bytes(int(cost != 1) for cost in range(256))
+# translation table which keeps walls and turns every other cell into empty
+_WALLS = bytes(WALL if code == WALL else EMPTY for code in range(256))
+
+
+class GridRow:
+    """
+    A view of one row of the grid which reads and writes cell names
+
+    grid[y][x] returns name of the cell like "wall" and
+    grid[y][x] = "wall" stores code of that name
+    """
+    __slots__ = ("grid", "y")
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.y = y
+    def __getitem__(self, x):
+        return NAMES[self.grid.cells[self.grid.index(x, self.y)]]
+    def __setitem__(self, x, value):
+        self.grid.set_code(x, self.y, CODES[value])
+    def __len__(self):
+        return self.grid.cols
+    def __iter__(self):
+        offset = self.y * self.grid.cols
+        for code in self.grid.cells[offset:offset + self.grid.cols]:
+            yield NAMES[code]
+
+
+class GridMap:
+    """
+    An immutable snapshot of walls, terrain costs and neighbour masks of a grid
+
+    searches only read the map, so any number of them can share it,
+    everything a search changes is kept in its own Scratch
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    cells : bytes
+        WALL for walls and EMPTY for every other cell
+    costs : bytes
+        terrain cost of entering every cell
+    adjacency : Adjacency
+        neighbour bitmasks of cells, never patched
+    version : int
+        version of the grid the map was taken from
+    """
+    __slots__ = ("cols", "rows", "cells", "costs", "adjacency", "version")
+    def __init__(self, cols, rows, cells, costs, adjacency, version):
+        self.cols = cols
+        self.rows = rows
+        self.cells = cells
+        self.costs = costs
+        self.adjacency = adjacency
+        self.version = version
+
+
+class Grid:
+    """
+    A class representing grid of cells as flat array of codes
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    cells : bytearray
+        codes of all cells, cell x, y is at index y * cols + x
+    costs : bytearray
+        terrain cost of entering every cell, from 1 to MAX_COST,
+        same layout as cells
+    version : int
+        incremented every time a wall is placed or removed by set_code
+        or a cost is changed by set_cost
+    adjacency : Adjacency
+        neighbour bitmasks of cells, None until get_adjacency is called,
+        then patched by set_code whenever a wall changes
+
+    Methods
+    -------
+    index(x : int, y : int) -> int
+        return index of cell x, y in cells
+    code(x : int, y : int) -> int
+        return code of cell at position x, y
+    set_code(x : int, y : int, code : int) -> None
+        set code of cell at position x, y
+    cost(x : int, y : int) -> int
+        return terrain cost of cell at position x, y
+    set_cost(x : int, y : int, cost : int) -> None
+        set terrain cost of cell at position x, y
+    assign(cells : bytes, costs : bytes = None) -> None
+        replace codes (and costs) of all cells at once
+    get_adjacency( ) -> Adjacency
+        return neighbour bitmasks of cells, built on first use
+    snapshot( ) -> GridMap
+        return immutable copy of walls, costs and neighbour masks
+    clear_marks( ) -> None
+        turn visited and path cells back to empty cells
+    unmarked( ) -> bytes
+        return codes of all cells with visited and path cells as empty
+    walls( ) -> generator of (int, int)
+        positions of all walls
+    weighted( ) -> generator of (int, int, int)
+        positions and costs of all cells with cost other than 1
+    """
+    def __init__(self, cols, rows):
+        """
+        Parameters
+        ----------
+        cols : int
+            numbers of column in the grid
+        rows : int
+            number of rows in the grid
+        """
+        self.cols = cols
+        self.rows = rows
+        self.cells = bytearray(cols * rows)
+        self.costs = bytearray(b"\x01") * (cols * rows)
+        self.version = 0
+        self.adjacency = None
+    def index(self, x, y):
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            raise IndexError(f"cell {x},{y} outside of {self.cols}x{self.rows} grid")
+        return y * self.cols + x
+    def code(self, x, y):
+        return self.cells[self.index(x, y)]
+    def set_code(self, x, y, code):
+        i = self.index(x, y)
+        if (self.cells[i] == WALL) != (code == WALL):
+            self.version += 1
+            if self.adjacency is not None:
+                self.adjacency.patch(i, code != WALL)
+        self.cells[i] = code
+    def assign(self, cells, costs=None):
+        size = self.cols * self.rows
+        if len(cells) != size or (costs is not None and len(costs) != size):
+            raise ValueError(f"expected {size} cells of {self.cols}x{self.rows} grid")
+        self.cells[:] = cells
+        if costs is not None:
+            if 0 in costs:
+                raise ValueError(f"cost 0 outside of 1..{MAX_COST}")
+            self.costs[:] = costs
+        self.version += 1
+        self.adjacency = None
+    def get_adjacency(self):
+        if self.adjacency is None:
+            self.adjacency = Adjacency(self.cols, self.rows, self.cells.translate(_FREE))
+        return self.adjacency
+    def snapshot(self):
+        return GridMap(self.cols, self.rows, self.cells.translate(_WALLS), bytes(self.costs),
+                       self.get_adjacency().frozen(), self.version)
+    def cost(self, x, y):
+        return self.costs[y * self.cols + x]
+    def set_cost(self, x, y, cost):
+        i = self.index(x, y)
+        if not 1 <= cost <= MAX_COST:
+            raise ValueError(f"cost {cost} outside of 1..{MAX_COST}")
+        if self.costs[i] != cost:
+            self.version += 1
+            self.costs[i] = cost
+    def clear_marks(self):
+        self.cells[:] = self.cells.translate(_CLEAR_MARKS)
+    def unmarked(self):
+        return self.cells.translate(_CLEAR_MARKS)
+    def walls(self):
+        cols = self.cols
+        i = self.cells.find(WALL)
+        while i != -1:
+            yield i % cols, i // cols
+            i = self.cells.find(WALL, i + 1)
+    def weighted(self):
+        cols = self.cols
+        mask = self.costs.translate(_WEIGHTED)
+        i = mask.find(1)
+        while i != -1:
+            yield i % cols, i // cols, self.costs[i]
+            i = mask.find(1, i + 1)
+    def __getitem__(self, y):
+        if not 0 <= y < self.rows:
+            raise IndexError(f"row {y} outside of {self.cols}x{self.rows} grid")
+        return GridRow(self, y)
+    def __len__(self):
+        return self.rows
+    def __iter__(self):
+        for y in range(self.rows):
+            yield GridRow(self, y)
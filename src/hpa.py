@@ -0,0 +1,467 @@
+from algorithm import *
+
+class ClusterGraph:
+    """
+    A class representing abstraction of the grid used by hierarchical search
+
+    grid is divided into square clusters, free cells on both sides of
+    cluster borders are grouped into entrances, every entrance gives one
+    or two pairs of transition cells, transition cells of one cluster
+    are connected by edges with their distances inside the cluster,
+    distances are costs of moves like in Dijkstra, so edges of a pair
+    of transitions can differ in each direction
+
+    straight entrances follow HPA*, run of free border cells shorter
+    than 6 gets one transition in the middle, longer gets two at its ends,
+    with eight directions a diagonal move squeezing between two walls
+    across a border is an entrance on its own, so every path on the grid
+    has a counterpart in the abstract graph
+
+    Attributes
+    ----------
+    size : int
+        width and height of clusters in cells
+    ccols : int
+        number of clusters in a row
+    crows : int
+        number of clusters in a column
+    moore : bool
+        True if graph was built for eight directions
+    version : int
+        version of the grid the graph is synchronized with
+    borders : dict
+        list of (a, b) transition cell pairs by pair of adjacent clusters
+    crossings : dict
+        transition cells on the other side of borders by transition cell
+    nodes : dict
+        transition cells by cluster
+    edges : dict
+        list of (cell, distance) inside cluster by cluster and transition cell
+    dirty : set
+        clusters with changed cells not rebuilt yet
+    dirty_borders : set
+        clusters with changed cells on their edge
+    rebuilt : set
+        clusters rebuilt by the last refresh
+
+    Methods
+    -------
+    refresh( ) -> None
+        bring graph up to date with the grid
+    mark_dirty(x : int, y : int) -> None
+        remember that cell x, y changed
+    cluster(index : int) -> int
+        return cluster of cell at index
+    local_search(source, c, target=None, reverse=False) -> (dict, dict)
+        Dijkstra search restricted to cluster c
+    """
+    def __init__(self, algorithm, size):
+        """
+        Parameters
+        ----------
+        algorithm : Algorithm
+            algorithm which grid and directions are used
+        size : int
+            width and height of clusters in cells
+        """
+        self.algorithm = algorithm
+        self.size = size
+        self.ccols = -(-algorithm.cols // size)
+        self.crows = -(-algorithm.rows // size)
+        self.version = None
+        self.moore = None
+        self.borders = {}
+        self.crossings = dd(list)
+        self.nodes = {}
+        self.edges = {}
+        self.dirty = set()
+        self.dirty_borders = set()
+        self.rebuilt = set()
+    def cluster(self, index):
+        cols, size = self.algorithm.cols, self.size
+        return (index // cols // size) * self.ccols + index % cols // size
+    def bounds(self, c):
+        """return x0, y0, x1, y1 of cluster c, x1 and y1 excluded"""
+        size = self.size
+        x0 = c % self.ccols * size
+        y0 = c // self.ccols * size
+        return x0, y0, min(x0 + size, self.algorithm.cols), min(y0 + size, self.algorithm.rows)
+    def border_keys(self, c):
+        """return keys of borders of cluster c with all adjacent clusters"""
+        cx, cy = c % self.ccols, c // self.ccols
+        keys = []
+        for dx, dy in self.algorithm.directions:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < self.ccols and 0 <= ny < self.crows:
+                n = ny * self.ccols + nx
+                keys.append((min(c, n), max(c, n)))
+        return keys
+    def mark_dirty(self, x, y):
+        size = self.size
+        c = (y // size) * self.ccols + x // size
+        self.dirty.add(c)
+        if x % size in (0, size - 1) or y % size in (0, size - 1):
+            self.dirty_borders.add(c)
+    def refresh(self):
+        """
+        bring graph up to date with the grid
+
+        rebuild everything if walls changed without mark_dirty
+        or directions changed, else rescan only borders of dirty
+        clusters and reconnect clusters whose transitions changed
+        """
+        alg = self.algorithm
+        moore = alg.directions is alg.directions8
+        if self.version != alg.grid.version or self.moore != moore:
+            self.version = alg.grid.version
+            self.moore = moore
+            self.borders = {}
+            self.crossings = dd(list)
+            self.dirty_borders = set(range(self.ccols * self.crows))
+            self.dirty = set(self.dirty_borders)
+        if not self.dirty:
+            self.rebuilt = set()
+            return
+        changed = set(self.dirty)
+        keys = set()
+        for c in self.dirty_borders:
+            keys.update(self.border_keys(c))
+            if self.moore:
+                # corner cell of c decides diagonal entrances
+                # between two clusters touching c at that corner
+                for key in self.border_keys(c):
+                    for n in key:
+                        keys.update(self.border_keys(n))
+        for key in keys:
+            entrances = self.scan_border(key)
+            old = self.borders.get(key, [])
+            if entrances == old:
+                continue
+            for a, b in old:
+                self.crossings[a].remove(b)
+                self.crossings[b].remove(a)
+            for a, b in entrances:
+                self.crossings[a].append(b)
+                self.crossings[b].append(a)
+            self.borders[key] = entrances
+            changed.update(key)
+        for c in changed:
+            self.connect(c)
+        self.rebuilt = changed
+        self.dirty = set()
+        self.dirty_borders = set()
+    def scan_border(self, key):
+        """return list of (a, b) transition pairs between two adjacent clusters"""
+        c1, c2 = key
+        alg = self.algorithm
+        cols = alg.cols
+        cells = alg.grid.cells
+        free = lambda x, y: cells[y * cols + x] != WALL
+        ax0, ay0, ax1, ay1 = self.bounds(c1)
+        bx0, by0, bx1, by1 = self.bounds(c2)
+        entrances = []
+        if ay0 == by0 or ax0 == bx0:
+            if ay0 == by0:
+                # c2 is right of c1, border cells pairs (ax, y), (bx, y)
+                line = [((ax1 - 1, y), (bx0, y)) for y in range(ay0, ay1)]
+            else:
+                # c2 is below c1, border cells pairs (x, ay), (x, by)
+                line = [((x, ay1 - 1), (x, by0)) for x in range(ax0, ax1)]
+            run = []
+            for a, b in line + [(None, None)]:
+                if a is not None and free(*a) and free(*b):
+                    run.append((a, b))
+                    continue
+                if len(run) >= 6:
+                    entrances += [run[0], run[-1]]
+                elif run:
+                    entrances.append(run[len(run) // 2])
+                run = []
+            if self.moore:
+                for (a, b), (a2, b2) in zip(line, line[1:]):
+                    for p, q in [(a, b2), (a2, b)]:
+                        if free(*p) and free(*q) and not free(q[0], p[1]) and not free(p[0], q[1]):
+                            entrances.append((p, q))
+        else:
+            # diagonal neighbours touching at a corner
+            a = (ax1 - 1, ay1 - 1) if bx0 > ax0 else (ax0, ay1 - 1)
+            b = (bx0, by0) if bx0 > ax0 else (bx1 - 1, by0)
+            if free(*a) and free(*b) and not free(b[0], a[1]) and not free(a[0], b[1]):
+                entrances.append((a, b))
+        return [(ay * cols + ax, by * cols + bx) for (ax, ay), (bx, by) in entrances]
+    def connect(self, c):
+        """find transition cells of cluster c and distances between them"""
+        nodes = set()
+        for key in self.border_keys(c):
+            for a, b in self.borders.get(key, []):
+                nodes.add(a if key[0] == c else b)
+        nodes = sorted(nodes)
+        self.nodes[c] = nodes
+        edges = {}
+        for u in nodes:
+            dist, _ = self.local_search(u, c)
+            edges[u] = [(v, dist[v]) for v in nodes if v != u and v in dist]
+        self.edges[c] = edges
+    def local_search(self, source, c, target=None, reverse=False):
+        """
+        Dijkstra search from source which doesn't leave cluster c
+
+        return dictionaries of distances and parents of reached cells,
+        stops early when target is reached, with reverse distances
+        are costs of getting from reached cells to source
+        """
+        alg = self.algorithm
+        cols = alg.cols
+        masks, moves = alg.move_table()
+        costs = alg.grid.costs
+        x0, y0, x1, y1 = self.bounds(c)
+        dist = {source: 0}
+        parents = {source: source}
+        heap = [(0, source)]
+        while heap:
+            du, u = hq.heappop(heap)
+            if du > dist[u]:
+                continue
+            if u == target:
+                break
+            cu = costs[u]
+            for d, step in moves[masks[u]]:
+                v = u + d
+                dv = du + step * (cu if reverse else costs[v])
+                if dv < dist.get(v, math.inf):
+                    y, x = divmod(v, cols)
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        dist[v] = dv
+                        parents[v] = u
+                        hq.heappush(heap, (dv, v))
+        return dist, parents
+
+class Hpa(Algorithm):
+    """
+    A class representing hierarchical pathfinding (HPA*)
+
+    query is answered by A* on the abstract graph of cluster transitions
+    (ClusterGraph) with start and end connected to transitions of their
+    clusters, abstract path is then refined to cells by searches inside
+    single clusters, paths are close to optimal but not always shortest,
+    moves cost like in Dijkstra
+
+    abstract graph is built on first query and kept, cells changed by
+    update_cell rebuild only their cluster and its neighbours whose
+    transitions changed
+
+    Attributes
+    ----------
+    graph : ClusterGraph
+        abstraction of the grid
+    open : list
+        binary heap of (f, h, cell index) of abstract nodes to visit
+    g : dict
+        cost of getting from start to abstract node
+    links : dict
+        abstract edges of start and to end added for current query
+
+    Methods
+    -------
+    reset( ) -> None
+        update abstraction and prepare search from start to end
+    next_step( ) -> (True,False, None)
+        expand one abstract node
+    solve(trace=None) -> SearchResult
+        run whole search without touching the grid
+    update_cell(x : int, y : int, value : str) -> None
+        set cell and mark its cluster for rebuilding
+    """
+    cluster_size = 10
+    weighted = True
+    def __init__(self, cols, rows, cluster_size=None):
+        """
+        Parameters
+        ----------
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        cluster_size : int, optional
+            width and height of clusters, 10 by default
+        """
+        super().__init__(cols, rows)
+        if cluster_size is not None:
+            self.cluster_size = cluster_size
+        self.graph = ClusterGraph(self, self.cluster_size)
+        self.open = []
+        self.g = {}
+        self.closed = set()
+        self.abstract_parents = {}
+        self.links = {}
+    def resize(self, cols, rows):
+        super().resize(cols, rows)
+        self.graph = ClusterGraph(self, self.cluster_size)
+        self.open = []
+        self.g = {}
+        self.closed = set()
+        self.abstract_parents = {}
+        self.links = {}
+    def update_cell(self, x, y, value):
+        version = self.grid.version
+        super().update_cell(x, y, value)
+        if self.grid.version != version and self.graph.version == version:
+            self.graph.mark_dirty(x, y)
+            self.graph.version = self.grid.version
+    def reset(self):
+        self.reset_grid()
+        self.prepare()
+    def prepare(self):
+        """
+        refresh abstract graph and connect start and end to it
+
+        start gets edges to transitions of its cluster, transitions of
+        end cluster get edges to end and if both are in one cluster
+        start gets edge to end found inside it
+        """
+        self.graph.refresh()
+        graph = self.graph
+        cols = self.cols
+        self.start_index = self.start[1] * cols + self.start[0]
+        self.end_index = self.end[1] * cols + self.end[0]
+        s, t = self.start_index, self.end_index
+        cs, ct = graph.cluster(s), graph.cluster(t)
+        dist, _ = graph.local_search(s, cs)
+        self.links = {s: [(v, dist[v]) for v in graph.nodes.get(cs, []) if v in dist and v != s]}
+        if t in dist:
+            self.links[s].append((t, dist[t]))
+        dist, _ = graph.local_search(t, ct, reverse=True)
+        for v in graph.nodes.get(ct, []):
+            if v in dist and v != t:
+                self.links.setdefault(v, []).append((t, dist[v]))
+        self.open = []
+        self.g = {s: 0}
+        self.closed = set()
+        self.abstract_parents = {s: s}
+        self.parents = dd()
+        self.end_found = False
+        self.push(s, 0)
+    def h(self, index):
+        x, y = index % self.cols, index // self.cols
+        a, b = abs(x - self.end[0]), abs(y - self.end[1])
+        if self.directions is self.directions8:
+            return STRAIGHT_COST * (a + b) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * min(a, b)
+        return STRAIGHT_COST * (a + b)
+    def push(self, u, g):
+        h = self.h(u)
+        hq.heappush(self.open, (g + h, h, u))
+    def pop(self):
+        """remove and return abstract node with the lowest f which is not closed, None if there is none"""
+        while self.open:
+            _, _, u = hq.heappop(self.open)
+            if u not in self.closed:
+                return u
+        return None
+    def abstract_neighbours(self, u):
+        graph = self.graph
+        neighbours = list(self.links.get(u, []))
+        if u != self.start_index:
+            neighbours += graph.edges.get(graph.cluster(u), {}).get(u, [])
+        cols = self.cols
+        node = (u % cols, u // cols)
+        neighbours += [(v, self.cost(node, (v % cols, v // cols))) for v in graph.crossings.get(u, [])]
+        return neighbours
+    def expand(self):
+        """
+        pop abstract node with the lowest f and push its neighbours
+
+        return index of expanded node, None if open heap is empty
+        """
+        u = self.pop()
+        if u is None:
+            return None
+        self.closed.add(u)
+        if u == self.end_index:
+            return u
+        gu = self.g[u]
+        for v, d in self.abstract_neighbours(u):
+            gv = gu + d
+            if v not in self.closed and gv < self.g.get(v, math.inf):
+                self.g[v] = gv
+                self.abstract_parents[v] = u
+                self.push(v, gv)
+        return u
+    def refine(self):
+        """return cell indices of path from start to end through abstract path"""
+        abstract = [self.end_index]
+        while abstract[-1] != self.start_index:
+            abstract.append(self.abstract_parents[abstract[-1]])
+        abstract.reverse()
+        graph = self.graph
+        path = [abstract[0]]
+        for u, v in zip(abstract, abstract[1:]):
+            c = graph.cluster(u)
+            if c != graph.cluster(v):
+                path.append(v)
+                continue
+            _, parents = graph.local_search(u, c, v)
+            segment = []
+            node = v
+            while node != u:
+                segment.append(node)
+                node = parents[node]
+            path.extend(reversed(segment))
+        return path
+    def next_step(self):
+        """
+        perform one step of hierarchical search
+
+        if cant find end return False
+        if found end in this step return True
+        else (x,y), color, content
+
+        expands one node of the abstract graph, when end is reached
+        path is refined and stored in parents for reconstruct_path
+        """
+        if self.end_found:
+            return True
+        u = self.expand()
+        if u is None:
+            return False
+        if u == self.end_index:
+            path = self.refine()
+            cols = self.cols
+            for a, b in zip(path, path[1:]):
+                self.parents[(b % cols, b // cols)] = (a % cols, a // cols)
+            self.end_found = True
+            return True
+        node = (u % self.cols, u // self.cols)
+        if self.grid.code(*node) == EMPTY:
+            self.grid.set_code(*node, VISITED)
+        return node, CELL_COLOR.get(self.cell(*node)), str(self.g[u])
+    def solve(self, trace=None):
+        """
+        run hierarchical search to completion without touching the grid
+
+        abstract nodes are expanded, traced and counted,
+        returned path is refined to cells
+
+        Parameters
+        ----------
+        trace : callable, optional
+            called with every expanded abstract node (x, y)
+        """
+        self.check_placed()
+        cells = self.grid.cells
+        cols = self.cols
+        if cells[self.grid.index(*self.start)] == WALL or cells[self.grid.index(*self.end)] == WALL:
+            return SearchResult(False, [], None, 0, 0)
+        self.prepare()
+        expanded = 0
+        while True:
+            u = self.expand()
+            if u is None:
+                return SearchResult(False, [], None, expanded, len(self.g))
+            if u == self.end_index:
+                path = [(i % cols, i // cols) for i in self.refine()]
+                return SearchResult(True, path, self.g[u], expanded, len(self.g))
+            expanded += 1
+            if trace is not None:
+                trace((u % cols, u // cols))
+    def cell_content(self, x, y):
+        return self.cell(x, y)
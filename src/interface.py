@@ -1,15 +1,19 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 import random
 from colors import *
-import pickle
 import os
 from algorithm import *
-from astar import Astar
-from dfs import Dfs
 from bfs import Bfs
-from dijkstra import Dijkstra
-from greedy import Greedy
+from registry import ALGORITHMS
+from mapfile import MapFile, save_map
+from render import WidgetRenderer, CanvasRenderer
+from runner import StepRunner, WorkerRunner, ReplayRunner
+from events import Trace, record, unbatched
+
+CONFIG_FILE = "config.map"
+# grids with more cells than this are drawn on a canvas instead of widgets
+CANVAS_CELLS = 2000
 class Game(tk.Frame):
     """
     A class to visualise pathfinging algorithms
@@ -30,7 +34,14 @@ class Game(tk.Frame):
         abstarct class Algorithm
     algorithm : Algorithm
         currently selected algorithm for simulation
-        
+    renderer : Renderer
+        draws cells which changed once per frame, WidgetRenderer
+        or CanvasRenderer for large grids
+    worker : str
+        None to run steps in the event loop, "thread" or "process"
+        to run them in a worker
+    runner : StepRunner
+        runner of the last started run, None before first run
         
     Methods
     -------
@@ -44,12 +55,23 @@ class Game(tk.Frame):
     next_step( ) -> None
         performs one step of currently selected algorithm and update GUI
     run_till_finish( ) -> None
-        perfoms steps of the algorithm until find end or gets stuck
+        start performing steps of the algorithm in batches from the event loop
+        until it finds end or gets stuck
+    pause_run( ) -> None
+        pause or resume the run
+    cancel_run( ) -> None
+        stop the run
+    record_run(path : str = None) -> None
+        search with current algorithm and save its events to trace file
+    replay(path : str = None) -> None
+        show search recorded in trace file without searching again
+    show_steps(results : list) -> None
+        update cells from results of next_step
     reconstruct_path( ) -> None
         gets path from angorithm and color cells on the path with
         color specified for path cells
     update_GUI( ) -> None
-        update color and values in the displayed cells
+        redraw displayed cells which differ from the grid
     mouse_press_cell(event) -> None
         handles mouse being pressed
         if wall pressed, removes it
@@ -65,12 +87,28 @@ class Game(tk.Frame):
         if start or end was pressed and there is empty space
         moves it from previous location
     """
-    def __init__(self):
+    algorithms_list = list(ALGORITHMS)
+    dict_of_algs = ALGORITHMS
+    def __init__(self, cols=20, rows=15, canvas=None, worker=None):
+        """
+        Parameters
+        ----------
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        canvas : bool, optional
+            draw cells on a canvas, by default only grids
+            with more than CANVAS_CELLS cells are
+        worker : str, optional
+            "thread" or "process" to perform steps of run in a worker
+        """
         # initialize main frame with main grid
         self.WIDTH = 800
         self.HEIGHT = 600
-        self.cols = 20
-        self.rows = 15
+        self.cols = cols
+        self.rows = rows
+        self.canvas = cols * rows > CANVAS_CELLS if canvas is None else canvas
         self.scaleX = self.WIDTH // self.cols
         self.scaleY = self.HEIGHT // self.rows
         tk.Frame.__init__(self)
@@ -90,21 +128,9 @@ class Game(tk.Frame):
         # algorithms
         self.end_found = False
         self.pathfinding_started = False
+        self.worker = worker
+        self.runner = None
         
-        self.algorithms_list = [
-            "dfs",
-            "bfs",
-            "astar",
-            "dijkstra",
-            "greedy"
-        ]
-        self.dict_of_algs = {
-            "dfs": Dfs,
-            "bfs": Bfs,
-            "astar": Astar,
-            "dijkstra":Dijkstra,
-            "greedy": Greedy
-        }
         self.algorithm : Algorithm = Bfs(
             self.cols,
             self.rows
@@ -112,84 +138,74 @@ class Game(tk.Frame):
     
     def run(self):
         """
-        if 'config.dictionary' exist in app directory load data from it
-        else initialize start and end position randomly
+        if CONFIG_FILE map of the grid size exist in app directory
+        load it, else initialize start and end position randomly
         """
         self.make_GUI()
-        if os.path.isfile('config.dictionary'):
-            with open('config.dictionary', 'rb') as config_dictionary_file:
-                config_dictionary = pickle.load(config_dictionary_file)
-                self.algorithm.load_data(config_dictionary)
-                self.update_GUI()
+        config = None
+        if os.path.isfile(CONFIG_FILE):
+            try:
+                config = MapFile(CONFIG_FILE)
+            except ValueError:
+                config = None
+        if (config is not None and (config.cols, config.rows) == (self.cols, self.rows)
+            and config.start is not None and config.end is not None):
+            self.algorithm.load_data(config.data())
+            self.update_GUI()
         else:
             self.place_start_end()
+        if config is not None:
+            config.close()
         tk.mainloop()
         self.save_to_file()
 
     def save_to_file(self):
-        config_dictionary = self.algorithm.get_data()
-        with open('config.dictionary', 'wb') as config_dictionary_file:
-            pickle.dump(config_dictionary, config_dictionary_file)
+        save_map(CONFIG_FILE, self.algorithm)
     
     def make_GUI(self):
         """initialize GUI with cells
             colors, bindings
         """
-        self.cells = []
-        for i in range(self.rows):
-            row = []
-            for j in range(self.cols):
-                cell_frame = tk.Frame(
-                    self.main_grid,
-                    bg = CELL_COLOR["empty"],
-                    # bg = random.choice(list(CELL_COLOR.values())),
-                    width=self.WIDTH/self.cols,
-                    height=self.HEIGHT/self.rows
-                )
-                cell_frame.grid(row=i, column=j, padx=1, pady=1)
-                cell_number = tk.Label(self.main_grid, bg=CELL_COLOR["empty"])
-                cell_number.grid(row=i, column=j)
-                cell_number.configure(font = MAIN_FONT)
-                
-                cell_detail = tk.Label(self.main_grid, bg=CELL_COLOR["empty"])
-                cell_number.grid(row=i, column=j)
-                cell_number.configure(font = MAIN_FONT)
-                
-                cell_frame.bind('<ButtonPress 1>', self.mouse_press_cell)
-                cell_number.bind('<ButtonPress 1>', self.mouse_press_cell)
-                cell_detail.bind('<ButtonPress 1>', self.mouse_press_cell)
-                cell_frame.bind('<B1-Motion>', self.mouse_drag_cell)
-                cell_number.bind('<B1-Motion>', self.mouse_drag_cell)
-                cell_detail.bind('<B1-Motion>', self.mouse_drag_cell)
-                cell_frame.bind('<ButtonRelease 1>', self.mouse_release_cell)
-                cell_number.bind('<ButtonRelease 1>', self.mouse_release_cell)
-                cell_detail.bind('<ButtonRelease 1>', self.mouse_release_cell)
-                
-                cell_data = {"frame":cell_frame, "number":cell_number, "detail":cell_detail}
-                row.append(cell_data)
-            self.cells.append(row)
-            # next step button
-            next_step_button = tk.Button(self, borderwidth=2, text="next step", width="20", command=self.next_step)
-            next_step_button.place(relx=0.92, rely=0.1, anchor= "center")
-            # run till end button
-            run_till_finish_button = tk.Button(self, borderwidth=2, text="run", width="20", command=self.run_till_finish)
-            run_till_finish_button.place(relx=0.92, rely=0.15, anchor= "center")
-            # show path button
-            show_path_button = tk.Button(self, borderwidth=2, text="show path", width="20", command=self.reconstruct_path)
-            show_path_button.place(relx=0.92, rely=0.2, anchor= "center")
-            # clear button
-            clear_button = tk.Button(self, borderwidth=2, text="clear", width="20", command=self.clear_pathfinding)
-            clear_button.place(relx=0.92, rely=0.25, anchor= "center")
-            # choose an algorithm
-            self.selected_algorithm_var = tk.StringVar()
-            self.choose_algorithm_combobox = ttk.Combobox(self, values=self.algorithms_list,textvariable=self.selected_algorithm_var, state='readonly')
-            self.choose_algorithm_combobox.bind('<<ComboboxSelected>>', self.algorithm_selected)
-            self.selected_algorithm_var.set("bfs")
-            self.choose_algorithm_combobox.place(relx=0.92, rely=0.3, anchor="center")
+        bindings = {
+            '<ButtonPress 1>': self.mouse_press_cell,
+            '<B1-Motion>': self.mouse_drag_cell,
+            '<ButtonRelease 1>': self.mouse_release_cell,
+        }
+        renderer_class = CanvasRenderer if self.canvas else WidgetRenderer
+        self.renderer = renderer_class(self.main_grid, self.cols, self.rows, self.WIDTH, self.HEIGHT, bindings)
+        # next step button
+        next_step_button = tk.Button(self, borderwidth=2, text="next step", width="20", command=self.next_step)
+        next_step_button.place(relx=0.92, rely=0.1, anchor= "center")
+        # run till end button
+        run_till_finish_button = tk.Button(self, borderwidth=2, text="run", width="20", command=self.run_till_finish)
+        run_till_finish_button.place(relx=0.92, rely=0.15, anchor= "center")
+        # show path button
+        show_path_button = tk.Button(self, borderwidth=2, text="show path", width="20", command=self.reconstruct_path)
+        show_path_button.place(relx=0.92, rely=0.2, anchor= "center")
+        # clear button
+        clear_button = tk.Button(self, borderwidth=2, text="clear", width="20", command=self.clear_pathfinding)
+        clear_button.place(relx=0.92, rely=0.25, anchor= "center")
+        # choose an algorithm
+        self.selected_algorithm_var = tk.StringVar()
+        self.choose_algorithm_combobox = ttk.Combobox(self, values=self.algorithms_list,textvariable=self.selected_algorithm_var, state='readonly')
+        self.choose_algorithm_combobox.bind('<<ComboboxSelected>>', self.algorithm_selected)
+        self.selected_algorithm_var.set("bfs")
+        self.choose_algorithm_combobox.place(relx=0.92, rely=0.3, anchor="center")
+        # pause and cancel buttons of run
+        self.pause_button = tk.Button(self, borderwidth=2, text="pause", width="20", command=self.pause_run)
+        self.pause_button.place(relx=0.92, rely=0.35, anchor= "center")
+        cancel_button = tk.Button(self, borderwidth=2, text="cancel", width="20", command=self.cancel_run)
+        cancel_button.place(relx=0.92, rely=0.4, anchor= "center")
+        # record and replay traces of searches
+        record_button = tk.Button(self, borderwidth=2, text="record", width="20", command=self.record_run)
+        record_button.place(relx=0.92, rely=0.45, anchor= "center")
+        replay_button = tk.Button(self, borderwidth=2, text="replay", width="20", command=self.replay)
+        replay_button.place(relx=0.92, rely=0.5, anchor= "center")
 
     def algorithm_selected(self, event):
         """select algorithm used"""
         # remember start and end position
+        self.cancel_run()
         data = self.algorithm.get_data()
         self.choose_algorithm_combobox.selection_clear()
         self.algorithm = self.dict_of_algs.get(self.selected_algorithm_var.get())(self.cols, self.rows)
@@ -198,9 +214,7 @@ class Game(tk.Frame):
         
     def get_cell_cords(self, event):
         """return cordinates of clicked cell"""
-        a, b = event.x_root - self.winfo_rootx(), event.y_root- self.winfo_rooty()
-        x, y = self.main_grid.grid_location(a, b)
-        return x, y
+        return self.renderer.cell_at(event)
     
     def mouse_press_cell(self, event):
         """handle mouse click
@@ -208,6 +222,9 @@ class Game(tk.Frame):
             - end clicked
             - wall clicked
             - empty cell clicked"""
+        if self.worker is not None:
+            # worker searches its own copy of the map
+            self.cancel_run()
         x, y = self.get_cell_cords(event)
         cell = self.algorithm.grid[y][x]
         if cell == "start":
@@ -217,11 +234,11 @@ class Game(tk.Frame):
             self.end_cell_pressed = True
             self.previous_end_cords = x,y
         elif cell == "empty":
-            self.algorithm.grid[y][x] = "wall"
+            self.algorithm.update_cell(x,y,"wall")
             self.update_cell(x,y,"wall")
             self.wall_cell_pressed = True
         elif cell == "wall":
-            self.algorithm.grid[y][x] = "empty"
+            self.algorithm.update_cell(x,y,"empty")
             self.update_cell(x,y,"empty")
             self.empty_cell_pressed = True
         self.update_cell(x,y,cell)
@@ -231,10 +248,10 @@ class Game(tk.Frame):
         x, y = self.get_cell_cords(event)
         cell = self.algorithm.grid[y][x]
         if self.wall_cell_pressed and cell == "empty":
-            self.algorithm.grid[y][x] = "wall"
+            self.algorithm.update_cell(x,y,"wall")
             self.update_cell(x,y,"wall")
         elif self.empty_cell_pressed and cell == "wall":
-            self.algorithm.grid[y][x] = "empty"    
+            self.algorithm.update_cell(x,y,"empty")    
             self.update_cell(x,y,"empty")
                 
     def mouse_release_cell(self, event):
@@ -244,16 +261,16 @@ class Game(tk.Frame):
         x, y = self.get_cell_cords(event)
         cell = self.algorithm.grid[y][x]
         if self.start_cell_pressed and cell == "empty":
-            self.algorithm.grid[y][x] = "start"
+            self.algorithm.update_cell(x,y,"start")
             x2, y2 = self.previous_start_cords
-            self.algorithm.grid[y2][x2] = "empty"
+            self.algorithm.update_cell(x2,y2,"empty")
             self.update_cell(x2,y2,cell)
             self.update_cell(x,y,"start")
             self.algorithm.start = (x,y)
         elif self.end_cell_pressed and cell == "empty":
-            self.algorithm.grid[y][x] = "end"
+            self.algorithm.update_cell(x,y,"end")
             x2, y2 = self.previous_end_cords
-            self.algorithm.grid[y2][x2] = "empty"
+            self.algorithm.update_cell(x2,y2,"empty")
             self.update_cell(x2,y2,cell)
             self.update_cell(x,y,"end")
             self.algorithm.end = (x,y)    
@@ -265,17 +282,18 @@ class Game(tk.Frame):
         """randomly place start and end node on the grid"""
         row = random.randint(0,self.rows-1)
         col = random.randint(0,self.cols-1)
-        self.algorithm.grid[row][col] = "start"
+        self.algorithm.update_cell(col,row,"start")
         self.algorithm.start = (col, row)
         while(self.algorithm.grid[row][col] != "empty"):
             row = random.randint(0,self.rows-1)
             col = random.randint(0,self.cols-1)
-        self.algorithm.grid[row][col] = "end"
+        self.algorithm.update_cell(col,row,"end")
         self.algorithm.end = (col, row)
         self.update_GUI()
 
     def clear_pathfinding(self):
         """reset internal data of current algotithm and update GUI"""
+        self.cancel_run()
         self.algorithm.reset()
         self.update_GUI()
     def next_step(self):
@@ -287,49 +305,108 @@ class Game(tk.Frame):
             self.algorithm.reset()
         res = self.algorithm.next_step()
         if res not in [True, False]:
-            node, color, value = res
+            self.show_steps([res])
+        return res
+    def show_steps(self, results):
+        for node, color, value in results:
             self.update_cell(*node, value)
             self.set_cell_color(*node, color)
-        return res
     def run_till_finish(self):
-        """perform steps of algorithm until end found or gets stuck"""
-        while self.next_step() not in [True, False]:
-            pass
+        """
+        start performing steps of algorithm until end found or gets stuck,
+        steps are done in batches between frames so the window keeps
+        responding, does nothing while a run is going on
+        """
+        if self.runner is not None and self.runner.state != "finished":
+            return
+        if not self.pathfinding_started or self.worker is not None:
+            self.pathfinding_started = True
+            self.algorithm.reset()
+            self.update_GUI()
+        if self.worker is None:
+            self.runner = StepRunner(self.algorithm, self, self.show_steps, self.run_finished)
+        else:
+            self.runner = WorkerRunner(self.algorithm, self, self.show_steps, self.run_finished, worker=self.worker)
+        self.pause_button.configure(text="pause")
+        self.runner.start()
+    def pause_run(self):
+        """pause running search or resume paused one"""
+        if self.runner is None:
+            return
+        if self.runner.state == "running":
+            self.runner.pause()
+            self.pause_button.configure(text="resume")
+        elif self.runner.state == "paused":
+            self.runner.resume()
+            self.pause_button.configure(text="pause")
+    def cancel_run(self):
+        if self.runner is not None:
+            self.runner.cancel()
+            self.runner = None
+    def run_finished(self, res):
+        self.pause_button.configure(text="pause")
+    def record_run(self, path=None):
+        """
+        run whole search of current algorithm and save its events to
+        trace file at path, asks for the path when it is None
+        """
+        if path is None:
+            path = filedialog.asksaveasfilename(defaultextension=".trace", filetypes=[("traces", "*.trace")])
+            if not path:
+                return
+        self.cancel_run()
+        record(self.algorithm, path)
+        self.update_GUI()
+    def replay(self, path=None):
+        """
+        load map of trace file at path and show its events in batches
+        like run_till_finish, asks for the path when it is None
+        """
+        if path is None:
+            path = filedialog.askopenfilename(filetypes=[("traces", "*.trace"), ("all files", "*")])
+            if not path:
+                return
+        self.cancel_run()
+        trace = Trace(path)
+        if (trace.cols, trace.rows) != (self.cols, self.rows):
+            trace.close()
+            raise ValueError(f"trace of {trace.cols}x{trace.rows} grid doesn't fit {self.cols}x{self.rows} grid")
+        self.algorithm.load_data(trace.data())
+        self.algorithm.reset()
+        self.update_GUI()
+        self.pathfinding_started = False
+        buffers = list(trace.buffers())
+        trace.close()
+        self.runner = ReplayRunner(self.algorithm, self, self.show_steps, self.run_finished, unbatched(buffers))
+        self.pause_button.configure(text="pause")
+        self.runner.start()
     def reconstruct_path(self):
         """
         gets path from angorithm and color cells on the path with
         color specified for path cells
         does nothing if path wasnt found
         """ 
-        for x,y in self.algorithm.reconstruct_path():
+        path = getattr(self.runner, "path", None)
+        if not path:
+            path = self.algorithm.reconstruct_path()
+        for x,y in path:
             if self.algorithm.cell_content(x,y) not in ["start", "end"]:
                 self.set_cell_color(x,y,CELL_COLOR["path"])
         self.update_cell(*self.algorithm.start, "start")
         self.update_cell(*self.algorithm.end, "end")
         
     def set_cell_color(self, x, y, color):
-        self.cells[y][x]["number"].configure(bg=color)
-        self.cells[y][x]["frame"].configure(bg=color)
+        self.renderer.set_cell(x, y, color)
     def update_cell(self, x, y, value):
-        """set cell GUI at x , y to value and update"""
+        """set cell GUI at x , y to value, drawn in the next frame"""
         # self.algorithm.update_cell(x,y,value)
         if self.algorithm.cell_content(x,y) in ["start", "end"]:
             return
-        self.cells[y][x]["number"].configure(bg=CELL_COLOR.get(value), text=(lambda x: "" if x == "empty" else x)(value))
-        self.cells[y][x]["frame"].configure(bg=CELL_COLOR.get(value))
-        self.update_idletasks()
+        self.renderer.set_cell(x, y, CELL_COLOR.get(value), "" if value == "empty" else value)
     
     def update_GUI(self):
-        """update all cells form data matrix"""
-        for i in range(self.rows):
-            for j in range(self.cols):
-                cell_value = self.algorithm.grid[i][j]
-                if cell_value == "empty":
-                    self.cells[i][j]["number"].configure(bg=CELL_COLOR.get(cell_value), text="")
-                else:
-                    self.cells[i][j]["number"].configure(bg=CELL_COLOR.get(cell_value), text=str(cell_value))
-                self.cells[i][j]["frame"].configure(bg=CELL_COLOR.get(cell_value))
-        self.update_idletasks()
+        """redraw cells which changed in the grid since last update or were set by update_cell"""
+        self.renderer.sync(self.algorithm.grid)
 
 def main():
     Game().run()
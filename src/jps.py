@@ -0,0 +1,326 @@
+from algorithm import *
+
+class Jps(Algorithm):
+    """
+    A class representing Jump Point Search pathfinding algorithm
+
+    A* variant for grids where every move costs the same, instead of
+    adding every neighbour to the open list it jumps in straight and
+    diagonal lines over cells which can be reached equally well
+    by a symmetric path and opens only jump points, cells where
+    a wall forces the path to turn
+
+    works with both directions4 and directions8, diagonal move costs
+    as much as straight one and may pass between two walls, like in
+    the other algorithms
+
+    Attributes
+    ----------
+    open : list(tuple(int, int, tuple(int, int)))
+        binary heap of (f, h, node) entries of jump points to visit
+    g : dict
+        cost of getting from start to jump point
+    closed : set
+        set of already expanded jump points
+
+    Methods
+    -------
+    reset( ) -> None
+        restores default values for internal data
+    push(node, g : int) -> None
+        put jump point on the open heap with cost g
+    pop( ) -> (int, tuple(int, int))
+        remove and return (h, node) of the jump point with the lowest f,
+        None if there are only closed ones left
+    next_step( ) -> (True,False, None)
+        expand one jump point
+    solve(trace=None) -> SearchResult
+        run whole search without touching the grid
+    jump(x, y, dx, dy) -> tuple(int, int)
+        return next jump point in direction dx, dy or None
+    successors(node, parent) -> list of (int, int)
+        return jump points reachable from node
+    h(node) -> int
+        distance from node to the end node ignoring walls
+    """
+    def __init__(self, cols, rows):
+        """
+        Parameters
+        ----------
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        """
+        super().__init__(cols, rows)
+        self.reset_open()
+    def reset(self):
+        """
+        reset values in the grid except walls, start, end node
+        and clear open heap, g values and closed set
+        """
+        self.reset_grid()
+        self.reset_open()
+    def reset_open(self):
+        self.open = []
+        self.g = {}
+        self.closed = set()
+        self.parents = dd()
+        if self.start is not None:
+            self.g[self.start] = 0
+            self.push(self.start, 0)
+    def push(self, node, g):
+        h = self.h(node)
+        hq.heappush(self.open, (g + h, h, node))
+    def pop(self):
+        while self.open:
+            _, h, node = hq.heappop(self.open)
+            if node not in self.closed:
+                return h, node
+        return None
+    def moore(self):
+        return self.directions is self.directions8
+    def h(self, node):
+        """
+        return distance from node to the end node on grid without walls
+
+        manhattan distance for four directions,
+        chebyshev distance for eight directions
+        """
+        a = abs(node[0] - self.end[0])
+        b = abs(node[1] - self.end[1])
+        return max(a, b) if self.moore() else a + b
+    def distance(self, a, b):
+        """return cost of moving in a line between jump points a and b"""
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return max(dx, dy) if self.moore() else dx + dy
+    def jump(self, x, y, dx, dy):
+        """
+        move from x, y in direction dx, dy until jump point is found
+
+        jump point is the end node, node with forced neighbour
+        or node from which a jump in perpendicular direction
+        (straight components of a diagonal move, horizontal
+        moves of a vertical move in four directions) finds one
+
+        walls around every cell are read from its neighbour mask,
+        see FORCED
+
+        return position of jump point or None if wall or edge
+        of the grid is hit first
+        """
+        cols = self.cols
+        masks = self.grid.get_adjacency().masks
+        end = self.end[1] * cols + self.end[0]
+        moore = self.moore()
+        move = BIT[dx, dy]
+        forced = FORCED[dx, dy, moore]
+        step = dy * cols + dx
+        i = y * cols + x
+        while True:
+            if not masks[i] & move:
+                return None
+            i += step
+            if i == end:
+                return i % cols, i // cols
+            mask = masks[i]
+            for free, blocked in forced:
+                if mask & free and not mask & blocked:
+                    return i % cols, i // cols
+            if dx and dy:
+                x, y = i % cols, i // cols
+                if self.jump(x, y, dx, 0) or self.jump(x, y, 0, dy):
+                    return x, y
+            elif dy and not moore:
+                x, y = i % cols, i // cols
+                if self.jump(x, y, 1, 0) or self.jump(x, y, -1, 0):
+                    return x, y
+    def directions_from(self, node, parent):
+        """
+        return directions worth searching from node reached from parent,
+        natural neighbours and forced neighbours of the move
+        """
+        if parent is None:
+            return self.directions
+        x, y = node
+        dx = (x > parent[0]) - (x < parent[0])
+        dy = (y > parent[1]) - (y < parent[1])
+        if not self.moore():
+            if dx:
+                return [(dx, 0), (0, 1), (0, -1)]
+            return [(0, dy), (1, 0), (-1, 0)]
+        mask = self.grid.get_adjacency().masks[y * self.cols + x]
+        if dx and dy:
+            dirs = [(0, dy), (dx, 0), (dx, dy)]
+            if not mask & BIT[-dx, 0]:
+                dirs.append((-dx, dy))
+            if not mask & BIT[0, -dy]:
+                dirs.append((dx, -dy))
+            return dirs
+        if dx:
+            dirs = [(dx, 0)]
+            if not mask & BIT[0, 1]:
+                dirs.append((dx, 1))
+            if not mask & BIT[0, -1]:
+                dirs.append((dx, -1))
+            return dirs
+        dirs = [(0, dy)]
+        if not mask & BIT[1, 0]:
+            dirs.append((1, dy))
+        if not mask & BIT[-1, 0]:
+            dirs.append((-1, dy))
+        return dirs
+    def successors(self, node, parent):
+        """return jump points reachable from node reached from parent"""
+        found = []
+        for dx, dy in self.directions_from(node, parent):
+            point = self.jump(node[0], node[1], dx, dy)
+            if point is not None:
+                found.append(point)
+        return found
+    def next_step(self):
+        """
+        perform one step of Jump Point Search
+
+        if cant find end return False
+        if found end in this step return True
+        else (x,y), color, content
+
+        pop jump point with lowest f value from the open heap,
+        find jump points reachable from it and push those
+        which can be reached cheaper than before
+        """
+        entry = self.pop()
+        if entry is None:
+            return False
+        h, node = entry
+        self.closed.add(node)
+        if self.grid.code(*node) == END:
+            self.end_found = True
+            return True
+        if self.grid.code(*node) == EMPTY:
+            self.grid.set_code(*node, VISITED)
+        g = self.g[node]
+        for point in self.successors(node, self.parents.get(node)):
+            if point in self.closed:
+                continue
+            gp = g + self.distance(node, point)
+            if gp < self.g.get(point, math.inf):
+                self.g[point] = gp
+                self.parents[point] = node
+                self.push(point, gp)
+        return node, CELL_COLOR.get(self.cell(*node)), f"{g},{h}"
+    def reconstruct_path(self):
+        """
+        return path from end to start (excluded) with cells
+        between jump points filled in and paint it on the grid
+        """
+        path = []
+        if not self.end_found:
+            return path
+        node = self.end
+        while node != self.start:
+            parent = self.parents[node]
+            for cell in reversed(line(parent, node)):
+                path.append(cell)
+                self.update_cell(*cell, "path")
+            node = parent
+        self.update_cell(*self.end, "end")
+        return path
+    def solve(self, trace=None):
+        """
+        run Jump Point Search to completion without touching the grid
+
+        only jump points are expanded, traced and counted,
+        returned path has every cell between them filled in
+
+        Parameters
+        ----------
+        trace : callable, optional
+            called with every expanded jump point (x, y)
+        """
+        self.check_placed()
+        scratch = self.get_scratch()
+        parent, g, closed = scratch.parent, scratch.g, scratch.closed
+        cols = self.cols
+        start = self.start[1] * cols + self.start[0]
+        end = self.end[1] * cols + self.end[0]
+        heappush, heappop = hq.heappush, hq.heappop
+        successors, distance, h = self.successors, self.distance, self.h
+        seen, gen = scratch.seen, scratch.generation
+        seen[start] = gen
+        parent[start] = start
+        g[start] = 0
+        hs = h(self.start)
+        heap = [(hs, hs, start)]
+        expanded = 0
+        pushed = 1
+        reopened = 0
+        while heap:
+            _, _, u = heappop(heap)
+            if closed[u] == gen:
+                continue
+            if u == end:
+                jumps = self.make_result(parent, end, expanded, pushed, g[u], len(heap), reopened)
+                path = [jumps.path[0]]
+                for a, b in zip(jumps.path, jumps.path[1:]):
+                    path.extend(line(a, b))
+                return jumps._replace(path=path)
+            closed[u] = gen
+            expanded += 1
+            node = (u % cols, u // cols)
+            if trace is not None:
+                trace(node)
+            p = parent[u]
+            gu = g[u]
+            for point in successors(node, None if p == u else (p % cols, p // cols)):
+                v = point[1] * cols + point[0]
+                if closed[v] == gen:
+                    continue
+                gv = gu + distance(node, point)
+                if seen[v] != gen:
+                    seen[v] = gen
+                elif gv >= g[v]:
+                    continue
+                else:
+                    reopened += 1
+                g[v] = gv
+                parent[v] = u
+                hv = h(point)
+                heappush(heap, (gv + hv, hv, v))
+                pushed += 1
+        return self.make_result(None, end, expanded, pushed, frontier=0, reopened=reopened)
+    def cell_content(self, x, y):
+        return self.cell(x, y)
+
+def forced_checks(dx, dy, moore):
+    """
+    return (free, blocked) pairs of direction bits for a move in direction dx, dy,
+    cell where free neighbour is not a wall and blocked one is has a forced neighbour
+    """
+    if dx and dy:
+        pairs = [((-dx, dy), (-dx, 0)), ((dx, -dy), (0, -dy))]
+    elif moore and dx:
+        pairs = [((dx, 1), (0, 1)), ((dx, -1), (0, -1))]
+    elif moore:
+        pairs = [((1, dy), (1, 0)), ((-1, dy), (-1, 0))]
+    elif dx:
+        pairs = [((0, -1), (-dx, -1)), ((0, 1), (-dx, 1))]
+    else:
+        pairs = [((-1, 0), (-1, -dy)), ((1, 0), (1, -dy))]
+    return tuple((BIT[free], BIT[blocked]) for free, blocked in pairs)
+
+FORCED = {(dx, dy, moore): forced_checks(dx, dy, moore) for dx, dy in DIRECTIONS for moore in (False, True)}
+
+def line(a, b):
+    """return cells of straight or diagonal line from a (excluded) to b"""
+    dx = (b[0] > a[0]) - (b[0] < a[0])
+    dy = (b[1] > a[1]) - (b[1] < a[1])
+    x, y = a
+    cells = []
+    while (x, y) != b:
+        x += dx
+        y += dy
+        cells.append((x, y))
+    return cells
@@ -0,0 +1,243 @@
+"""
+landmark (ALT) heuristic, lower bounds on path cost from
+exact distances to and from a few landmark cells
+
+by triangle inequality cost of getting from u to t is at least
+d(L, t) - d(L, u) and d(u, L) - d(t, L) for every landmark L,
+tables are built by full sweeps over the grid with the same move
+costs as Algorithm.cost, saved next to the map and memory mapped
+when loaded again
+"""
+import mmap
+import os
+import struct
+import zlib
+from array import array
+import heapq as hq
+from grid import *
+
+MAGIC = b"ALT1"
+# magic, cols, rows, eight directions, number of landmarks, fingerprint of the map
+HEADER = struct.Struct("=4sIIIII")
+UNREACHABLE = -1
+
+# translation table which turns walls into 1 and every other cell into 0
+_WALLS = bytes(int(code == WALL) for code in range(256))
+
+
+class Landmarks:
+    """
+    A class representing distance tables of landmarks
+
+    tables are array('i') when built and memoryview of the file when
+    loaded, both indexed by cell index, UNREACHABLE for cells in
+    other parts of the map than landmarks
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    moore : bool
+        True if tables were built for eight directions
+    nodes : list of int
+        cell indices of landmarks
+    forward : list of array('i')
+        cost of getting from every landmark to every cell
+    backward : list of array('i')
+        cost of getting from every cell to every landmark
+    version : int
+        grid version tables were built or loaded for
+    fingerprint : int
+        checksum of the map tables were built for, see fingerprint
+    active : int
+        number of landmarks used by heuristic for one source
+
+    Methods
+    -------
+    heuristic(target : int, source : int = None) -> callable
+        return function giving lower bound on cost from cell index to target
+    chunks( ) -> list of bytes-like
+        return parts of tables in file format
+    save(path : str) -> None
+        write tables to a file
+    """
+    def __init__(self, cols, rows, moore, nodes, forward, backward, version, fingerprint):
+        self.cols = cols
+        self.rows = rows
+        self.moore = moore
+        self.nodes = nodes
+        self.forward = forward
+        self.backward = backward
+        self.version = version
+        self.fingerprint = fingerprint
+    active = 3
+    def heuristic(self, target, source=None):
+        """
+        return function of cell index giving the best landmark
+        lower bound on cost of getting from that cell to target
+
+        with source given only active landmarks with the best
+        bounds at source are used, as every landmark makes
+        each call slower
+        """
+        tables = [(f, f[target], b, b[target])
+                  for f, b in zip(self.forward, self.backward) if f[target] != UNREACHABLE]
+        if source is not None and len(tables) > self.active:
+            tables.sort(key=lambda t: -max(t[1] - t[0][source], t[2][source] - t[3]))
+            del tables[self.active:]
+        def h(u):
+            best = 0
+            for f, ft, b, bt in tables:
+                fu = f[u]
+                if fu != UNREACHABLE:
+                    if ft - fu > best:
+                        best = ft - fu
+                    if b[u] - bt > best:
+                        best = b[u] - bt
+            return best
+        return h
+    def chunks(self):
+        """return header, landmarks and tables in file format"""
+        header = HEADER.pack(MAGIC, self.cols, self.rows, self.moore, len(self.nodes), self.fingerprint)
+        return [header, array("i", self.nodes)] + self.forward + self.backward
+    def save(self, path):
+        """write tables to path, replacing it only when the whole file is written"""
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            for chunk in self.chunks():
+                f.write(chunk)
+        os.replace(temporary, path)
+
+def fingerprint(grid):
+    """return checksum of walls and terrain costs of grid"""
+    return zlib.crc32(grid.costs, zlib.crc32(grid.cells.translate(_WALLS)))
+
+def sweep(grid, moore, source, reverse=False):
+    """
+    return array('i') of costs of getting from source to every cell
+    (to source from every cell if reverse), UNREACHABLE if there is no path
+    """
+    adjacency = grid.get_adjacency()
+    masks, moves = adjacency.masks, adjacency.moves[moore]
+    costs = grid.costs
+    heappush, heappop = hq.heappush, hq.heappop
+    dist = array("i", [UNREACHABLE]) * (grid.cols * grid.rows)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, u = heappop(heap)
+        if d > dist[u]:
+            continue
+        for offset, step in moves[masks[u]]:
+            v = u + offset
+            f = d + step * (costs[u] if reverse else costs[v])
+            if dist[v] == UNREACHABLE or f < dist[v]:
+                dist[v] = f
+                heappush(heap, (f, v))
+    return dist
+
+def build_landmarks(grid, moore, count=8):
+    """
+    pick count landmarks and sweep distances to and from them
+
+    first landmark is the cell farthest from the first free cell,
+    every next one is the cell farthest from landmarks picked so far,
+    so they end up spread over edges and dead ends of the map part
+    containing first free cell
+
+    Parameters
+    ----------
+    grid : Grid
+        grid of the map
+    moore : bool
+        True for eight directions
+    count : int
+        number of landmarks
+    """
+    seed = grid.cells.translate(_WALLS).find(0)
+    nodes, forward, backward = [], [], []
+    landmarks = Landmarks(grid.cols, grid.rows, moore, nodes, forward, backward, grid.version, fingerprint(grid))
+    if seed == -1:
+        return landmarks
+    nearest = sweep(grid, moore, seed)
+    for _ in range(count):
+        node = nearest.index(max(nearest))
+        if node in nodes:
+            break
+        nodes.append(node)
+        forward.append(sweep(grid, moore, node))
+        backward.append(sweep(grid, moore, node, reverse=True))
+        nearest = array("i", map(min, nearest, forward[-1]))
+    return landmarks
+
+def load_landmarks(path, grid, moore):
+    """
+    memory map tables from path
+
+    return None if there is no file or it was built for another map
+    or other directions
+
+    Parameters
+    ----------
+    path : str
+        path of the tables file
+    grid : Grid
+        grid of the map
+    moore : bool
+        True for eight directions
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    return read_landmarks(buffer, grid, moore)
+
+def read_landmarks(buffer, grid, moore):
+    """
+    return Landmarks with tables viewing buffer in file format
+    without copying, None if they were built for another map
+    or other directions
+    """
+    if len(buffer) < HEADER.size:
+        return None
+    magic, cols, rows, file_moore, count, crc = HEADER.unpack_from(buffer)
+    size = cols * rows
+    if (magic != MAGIC or (cols, rows) != (grid.cols, grid.rows) or bool(file_moore) != moore or
+        len(buffer) != HEADER.size + 4 * count * (1 + 2 * size) or crc != fingerprint(grid)):
+        return None
+    view = memoryview(buffer)[HEADER.size:].cast("i")
+    tables = [view[count + k * size:count + (k + 1) * size] for k in range(2 * count)]
+    return Landmarks(cols, rows, moore, view[:count].tolist(), tables[:count], tables[count:], grid.version, crc)
+
+def landmarks_path(map_path):
+    """return path of landmark tables of map saved at map_path"""
+    return map_path + ".alt"
+
+def landmarks_for(algorithm, map_path=None, count=8):
+    """
+    return landmarks of map of algorithm for its directions
+
+    tables saved next to map_path are used when they match the map,
+    otherwise they are built and saved there
+
+    Parameters
+    ----------
+    algorithm : Algorithm
+        algorithm with loaded map
+    map_path : str, optional
+        path of the map file, tables are not saved without it
+    count : int
+        number of landmarks
+    """
+    moore = algorithm.directions is algorithm.directions8
+    landmarks = None
+    if map_path is not None:
+        landmarks = load_landmarks(landmarks_path(map_path), algorithm.grid, moore)
+    if landmarks is None:
+        landmarks = build_landmarks(algorithm.grid, moore, count)
+        if map_path is not None:
+            landmarks.save(landmarks_path(map_path))
+    return landmarks
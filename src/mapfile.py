@@ -0,0 +1,229 @@
+"""
+binary map file
+
+file starts with HEADER (size of the grid, start and end) followed
+by sections, each one is SECTION (tag and length) and payload padded
+to ALIGN bytes, so payloads can be viewed in place:
+
+    CELL  uint8 code of every cell (visited and path cells are stored
+          as empty), cell x, y at index y * cols + x
+    COST  uint8 terrain cost of every cell, optional
+    ALT   landmark tables in format of landmarks module, optional,
+          one section for every set of directions
+
+file is memory mapped when opened, sections are memoryviews of the
+mapping (numpy arrays with array()), loading into an algorithm copies
+whole arrays at once, readers skip sections with unknown tags
+"""
+import mmap
+import os
+import struct
+from grid import *
+from landmarks import read_landmarks
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"PFM1"
+# magic, cols, rows, start x, start y, end x, end y (-1 when not placed), reserved
+HEADER = struct.Struct("=4sIIiiiiI")
+# tag, length of payload
+SECTION = struct.Struct("=4sQ")
+ALIGN = 8
+
+CELLS = b"CELL"
+COSTS = b"COST"
+LANDMARKS = b"ALT "
+# every valid cell code, deleted from cells to find invalid ones
+_CODES = bytes(range(len(NAMES)))
+
+
+class MapFile:
+    """
+    A class representing memory mapped map file
+
+    Attributes
+    ----------
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    start : tuple(int, int)
+        position of the start node, None if not placed
+    end : tuple(int, int)
+        position of the end node, None if not placed
+    sections : dict
+        list of memoryviews of payloads by section tag
+
+    Methods
+    -------
+    section(tag : bytes) -> memoryview
+        return payload of first section with tag, None if there is none
+    array(tag : bytes) -> numpy.ndarray
+        return (rows, cols) uint8 array viewing payload of section
+    grid( ) -> Grid
+        return new grid with cells and costs of the map
+    data( ) -> dict[str, Any]
+        return map in form of Algorithm.get_data
+    close( ) -> None
+        release the mapping
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            path of the map file
+        """
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.buffer)
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a map file")
+        if len(view) < HEADER.size:
+            raise ValueError(f"{path} is a truncated map file")
+        magic, self.cols, self.rows, sx, sy, ex, ey, _ = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a map file")
+        self.start = None if sx < 0 else (sx, sy)
+        self.end = None if ex < 0 else (ex, ey)
+        self.sections = {}
+        offset = aligned(HEADER.size)
+        while offset < len(view):
+            if offset + SECTION.size > len(view):
+                raise ValueError(f"{path} is a truncated map file")
+            tag, length = SECTION.unpack_from(view, offset)
+            offset += SECTION.size
+            if offset + length > len(view):
+                raise ValueError(f"section {tag} of {path} is truncated")
+            self.sections.setdefault(tag, []).append(view[offset:offset + length])
+            offset = aligned(offset + length)
+        cells = self.section(CELLS)
+        if cells is None or len(cells) != self.cols * self.rows:
+            raise ValueError(f"{path} has no cells of {self.cols}x{self.rows} grid")
+        if cells.tobytes().translate(None, _CODES):
+            raise ValueError(f"{path} has cell codes outside of 0..{len(NAMES) - 1}")
+        for name, node in [("start", self.start), ("end", self.end)]:
+            if node is None:
+                continue
+            x, y = node
+            if not (0 <= x < self.cols and 0 <= y < self.rows):
+                raise ValueError(f"{name} {x},{y} of {path} outside of {self.cols}x{self.rows} grid")
+            if cells[y * self.cols + x] == WALL:
+                raise ValueError(f"{name} {x},{y} of {path} is on a wall")
+    def section(self, tag):
+        payloads = self.sections.get(tag)
+        return payloads[0] if payloads else None
+    def array(self, tag):
+        if np is None:
+            raise ImportError("MapFile.array needs numpy")
+        return np.frombuffer(self.section(tag), dtype=np.uint8).reshape(self.rows, self.cols)
+    def grid(self):
+        grid = Grid(self.cols, self.rows)
+        grid.assign(self.section(CELLS), self.section(COSTS))
+        return grid
+    def data(self):
+        grid = self.grid()
+        return {
+            "walls": list(grid.walls()),
+            "costs": list(grid.weighted()),
+            "start": self.start,
+            "end": self.end
+        }
+    def close(self):
+        self.sections = {}
+        self.buffer.close()
+
+def aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+def write_grid(path, grid, start, end, landmarks=()):
+    """
+    write map file with cells, costs (unless all of them are 1)
+    and landmark tables, file is replaced only when it is whole
+
+    Parameters
+    ----------
+    path : str
+        path of the map file
+    grid : Grid
+        grid of the map
+    start, end : tuple(int, int)
+        positions of start and end node, None if not placed
+    landmarks : iterable of Landmarks
+        landmark tables of the map
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        write_map(f, grid, start, end, landmarks)
+    os.replace(temporary, path)
+
+def write_map(f, grid, start, end, landmarks=()):
+    """write header and sections of write_grid to open binary file f"""
+    sx, sy = start if start is not None else (-1, -1)
+    ex, ey = end if end is not None else (-1, -1)
+    f.write(HEADER.pack(MAGIC, grid.cols, grid.rows, sx, sy, ex, ey, 0))
+    write_section(f, CELLS, [grid.unmarked()])
+    if next(grid.weighted(), None) is not None:
+        write_section(f, COSTS, [grid.costs])
+    for tables in landmarks:
+        write_section(f, LANDMARKS, tables.chunks())
+
+def write_section(f, tag, chunks):
+    """write section with payload made of chunks at the next aligned offset of f"""
+    f.write(bytes(aligned(f.tell()) - f.tell()))
+    f.write(SECTION.pack(tag, sum(memoryview(chunk).nbytes for chunk in chunks)))
+    for chunk in chunks:
+        f.write(chunk)
+
+def write_data(path, cols, rows, data):
+    """
+    write map given in form of Algorithm.get_data to map file
+
+    Parameters
+    ----------
+    path : str
+        path of the map file
+    cols : int
+        numbers of column in the grid
+    rows : int
+        number of rows in the grid
+    data : dict[str, Any]
+        start, end, walls and optional costs of the map
+    """
+    grid = Grid(cols, rows)
+    for x, y in data["walls"]:
+        grid.set_code(x, y, WALL)
+    for x, y, cost in data.get("costs", []):
+        grid.set_cost(x, y, cost)
+    for node, code in [(data["start"], START), (data["end"], END)]:
+        if node is not None:
+            grid.set_code(*node, code)
+    write_grid(path, grid, data["start"], data["end"])
+
+def save_map(path, algorithm, landmarks=()):
+    """write map of algorithm with landmark tables to map file"""
+    write_grid(path, algorithm.grid, algorithm.start, algorithm.end, landmarks)
+
+def load_map(path, algorithm):
+    """
+    load map file into algorithm
+
+    grid is resized to the map and filled by copying whole arrays,
+    directions are kept and landmark tables built for them are used
+    straight from the mapping
+
+    return MapFile, landmark tables view it so it should stay open
+    while they are used
+    """
+    map_file = MapFile(path)
+    moore = algorithm.directions is algorithm.directions8
+    algorithm.resize(map_file.cols, map_file.rows)
+    algorithm.grid.assign(map_file.section(CELLS), map_file.section(COSTS))
+    algorithm.start, algorithm.end = map_file.start, map_file.end
+    for section in map_file.sections.get(LANDMARKS, []):
+        landmarks = read_landmarks(section, algorithm.grid, moore)
+        if landmarks is not None:
+            algorithm.set_landmarks(landmarks)
+    return map_file
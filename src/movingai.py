@@ -0,0 +1,112 @@
+"""
+reading grid benchmark maps and scenarios in MovingAI format
+
+map file is a header ("type octile", "height", "width", "map")
+followed by one line of characters per row, scenario file is a
+"version" line followed by tab separated queries:
+
+    bucket  map  width  height  start x  start y  goal x  goal y  optimal length
+
+optimal length is octile (diagonal move costs sqrt(2))
+"""
+import math
+from collections import namedtuple
+from grid import *
+
+# characters of passable terrain, everything else (@, O, T, W) is a wall,
+# water (W) is passable only from water in the benchmarks and is treated as a wall
+PASSABLE = b".GS"
+# translation table which turns map characters into cell codes
+_TERRAIN = bytes(EMPTY if chr(c).encode() in PASSABLE else WALL for c in range(256))
+
+Scenario = namedtuple("Scenario", ["bucket", "map", "cols", "rows", "start", "end", "optimal"])
+Scenario.__doc__ = """
+One query of a scenario file
+
+Attributes
+----------
+bucket : int
+    difficulty bucket of the query
+map : str
+    name of the map file
+cols : int
+    numbers of column in the map
+rows : int
+    number of rows in the map
+start : tuple(int, int)
+    position of the start node
+end : tuple(int, int)
+    position of the end node
+optimal : float
+    octile length of the shortest path
+"""
+
+
+def read_map(path):
+    """
+    read MovingAI map file and return (cols, rows, cells)
+
+    rows are read one at a time and translated to cell codes
+    straight into one bytearray
+
+    Parameters
+    ----------
+    path : str
+        path of the .map file
+    """
+    with open(path, "rb") as f:
+        header = {}
+        for line in f:
+            words = line.split()
+            if words == [b"map"]:
+                break
+            if len(words) == 2:
+                header[words[0].decode()] = words[1].decode()
+        else:
+            raise ValueError(f"{path} has no map section")
+        cols, rows = int(header["width"]), int(header["height"])
+        cells = bytearray(cols * rows)
+        y = 0
+        for line in f:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            if y == rows or len(line) != cols:
+                raise ValueError(f"{path} row {y} doesn't match {cols}x{rows} map")
+            cells[y * cols:(y + 1) * cols] = line.translate(_TERRAIN)
+            y += 1
+    if y != rows:
+        raise ValueError(f"{path} has {y} of {rows} rows")
+    return cols, rows, cells
+
+def load_movingai_map(path, algorithm):
+    """
+    load MovingAI map file into algorithm, grid is resized to the map,
+    directions are kept, start and end are not placed
+    """
+    cols, rows, cells = read_map(path)
+    algorithm.resize(cols, rows)
+    algorithm.grid.assign(cells)
+
+def read_scenarios(path):
+    """
+    yield Scenario for every query of MovingAI scenario file
+
+    Parameters
+    ----------
+    path : str
+        path of the .scen file
+    """
+    with open(path) as f:
+        for line in f:
+            fields = line.split("\t")
+            if len(fields) != 9:
+                continue
+            bucket, name, cols, rows, sx, sy, ex, ey, optimal = fields
+            yield Scenario(int(bucket), name, int(cols), int(rows),
+                           (int(sx), int(sy)), (int(ex), int(ey)), float(optimal))
+
+def octile_length(path):
+    """return length of path with straight moves costing 1 and diagonal sqrt(2)"""
+    diagonal = sum(1 for a, b in zip(path, path[1:]) if a[0] != b[0] and a[1] != b[1])
+    return len(path) - 1 - diagonal + diagonal * math.sqrt(2)
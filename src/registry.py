@@ -0,0 +1,33 @@
+"""
+names of algorithms and classes implementing them
+
+shared by the GUI, the scenario runner and the path query service,
+so headless tools don't have to import tkinter to look them up,
+wavefront bfs is registered only when numpy is installed
+"""
+from astar import Astar
+from dfs import Dfs
+from bfs import Bfs
+from dijkstra import Dijkstra
+from greedy import Greedy
+from jps import Jps
+from bidirectional import BiBfs, BiDijkstra, BiAstar
+from hpa import Hpa
+from dstar import Dstar
+from wavefront import Wavefront, np
+
+ALGORITHMS = {
+    "dfs": Dfs,
+    "bfs": Bfs,
+    "astar": Astar,
+    "dijkstra": Dijkstra,
+    "greedy": Greedy,
+    "jps": Jps,
+    "bidirectional bfs": BiBfs,
+    "bidirectional dijkstra": BiDijkstra,
+    "bidirectional astar": BiAstar,
+    "hpa": Hpa,
+    "d* lite": Dstar
+}
+if np is not None:
+    ALGORITHMS["wavefront bfs"] = Wavefront
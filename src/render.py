@@ -0,0 +1,241 @@
+"""
+renderers drawing cells of the grid in the Tk front end
+
+Game only records new colors and texts of cells in a renderer,
+cells which changed are drawn together once per frame by flush,
+sync compares the grid with its copy from the last sync, so cells
+written directly into grid.cells by next_step are found as well
+"""
+import tkinter as tk
+from abc import ABC, abstractmethod
+from colors import *
+from grid import NAMES
+
+# milliseconds between two flushes, about 60 frames per second
+FRAME_MS = 16
+# smallest cell (in pixels) of CanvasRenderer which shows text
+TEXT_SIZE = 20
+
+
+class Renderer(ABC):
+    """
+    A base class of renderers which draw only changed cells
+
+    Attributes
+    ----------
+    widget : tk.Widget
+        widget cells are drawn on, used to schedule flushes
+    cols : int
+        number of columns in the grid
+    rows : int
+        number of rows in the grid
+    colors : list of str
+        color every cell should have
+    texts : list of str
+        text every cell should have
+    drawn : list of tuple(str, str)
+        color and text every cell has on the screen
+    dirty : set of int
+        indices of cells changed since last flush
+    codes : bytearray
+        copy of grid cells from the last sync
+    overrides : set of int
+        cells set by set_cell since last sync, repainted from the grid by sync
+
+    Methods
+    -------
+    set_cell(x : int, y : int, color : str, text : str = None) -> None
+        set color (and text) of cell x, y
+    sync(grid : Grid) -> None
+        set every cell which changed since last sync from its grid code
+    schedule( ) -> None
+        flush in the next frame unless a flush is already scheduled
+    flush( ) -> None
+        draw all dirty cells
+    paint(index : int, color : str, text : str) -> None
+        draw one cell, implemented by subclasses
+    cell_at(event) -> tuple(int, int)
+        return position of the cell under mouse event
+    """
+    def __init__(self, widget, cols, rows):
+        self.widget = widget
+        self.cols = cols
+        self.rows = rows
+        size = cols * rows
+        self.colors = [CELL_COLOR["empty"]] * size
+        self.texts = [""] * size
+        self.drawn = list(zip(self.colors, self.texts))
+        self.dirty = set()
+        self.codes = bytearray(size)
+        self.overrides = set()
+        self.pending = None
+    def set_cell(self, x, y, color, text=None):
+        i = y * self.cols + x
+        self.colors[i] = color
+        if text is not None:
+            self.texts[i] = text
+        self.overrides.add(i)
+        self.dirty.add(i)
+        self.schedule()
+    def sync(self, grid):
+        """
+        set cells which changed in grid since last sync or were set
+        by set_cell from their grid codes, rows are compared as slices
+        so unchanged rows cost one comparison
+        """
+        cells, codes, cols = grid.cells, self.codes, self.cols
+        changed = self.overrides
+        self.overrides = set()
+        for a in range(0, len(cells), cols):
+            b = a + cols
+            if cells[a:b] != codes[a:b]:
+                changed.update(i for i in range(a, b) if cells[i] != codes[i])
+        codes[:] = cells
+        colors, texts = self.colors, self.texts
+        for i in changed:
+            name = NAMES[cells[i]]
+            colors[i] = CELL_COLOR[name]
+            texts[i] = "" if name == "empty" else name
+        self.dirty |= changed
+        self.schedule()
+    def schedule(self):
+        if self.pending is None:
+            self.pending = self.widget.after(FRAME_MS, self.flush)
+    def flush(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        colors, texts, drawn = self.colors, self.texts, self.drawn
+        for i in self.dirty:
+            state = (colors[i], texts[i])
+            if drawn[i] != state:
+                self.paint(i, *state)
+                drawn[i] = state
+        self.dirty.clear()
+    @abstractmethod
+    def paint(self, index, color, text):
+        pass
+    @abstractmethod
+    def cell_at(self, event):
+        pass
+
+
+class WidgetRenderer(Renderer):
+    """
+    A renderer drawing every cell as a frame with a label on it
+
+    Attributes
+    ----------
+    cells : list of dict[str, tk.Widget]
+        "frame" and "number" widgets of every cell by index
+    """
+    def __init__(self, master, cols, rows, width, height, bindings):
+        """
+        Parameters
+        ----------
+        master : tk.Widget
+            widget cells are placed in with grid geometry manager
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        width : int
+            width of the whole grid in pixels
+        height : int
+            height of the whole grid in pixels
+        bindings : dict[str, callable]
+            event handlers bound to every cell
+        """
+        super().__init__(master, cols, rows)
+        self.cells = []
+        for i in range(rows):
+            for j in range(cols):
+                cell_frame = tk.Frame(master, bg=CELL_COLOR["empty"], width=width / cols, height=height / rows)
+                cell_frame.grid(row=i, column=j, padx=1, pady=1)
+                cell_number = tk.Label(master, bg=CELL_COLOR["empty"], font=MAIN_FONT)
+                cell_number.grid(row=i, column=j)
+                for sequence, handler in bindings.items():
+                    cell_frame.bind(sequence, handler)
+                    cell_number.bind(sequence, handler)
+                self.cells.append({"frame": cell_frame, "number": cell_number})
+    def paint(self, index, color, text):
+        cell = self.cells[index]
+        cell["number"].configure(bg=color, text=text)
+        cell["frame"].configure(bg=color)
+    def cell_at(self, event):
+        master = self.widget
+        return master.grid_location(event.x_root - master.winfo_rootx(), event.y_root - master.winfo_rooty())
+
+
+class CanvasRenderer(Renderer):
+    """
+    A renderer drawing every cell as a rectangle on one canvas
+
+    texts are drawn only when cells are at least TEXT_SIZE pixels
+    wide and high, text items are created for cells when they
+    first get text
+
+    Attributes
+    ----------
+    canvas : tk.Canvas
+        canvas with rectangles of all cells
+    scale : tuple(float, float)
+        width and height of a cell in pixels
+    first : int
+        canvas item id of the rectangle of cell 0, cell i has id first + i
+    labels : dict[int, int]
+        canvas item ids of texts by cell index
+    """
+    def __init__(self, master, cols, rows, width, height, bindings):
+        """
+        Parameters
+        ----------
+        master : tk.Widget
+            widget the canvas is placed in
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        width : int
+            width of the canvas in pixels
+        height : int
+            height of the canvas in pixels
+        bindings : dict[str, callable]
+            event handlers bound to the canvas
+        """
+        canvas = tk.Canvas(master, width=width, height=height, bg=BG_COLOR, highlightthickness=0)
+        canvas.grid()
+        super().__init__(canvas, cols, rows)
+        self.canvas = canvas
+        sx, sy = width / cols, height / rows
+        self.scale = (sx, sy)
+        gap = 1 if sx >= 4 and sy >= 4 else 0
+        empty = CELL_COLOR["empty"]
+        rectangle = canvas.create_rectangle
+        self.first = rectangle(gap, gap, sx - gap, sy - gap, fill=empty, width=0)
+        for i in range(1, cols * rows):
+            y, x = divmod(i, cols)
+            rectangle(x * sx + gap, y * sy + gap, (x + 1) * sx - gap, (y + 1) * sy - gap, fill=empty, width=0)
+        self.labels = {}
+        self.show_text = sx >= TEXT_SIZE and sy >= TEXT_SIZE
+        for sequence, handler in bindings.items():
+            canvas.bind(sequence, handler)
+    def paint(self, index, color, text):
+        canvas = self.canvas
+        canvas.itemconfigure(self.first + index, fill=color)
+        if not self.show_text:
+            return
+        label = self.labels.get(index)
+        if label is None:
+            if not text:
+                return
+            y, x = divmod(index, self.cols)
+            sx, sy = self.scale
+            label = canvas.create_text((x + 0.5) * sx, (y + 0.5) * sy, font=MAIN_FONT, fill="black")
+            self.labels[index] = label
+        canvas.itemconfigure(label, text=text)
+    def cell_at(self, event):
+        sx, sy = self.scale
+        x = min(max(int(event.x // sx), 0), self.cols - 1)
+        y = min(max(int(event.y // sy), 0), self.rows - 1)
+        return x, y
@@ -0,0 +1,286 @@
+"""
+running searches step by step from the Tk event loop
+
+StepRunner performs a batch of next_step calls every time it is
+called back by widget.after, batch size adapts to measured time of
+steps so the GUI keeps its frame rate, WorkerRunner performs steps
+in a worker thread or process and only takes batches of their
+results from a queue, ReplayRunner shows events of a recorded
+trace without searching
+"""
+import multiprocessing as mp
+import queue
+import threading
+import time
+from itertools import islice
+from colors import CELL_COLOR
+from events import EXPAND, FOUND, EXHAUSTED
+from grid import EMPTY, VISITED
+
+# frames per second the runners aim at
+FPS = 60
+# part of a frame spent on steps, the rest is left for drawing and events
+STEP_SHARE = 0.5
+# largest number of steps of one batch
+MAX_BATCH = 1 << 16
+# number of step results sent at once by a worker
+CHUNK = 256
+
+
+class StepRunner:
+    """
+    A class performing steps of an algorithm in batches scheduled by after()
+
+    Attributes
+    ----------
+    algorithm : Algorithm
+        algorithm to run, it should be reset before start
+    widget : tk.Widget
+        widget used for after() and after_cancel()
+    on_steps : callable
+        called with list of results of next_step of every batch
+    on_finish : callable
+        called once with True if end was found, False if search got stuck
+        and None if it was cancelled
+    budget : float
+        seconds of every frame given to steps
+    batch : int
+        number of steps of the next batch
+    state : str
+        "ready", "running", "paused" or "finished"
+
+    Methods
+    -------
+    start( ) -> None
+        schedule the first batch
+    pause( ) -> None
+        stop scheduling batches
+    resume( ) -> None
+        continue paused run
+    cancel( ) -> None
+        stop run and call on_finish with None
+    tick( ) -> None
+        perform one batch and schedule the next one
+    """
+    def __init__(self, algorithm, widget, on_steps, on_finish, fps=FPS):
+        self.algorithm = algorithm
+        self.widget = widget
+        self.on_steps = on_steps
+        self.on_finish = on_finish
+        self.frame = 1 / fps
+        self.budget = self.frame * STEP_SHARE
+        self.batch = 1
+        self.state = "ready"
+        self.pending = None
+    def start(self):
+        self.state = "running"
+        self.schedule(0)
+    def pause(self):
+        if self.state == "running":
+            self.state = "paused"
+            self.unschedule()
+    def resume(self):
+        if self.state == "paused":
+            self.state = "running"
+            self.schedule(0)
+    def cancel(self):
+        if self.state != "finished":
+            self.finish(None)
+    def schedule(self, seconds):
+        self.pending = self.widget.after(max(1, int(seconds * 1000)), self.tick)
+    def unschedule(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+    def finish(self, res):
+        self.unschedule()
+        self.state = "finished"
+        self.on_finish(res)
+    def steps(self):
+        """
+        perform a batch of steps, return list of their results
+        and True or False if search ended, else None
+        """
+        next_step = self.algorithm.next_step
+        results = []
+        for _ in range(self.batch):
+            res = next_step()
+            if res is True or res is False:
+                return results, res
+            results.append(res)
+        return results, None
+    def tick(self):
+        self.pending = None
+        begin = time.perf_counter()
+        results, end = self.steps()
+        elapsed = time.perf_counter() - begin
+        if results:
+            self.on_steps(results)
+        if end is not None:
+            self.finish(end)
+            return
+        if self.state != "running":
+            return
+        if elapsed > 0:
+            self.batch = max(1, min(self.batch * 2, MAX_BATCH, int(self.batch * self.budget / elapsed)))
+        else:
+            self.batch = min(self.batch * 2, MAX_BATCH)
+        self.schedule(self.frame - (time.perf_counter() - begin))
+
+
+def produce_steps(algorithm, steps, go, stop, chunk=CHUNK, send_path=False):
+    """
+    perform steps of algorithm and put lists of at most chunk results
+    on steps queue, the last item is (True or False, path) where path
+    is from reconstruct_path if send_path is set, waits while go
+    is not set, ends when stop is set
+    """
+    batch = []
+    while not stop.is_set():
+        go.wait()
+        res = algorithm.next_step()
+        if res is True or res is False:
+            if batch:
+                steps.put(batch)
+            steps.put((res, algorithm.reconstruct_path() if res and send_path else []))
+            return
+        batch.append(res)
+        if len(batch) >= chunk:
+            steps.put(batch)
+            batch = []
+
+def produce_steps_in_process(alg_class, cols, rows, data, moore, steps, go, stop, chunk=CHUNK):
+    """rebuild algorithm from data of get_data in a worker process and run produce_steps"""
+    algorithm = alg_class(cols, rows)
+    algorithm.load_data(data)
+    algorithm.set_directions(moore)
+    algorithm.reset()
+    produce_steps(algorithm, steps, go, stop, chunk, True)
+
+
+class WorkerRunner(StepRunner):
+    """
+    A runner whose steps are performed by a worker thread or process
+
+    every tick takes batches of step results from the queue for at
+    most budget seconds, a worker process searches its own copy of
+    the map, so expanded cells are marked in the grid of algorithm
+    by the runner and the path is kept in path
+
+    Attributes
+    ----------
+    worker : str
+        "thread" or "process"
+    path : list of (int, int)
+        path from end to start (without start) sent by a worker process
+        when end was found, empty for a worker thread
+    """
+    def __init__(self, algorithm, widget, on_steps, on_finish, fps=FPS, worker="thread"):
+        super().__init__(algorithm, widget, on_steps, on_finish, fps)
+        if worker not in ("thread", "process"):
+            raise ValueError(f"unknown worker {worker}")
+        self.worker = worker
+        self.path = None
+        self.thread = None
+    def start(self):
+        if self.worker == "thread":
+            self.queue = queue.Queue(maxsize=64)
+            self.go, self.stop = threading.Event(), threading.Event()
+            self.thread = threading.Thread(target=produce_steps, args=(self.algorithm, self.queue, self.go, self.stop),
+                                           daemon=True)
+        else:
+            alg = self.algorithm
+            self.queue = mp.Queue(maxsize=64)
+            self.go, self.stop = mp.Event(), mp.Event()
+            self.thread = mp.Process(target=produce_steps_in_process,
+                                     args=(type(alg), alg.cols, alg.rows, alg.get_data(),
+                                           alg.directions is alg.directions8, self.queue, self.go, self.stop),
+                                     daemon=True)
+        self.go.set()
+        self.thread.start()
+        super().start()
+    def pause(self):
+        super().pause()
+        self.go.clear()
+    def resume(self):
+        self.go.set()
+        super().resume()
+    def finish(self, res):
+        if self.thread is not None:
+            self.stop.set()
+            self.go.set()
+            if res is None:
+                # let a worker blocked on a full queue finish
+                while self.thread.is_alive():
+                    try:
+                        self.queue.get(timeout=0.01)
+                    except queue.Empty:
+                        pass
+            self.thread.join()
+        super().finish(res)
+    def steps(self):
+        deadline = time.perf_counter() + self.budget
+        results = []
+        end = None
+        while end is None and time.perf_counter() < deadline:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple):
+                end, self.path = item
+            else:
+                results.extend(item)
+        if self.worker == "process":
+            cells, cols = self.algorithm.grid.cells, self.algorithm.cols
+            for (x, y), _, _ in results:
+                if cells[y * cols + x] == EMPTY:
+                    cells[y * cols + x] = VISITED
+        return results, end
+
+
+class ReplayRunner(StepRunner):
+    """
+    A runner showing expand events of a recorded search as steps
+
+    every tick takes batch events, expanded cells are marked in the
+    grid of algorithm, parents from push and relax events give path
+
+    Attributes
+    ----------
+    events : iterator of tuple(int, int, int)
+        events left to show, like Trace.events()
+    parents : dict[int, int]
+        parent index of every reached cell by cell index
+    path : list of (int, int)
+        path from end to start (without start) when end was found
+    """
+    def __init__(self, algorithm, widget, on_steps, on_finish, events, fps=FPS):
+        super().__init__(algorithm, widget, on_steps, on_finish, fps)
+        self.events = iter(events)
+        self.parents = {}
+        self.path = None
+    def steps(self):
+        cells, cols = self.algorithm.grid.cells, self.algorithm.cols
+        parents = self.parents
+        color = CELL_COLOR["visited"]
+        results = []
+        count = 0
+        for kind, cell, value in islice(self.events, self.batch):
+            count += 1
+            if kind == FOUND:
+                self.path = []
+                while parents.get(cell, cell) != cell:
+                    self.path.append((cell % cols, cell // cols))
+                    cell = parents[cell]
+                return results, True
+            if kind == EXHAUSTED:
+                return results, False
+            parents[cell] = value
+            if kind == EXPAND and cells[cell] == EMPTY:
+                cells[cell] = VISITED
+                results.append(((cell % cols, cell // cols), color, "visited"))
+        if count < self.batch:
+            # trace ended without its last event
+            return results, False
+        return results, None
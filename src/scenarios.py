@@ -0,0 +1,83 @@
+"""
+command line runner of MovingAI benchmark scenarios
+
+    python scenarios.py path/to/map.scen --algorithm astar
+
+runs every query of the scenario file through algorithm chosen
+from registry.ALGORITHMS on the map named in it (looked up next to
+the scenario file unless --map is given) and prints expanded
+nodes, octile length of the found path against optimal length
+from the file and wall time of every query, then a summary,
+--stats adds counters and phase timings of the searches and
+--profile writes cProfile statistics of the solves to a file
+
+optimal lengths in scenario files are for eight directions without
+cutting corners, algorithms here may cut corners, so their paths
+can be shorter, with --four they are longer
+"""
+import argparse
+import cProfile
+import os
+import time
+from registry import ALGORITHMS
+from movingai import *
+from landmarks import landmarks_for
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run MovingAI scenarios through a pathfinding algorithm")
+    parser.add_argument("scenario", help="path of the .scen file")
+    parser.add_argument("--map", help="path of the .map file, by default map named in the scenario file")
+    parser.add_argument("--algorithm", default="astar", choices=sorted(ALGORITHMS))
+    parser.add_argument("--four", action="store_true", help="move in four directions instead of eight")
+    parser.add_argument("--limit", type=int, help="run only first LIMIT queries")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="use landmark heuristic with this many landmarks, tables are saved next to the map")
+    parser.add_argument("--quiet", action="store_true", help="print only the summary")
+    parser.add_argument("--stats", action="store_true", help="print search counters and phase timings")
+    parser.add_argument("--profile", help="write cProfile statistics of the solves to this file")
+    args = parser.parse_args(argv)
+
+    scenarios = list(read_scenarios(args.scenario))[:args.limit]
+    if not scenarios:
+        parser.error(f"no queries in {args.scenario}")
+    map_path = args.map or os.path.join(os.path.dirname(args.scenario), os.path.basename(scenarios[0].map))
+    alg = ALGORITHMS[args.algorithm](1, 1)
+    alg.set_directions(not args.four)
+    load_movingai_map(map_path, alg)
+    if args.landmarks:
+        alg.set_landmarks(landmarks_for(alg, map_path, args.landmarks))
+    profiler = cProfile.Profile() if args.profile else None
+    if args.stats or profiler is not None:
+        alg.enable_stats(profiler)
+
+    if not args.quiet:
+        print(f"{'bucket':>6} {'start':>11} {'end':>11} {'expanded':>9} {'length':>10} {'optimal':>10} {'ratio':>6} {'ms':>9}")
+    found = expanded = suboptimal = 0
+    elapsed = 0
+    worst = 1
+    for s in scenarios:
+        begin = time.perf_counter()
+        res = next(alg.solve_pairs([(s.start, s.end)]))
+        took = time.perf_counter() - begin
+        elapsed += took
+        expanded += res.expanded
+        length = octile_length(res.path) if res.found else None
+        ratio = length / s.optimal if res.found and s.optimal else 1
+        if res.found:
+            found += 1
+            worst = max(worst, ratio)
+            suboptimal += length > s.optimal + 1e-4
+        if not args.quiet:
+            print(f"{s.bucket:>6} {str(s.start):>11} {str(s.end):>11} {res.expanded:>9} "
+                  f"{'-' if length is None else f'{length:.4f}':>10} {s.optimal:>10.4f} {ratio:>6.3f} {took * 1000:>9.3f}")
+    print(f"{args.algorithm}: {len(scenarios)} queries, {found} found, {suboptimal} longer than optimal "
+          f"(worst ratio {worst:.3f}), {expanded} expanded, {elapsed:.3f} s, "
+          f"{elapsed / len(scenarios) * 1000:.3f} ms per query")
+    if args.stats:
+        print(alg.stats)
+    if profiler is not None:
+        profiler.dump_stats(args.profile)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+preallocated per search buffers shared by queries on one map
+
+buffers are stamped with the generation of the search which wrote
+them, so starting a new search only increments the generation
+"""
+from array import array
+import math
+
+# largest generation stored in stamps, they are zeroed when it is reached
+MAX_GENERATION = (1 << 32) - 1
+
+
+class Scratch:
+    """
+    A class holding flat per cell buffers used by Algorithm.search
+
+    buffers are allocated once for the grid size, parent and g of
+    a cell are valid only when its seen stamp is the current
+    generation, clear() starts a new generation instead of
+    resetting cells
+
+    Attributes
+    ----------
+    size : int
+        number of cells in the grid
+    generation : int
+        number of the current search, from 1 to MAX_GENERATION
+    seen : array('I')
+        generation in which cell was reached
+    closed : array('I')
+        generation in which cell was expanded
+    parent : array('i')
+        index of parent cell, start cell is its own parent
+    g : array('q')
+        cost of getting from start to cell
+
+    Methods
+    -------
+    clear( ) -> None
+        start a new generation
+    reached(index : int) -> bool
+        return True if cell was reached in the current generation
+    """
+    __slots__ = ("size", "generation", "seen", "closed", "parent", "g")
+    def __init__(self, size):
+        """
+        Parameters
+        ----------
+        size : int
+            number of cells in the grid
+        """
+        self.size = size
+        self.generation = 1
+        self.seen = array("I", [0]) * size
+        self.closed = array("I", [0]) * size
+        self.parent = array("i", [0]) * size
+        self.g = array("q", [0]) * size
+    def clear(self):
+        if self.generation == MAX_GENERATION:
+            self.seen = array("I", [0]) * self.size
+            self.closed = array("I", [0]) * self.size
+            self.generation = 0
+        self.generation += 1
+    def reached(self, index):
+        return self.seen[index] == self.generation
+
+
+class ScratchPair:
+    """
+    A class holding buffers of both sides of a bidirectional search
+
+    Attributes
+    ----------
+    size : int
+        number of cells in the grid
+    forward : Scratch
+        buffers of search from start
+    backward : Scratch
+        buffers of search from end
+
+    Methods
+    -------
+    clear( ) -> None
+        start a new generation of both sides
+    """
+    __slots__ = ("size", "forward", "backward")
+    def __init__(self, size):
+        self.size = size
+        self.forward = Scratch(size)
+        self.backward = Scratch(size)
+    def clear(self):
+        self.forward.clear()
+        self.backward.clear()
+
+
+class CostView:
+    """
+    A read-only view of g values of a Scratch by node position
+
+    view[(x, y)] is math.inf for cells not reached in the current
+    generation, like a defaultdict of costs
+    """
+    __slots__ = ("scratch", "cols")
+    def __init__(self, scratch, cols):
+        self.scratch = scratch
+        self.cols = cols
+    def __getitem__(self, node):
+        x, y = node
+        i = y * self.cols + x
+        scratch = self.scratch
+        return scratch.g[i] if scratch.seen[i] == scratch.generation else math.inf
+    def __contains__(self, node):
+        x, y = node
+        return self.scratch.reached(y * self.cols + x)
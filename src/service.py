@@ -0,0 +1,464 @@
+"""
+asyncio service answering path queries on named maps
+
+    python service.py --map maze=maps/maze.map --port 8765
+    python service.py --map maze=maps/maze.map --unix /tmp/paths.sock --executor process
+
+every connection sends requests as lines of JSON and gets one line
+of JSON back for every request, requests of one connection are
+answered as soon as they are solved, so responses carry the id of
+their request:
+
+    {"id": 1, "map": "maze", "start": [0, 0], "end": [9, 9], "algorithm": "astar", "moore": false}
+    {"id": 1, "found": true, "path": [[0, 0], ...], "cost": 180, "expanded": 42}
+
+    {"id": 2, "op": "walls", "map": "maze", "walls": [[3, 4]], "free": [[5, 5]]}
+    {"id": 2, "version": 7}
+
+    {"id": 3, "op": "map", "map": "small", "cols": 20, "rows": 15, "walls": [[5, 0]], "costs": [[1, 1, 3]]}
+    {"id": 4, "op": "stats"}
+
+failed requests are answered with {"id": ..., "error": "..."},
+searches run on a thread or process executor, identical queries in
+flight are solved once and results are kept in an LRU cache whose
+entries of a map are dropped when its walls or costs change
+"""
+import argparse
+import asyncio
+import json
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from algorithm import *
+from batch import SharedMap, attach
+from mapfile import MapFile
+from registry import ALGORITHMS
+
+# results kept in the cache by default
+CACHE_SIZE = 4096
+# algorithms on shared maps kept by every worker process
+PROCESS_ALGORITHMS = 8
+# longest request line in bytes
+LINE_LIMIT = 1 << 20
+
+process_algorithms = OrderedDict()
+
+
+class Solver:
+    """
+    A class running searches of one algorithm on one version of a map from many threads
+
+    algorithms which search cell indices get their own Scratch in
+    every thread, taken from a pool of states, the others place
+    start and end for the time of the search and are locked
+
+    Attributes
+    ----------
+    algorithm : Algorithm
+        algorithm with loaded map, its grid is never changed
+    shared : bool
+        True if searches of algorithm can run at the same time
+
+    Methods
+    -------
+    search(start : tuple(int, int), end : tuple(int, int)) -> SearchResult
+        solve one query
+    """
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.shared = type(algorithm).search is not Algorithm.search
+        self.states = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        # snapshot is taken here, so worker threads never take one at the same time
+        algorithm.get_map()
+    def search(self, start, end):
+        algorithm = self.algorithm
+        if not self.shared:
+            with self.lock:
+                return algorithm.search(start, end)
+        try:
+            state = self.states.get_nowait()
+        except queue.Empty:
+            state = algorithm.new_state()
+        try:
+            return algorithm.search(start, end, state=state)
+        finally:
+            self.states.put(state)
+
+def solve_in_process(name, moore, cols, rows, shared_name, start, end):
+    """solve one query in a worker process on shared map, algorithms are kept for PROCESS_ALGORITHMS maps"""
+    key = (name, moore, shared_name)
+    entry = process_algorithms.get(key)
+    if entry is None:
+        shared = SharedMap(cols, rows, shared_name)
+        algorithm = ALGORITHMS[name](cols, rows)
+        attach(algorithm, shared)
+        algorithm.set_directions(moore)
+        entry = process_algorithms[key] = (algorithm, shared)
+        if len(process_algorithms) > PROCESS_ALGORITHMS:
+            _, (old, old_shared) = process_algorithms.popitem(last=False)
+            del old
+            try:
+                old_shared.close()
+            except BufferError:
+                pass
+    else:
+        process_algorithms.move_to_end(key)
+    return entry[0].search(start, end)
+
+
+def check_node(grid, node):
+    """return node as tuple(int, int), TypeError or IndexError if it isn't a cell of grid"""
+    x, y = node
+    if type(x) is not int or type(y) is not int:
+        raise TypeError(f"cell {x},{y} has to be two integers")
+    grid.index(x, y)
+    return x, y
+
+def check_cost(grid, change):
+    """return (x, y, cost) change of terrain cost, raise if it can't be made on grid"""
+    x, y, cost = change
+    x, y = check_node(grid, (x, y))
+    if type(cost) is not int or not 1 <= cost <= MAX_COST:
+        raise ValueError(f"cost {cost} outside of 1..{MAX_COST}")
+    return x, y, cost
+
+
+class MapEntry:
+    """
+    A class holding one map of PathService
+
+    Attributes
+    ----------
+    grid : Grid
+        walls and costs of the map, changed only by the event loop
+    solvers : dict[tuple(str, bool), Solver]
+        solvers of the current version by algorithm name and moore
+    shared : SharedMap
+        current version in shared memory for the process executor, None until needed
+    """
+    __slots__ = ("grid", "solvers", "shared")
+    def __init__(self, grid):
+        self.grid = grid
+        self.solvers = {}
+        self.shared = None
+
+
+class PathService:
+    """
+    A class answering (map, start, end, algorithm) queries from asyncio
+
+    Attributes
+    ----------
+    maps : dict[str, MapEntry]
+        maps by id
+    executor : Executor
+        ThreadPoolExecutor or ProcessPoolExecutor running searches
+    cache : OrderedDict
+        SearchResult by (map, version, algorithm, moore, start, end),
+        most recently used last
+    cache_size : int
+        largest number of cached results
+    in_flight : dict
+        futures of queries being solved by the same keys as cache
+    stats : dict[str, int]
+        numbers of queries, cache hits, coalesced and solved queries
+
+    Methods
+    -------
+    add_map(map_id : str, grid : Grid) -> None
+        add or replace a map
+    load(map_id : str, path : str) -> None
+        add map from map file
+    set_cells(map_id : str, walls=(), free=(), costs=()) -> int
+        change walls and costs of a map and return its new version
+    query(map_id, start, end, algorithm="astar", moore=False) -> SearchResult
+        coroutine solving one query
+    request(message : dict) -> dict
+        coroutine answering one request of the protocol
+    serve(host=None, port=None, path=None) -> asyncio.Server
+        coroutine starting TCP server, or Unix one when path is given
+    close( ) -> None
+        shut executor down and free shared maps
+    """
+    def __init__(self, executor="thread", workers=None, cache_size=CACHE_SIZE):
+        """
+        Parameters
+        ----------
+        executor : str
+            "thread" or "process"
+        workers : int, optional
+            number of worker threads or processes, by default the executor's default
+        cache_size : int
+            largest number of cached results, 0 turns the cache off
+        """
+        if executor == "thread":
+            self.executor = ThreadPoolExecutor(workers)
+        elif executor == "process":
+            self.executor = ProcessPoolExecutor(workers)
+        else:
+            raise ValueError(f"unknown executor {executor}")
+        self.kind = executor
+        self.maps = {}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.in_flight = {}
+        # shared maps replaced by newer versions, freed when their last query ends
+        self.retired = {}
+        self.users = {}
+        self.stats = dict.fromkeys(["queries", "hits", "coalesced", "solved"], 0)
+    def add_map(self, map_id, grid):
+        if map_id in self.maps:
+            self.invalidate(map_id)
+        self.maps[map_id] = MapEntry(grid)
+    def load(self, map_id, path):
+        map_file = MapFile(path)
+        try:
+            self.add_map(map_id, map_file.grid())
+        finally:
+            map_file.close()
+    def set_cells(self, map_id, walls=(), free=(), costs=()):
+        """
+        make cells of walls walls and cells of free empty, set (x, y, cost) of costs,
+        cached results of the map are dropped if anything changed
+
+        every change is checked before the first one is made,
+        so a bad one leaves the map as it was
+        """
+        entry = self.get_entry(map_id)
+        grid = entry.grid
+        walls = [check_node(grid, node) for node in walls]
+        free = [check_node(grid, node) for node in free]
+        costs = [check_cost(grid, change) for change in costs]
+        version = grid.version
+        try:
+            for x, y in walls:
+                grid.set_code(x, y, WALL)
+            for x, y in free:
+                grid.set_code(x, y, EMPTY)
+            for x, y, cost in costs:
+                grid.set_cost(x, y, cost)
+        finally:
+            if grid.version != version:
+                self.invalidate(map_id)
+        return grid.version
+    def get_entry(self, map_id):
+        entry = self.maps.get(map_id)
+        if entry is None:
+            raise KeyError(f"unknown map {map_id}")
+        return entry
+    def invalidate(self, map_id):
+        """drop cached results and solvers of the map, its shared map is freed once unused"""
+        for key in [key for key in self.cache if key[0] == map_id]:
+            del self.cache[key]
+        entry = self.maps[map_id]
+        entry.solvers = {}
+        if entry.shared is not None:
+            self.retire(entry.shared)
+            entry.shared = None
+    def retire(self, shared):
+        name = shared.memory.name
+        if self.users.get(name):
+            self.retired[name] = shared
+        else:
+            self.users.pop(name, None)
+            shared.close()
+            shared.unlink()
+    def release(self, shared):
+        name = shared.memory.name
+        self.users[name] -= 1
+        if name in self.retired and not self.users[name]:
+            self.retire(self.retired.pop(name))
+    def cache_get(self, key):
+        res = self.cache.get(key)
+        if res is not None:
+            self.cache.move_to_end(key)
+        return res
+    def cache_put(self, key, res):
+        if self.cache_size <= 0:
+            return
+        self.cache[key] = res
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    async def query(self, map_id, start, end, algorithm="astar", moore=False):
+        """
+        return SearchResult of path from start to end on map, query with
+        start or end on a wall is not found, like in solve_pairs
+
+        Parameters
+        ----------
+        map_id : str
+            id of the map
+        start, end : tuple(int, int)
+            positions of start and end node
+        algorithm : str
+            name from registry.ALGORITHMS
+        moore : bool
+            True for eight directions, other values than booleans are rejected
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm}")
+        if type(moore) is not bool:
+            raise TypeError(f"moore has to be true or false, not {moore!r}")
+        entry = self.get_entry(map_id)
+        grid = entry.grid
+        start, end = check_node(grid, start), check_node(grid, end)
+        self.stats["queries"] += 1
+        if grid.cells[grid.index(*start)] == WALL or grid.cells[grid.index(*end)] == WALL:
+            return SearchResult(False, [], None, 0, 0)
+        key = (map_id, grid.version, algorithm, moore, start, end)
+        res = self.cache_get(key)
+        if res is not None:
+            self.stats["hits"] += 1
+            return res
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            # shield keeps one cancelled waiter from cancelling the others
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(self.solve(key, entry, algorithm, moore, start, end))
+        self.in_flight[key] = future
+        future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(future)
+    async def solve(self, key, entry, algorithm, moore, start, end):
+        loop = asyncio.get_running_loop()
+        self.stats["solved"] += 1
+        if self.kind == "thread":
+            solver = entry.solvers.get((algorithm, moore))
+            if solver is None:
+                grid = entry.grid
+                alg = ALGORITHMS[algorithm](grid.cols, grid.rows)
+                alg.grid.assign(grid.unmarked(), grid.costs)
+                alg.set_directions(moore)
+                solver = entry.solvers[(algorithm, moore)] = Solver(alg)
+            res = await loop.run_in_executor(self.executor, solver.search, start, end)
+        else:
+            if entry.shared is None:
+                entry.shared = SharedMap.from_grid(entry.grid)
+            shared = entry.shared
+            name = shared.memory.name
+            self.users[name] = self.users.get(name, 0) + 1
+            try:
+                res = await loop.run_in_executor(self.executor, solve_in_process, algorithm, moore,
+                                                 shared.cols, shared.rows, name, start, end)
+            finally:
+                self.release(shared)
+        # results of versions replaced during the search are not cached
+        if key[1] == entry.grid.version and self.maps.get(key[0]) is entry:
+            self.cache_put(key, res)
+        return res
+    async def request(self, message):
+        """answer one request of the protocol, errors are returned as {"error": str}"""
+        response = {"id": message.get("id")}
+        try:
+            op = message.get("op", "query")
+            if op == "query":
+                res = await self.query(message["map"], message["start"], message["end"],
+                                       message.get("algorithm", "astar"), message.get("moore", False))
+                response.update(found=res.found, path=res.path, cost=res.cost, expanded=res.expanded)
+            elif op == "walls":
+                response["version"] = self.set_cells(message["map"], message.get("walls", ()),
+                                                     message.get("free", ()), message.get("costs", ()))
+            elif op == "map":
+                grid = Grid(message["cols"], message["rows"])
+                cells = bytearray(grid.cols * grid.rows)
+                costs = bytearray(b"\x01") * (grid.cols * grid.rows)
+                for x, y in message.get("walls", ()):
+                    cells[grid.index(x, y)] = WALL
+                for x, y, cost in message.get("costs", ()):
+                    if not 1 <= cost <= MAX_COST:
+                        raise ValueError(f"cost {cost} outside of 1..{MAX_COST}")
+                    costs[grid.index(x, y)] = cost
+                grid.assign(cells, costs)
+                self.add_map(message["map"], grid)
+                response["version"] = grid.version
+            elif op == "stats":
+                response.update(self.stats, cached=len(self.cache), maps=len(self.maps))
+            else:
+                raise ValueError(f"unknown op {op}")
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            response["error"] = f"{type(e).__name__}: {e}"
+        return response
+    async def handle(self, reader, writer):
+        """answer requests of one connection, every request runs in its own task"""
+        tasks = set()
+        async def answer(line):
+            try:
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("request has to be an object")
+            except ValueError as e:
+                response = {"id": None, "error": f"ValueError: {e}"}
+            else:
+                response = await self.request(message)
+            writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+            await writer.drain()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # server is closing, a cancelled handler would be reported by asyncio streams of python 3.11
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+    async def serve(self, host=None, port=None, path=None):
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+    def close(self):
+        self.executor.shutdown()
+        for entry in self.maps.values():
+            if entry.shared is not None:
+                self.retire(entry.shared)
+                entry.shared = None
+        for name in list(self.retired):
+            shared = self.retired.pop(name)
+            shared.close()
+            shared.unlink()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+
+async def run(args):
+    with PathService(args.executor, args.workers, args.cache) as service:
+        for spec in args.map:
+            map_id, _, path = spec.partition("=")
+            service.load(map_id, path)
+        server = await service.serve(args.host, args.port, args.unix)
+        for sock in server.sockets:
+            print(f"listening on {sock.getsockname()}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="serve path queries as lines of JSON")
+    parser.add_argument("--map", action="append", default=[], help="map file served under id, as id=path")
+    parser.add_argument("--host", default="127.0.0.1", help="address of the TCP server")
+    parser.add_argument("--port", type=int, default=8765, help="port of the TCP server")
+    parser.add_argument("--unix", help="path of a Unix socket served instead of TCP")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="where searches run")
+    parser.add_argument("--workers", type=int, help="number of worker threads or processes")
+    parser.add_argument("--cache", type=int, default=CACHE_SIZE, help="number of cached results")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+opt-in counters and phase timings of searches
+
+Algorithm.enable_stats replaces methods of one algorithm instance
+with timed and counting wrappers, Algorithm.disable_stats removes
+them, so an algorithm without stats runs exactly the same code
+"""
+import time
+
+# phases timed by the wrappers
+PHASES = ["solve", "setup", "search", "path", "step", "neighbours"]
+
+
+class SearchStats:
+    """
+    A class holding counters and phase timings of searches
+
+    counters are summed over every search since the last reset,
+    in solve neighbours are counted through trace and frontier
+    operations are derived from the result and the numbers of entries
+    left on the frontier and of re-opened nodes passed to make_result,
+    so the search loops themselves are not changed, in next_step
+    pushes and pops are counted through push and pop methods of the
+    algorithm, entries skipped by pop as stale are not counted
+
+    Attributes
+    ----------
+    searches : int
+        number of finished searches
+    steps : int
+        number of next_step calls
+    expanded : int
+        number of expanded nodes
+    pushed : int
+        number of entries put on the frontier
+    popped : int
+        number of entries taken from the frontier
+    stale : int
+        number of popped entries skipped as already expanded
+    reopened : int
+        number of pushes of already reached nodes (with lower cost)
+    neighbours : int
+        number of neighbours of expanded nodes looked at
+    times : dict[str, float]
+        seconds spent in every phase, see PHASES
+
+    Methods
+    -------
+    reset( ) -> None
+        zero every counter and timing
+    add_time(phase : str, seconds : float) -> None
+        add seconds to timing of phase
+    as_dict( ) -> dict[str, Any]
+        return counters and timings as a dictionary
+    """
+    __slots__ = ("searches", "steps", "expanded", "pushed", "popped", "stale", "reopened", "neighbours", "times")
+    counters = ("searches", "steps", "expanded", "pushed", "popped", "stale", "reopened", "neighbours")
+    def __init__(self):
+        self.reset()
+    def reset(self):
+        for name in self.counters:
+            setattr(self, name, 0)
+        self.times = dict.fromkeys(PHASES, 0.0)
+    def add_time(self, phase, seconds):
+        self.times[phase] += seconds
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.counters}
+        data["times"] = dict(self.times)
+        return data
+    def __str__(self):
+        lines = [f"{name:>10} {getattr(self, name)}" for name in self.counters]
+        lines += [f"{phase:>10} {seconds * 1000:.3f} ms" for phase, seconds in self.times.items() if seconds]
+        return "\n".join(lines)
+
+def instrument(algorithm, stats, profiler=None):
+    """
+    install wrappers counting into stats on algorithm instance
+
+    timings of nested phases are included in the outer ones,
+    search is the part of solve spent outside setup and path,
+    solve is wrapped for algorithms with their own solve
+    (which base search calls), search for the others
+
+    Parameters
+    ----------
+    algorithm : Algorithm
+        algorithm to instrument, its class methods are not changed
+    stats : SearchStats
+        object the wrappers count into
+    profiler : object, optional
+        profiler with enable() and disable() methods, like cProfile.Profile,
+        enabled only for the time of every solve
+    """
+    uninstrument(algorithm)
+    cls = type(algorithm)
+    clock = time.perf_counter
+    inside = [False]
+    solve_times = [0.0]
+    def timed(name, phase):
+        method = getattr(cls, name).__get__(algorithm)
+        def wrapper(*args, **kwargs):
+            begin = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - begin
+                stats.times[phase] += elapsed
+                if inside[0] and phase in ("setup", "path"):
+                    solve_times[0] += elapsed
+        return wrapper
+    wrappers = {name: timed(name, "setup") for name in ["get_scratch", "get_map", "neighbour_table", "move_table"]}
+    wrappers["reconstruct_path"] = timed("reconstruct_path", "path")
+    make_result = timed("make_result", "path")
+    result_args = {}
+    def counted_make_result(parents, end, expanded, pushed, cost=None, frontier=None, reopened=None):
+        result_args["frontier"] = frontier
+        result_args["reopened"] = reopened
+        return make_result(parents, end, expanded, pushed, cost)
+    wrappers["make_result"] = counted_make_result
+    get_neighbours = timed("get_neighbours", "neighbours")
+    def counted_get_neighbours(node):
+        neighbours = get_neighbours(node)
+        if not inside[0]:
+            stats.neighbours += len(neighbours)
+        return neighbours
+    wrappers["get_neighbours"] = counted_get_neighbours
+    next_step = timed("next_step", "step")
+    def counted_next_step():
+        res = next_step()
+        if not inside[0]:
+            stats.steps += 1
+            if res is not True and res is not False:
+                stats.expanded += 1
+        return res
+    wrappers["next_step"] = counted_next_step
+    def counted(name, counter):
+        method = getattr(cls, name).__get__(algorithm)
+        def wrapper(*args):
+            if not inside[0]:
+                setattr(stats, counter, getattr(stats, counter) + 1)
+            return method(*args)
+        return wrapper
+    for name, counter in [("push", "pushed"), ("pop", "popped")]:
+        if hasattr(cls, name):
+            wrappers[name] = counted(name, counter)
+    def run(search, trace):
+        adjacency = algorithm.grid.get_adjacency()
+        masks, offsets = adjacency.masks, adjacency.offsets[algorithm.directions is algorithm.directions8]
+        cols = algorithm.cols
+        neighbours = [0]
+        def count(node):
+            neighbours[0] += len(offsets[masks[node[1] * cols + node[0]]])
+            if trace is not None:
+                trace(node)
+        result_args.clear()
+        inside[0] = True
+        solve_times[0] = 0.0
+        if profiler is not None:
+            profiler.enable()
+        begin = clock()
+        try:
+            res = search(count)
+        finally:
+            elapsed = clock() - begin
+            if profiler is not None:
+                profiler.disable()
+            inside[0] = False
+        stats.times["solve"] += elapsed
+        stats.times["search"] += elapsed - solve_times[0]
+        stats.searches += 1
+        stats.expanded += res.expanded
+        stats.neighbours += neighbours[0]
+        stats.pushed += res.pushed
+        frontier = result_args.get("frontier")
+        popped = res.expanded + res.found if frontier is None else res.pushed - frontier
+        stats.popped += popped
+        stats.stale += popped - res.expanded - res.found
+        stats.reopened += result_args.get("reopened") or 0
+        return res
+    def owner(name):
+        return next(base for base in cls.__mro__ if name in vars(base))
+    # search inherited from a class below the one with solve runs that solve
+    if owner("solve") is not owner("search") and issubclass(owner("solve"), owner("search")):
+        solve = cls.solve.__get__(algorithm)
+        def counted_solve(trace=None):
+            return run(solve, trace)
+        wrappers["solve"] = counted_solve
+    else:
+        search = cls.search.__get__(algorithm)
+        def counted_search(start, end, trace=None, state=None):
+            return run(lambda count: search(start, end, count, state), trace)
+        wrappers["search"] = counted_search
+    algorithm.__dict__.update(wrappers)
+    algorithm.stats = stats
+
+def uninstrument(algorithm):
+    """remove wrappers installed by instrument from algorithm instance"""
+    for name in ["get_scratch", "get_map", "neighbour_table", "move_table", "reconstruct_path", "make_result",
+                 "get_neighbours", "next_step", "push", "pop", "solve", "search", "stats"]:
+        algorithm.__dict__.pop(name, None)
@@ -0,0 +1,213 @@
+from algorithm import *
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Wavefront(Algorithm):
+    """
+    A class representing breadth first search expanding whole wavefront at once
+
+    frontier is kept as numpy array of cell indices into the grid padded
+    with one cell of walls, so neighbours of the whole frontier are frontier
+    plus shifts of the directions and no bounds checking is needed,
+    boolean mask of free not yet reached cells filters them,
+    every wave costs numpy operations on the frontier only
+
+    gives the same distances as Bfs, needs numpy
+
+    Attributes
+    ----------
+    free : numpy.ndarray
+        flat boolean mask of free cells not reached yet in the padded grid
+    dist : numpy.ndarray
+        flat int32 distances from start in the padded grid, -1 if not reached
+    parent : numpy.ndarray
+        flat int32 parent index in the padded grid, -1 if not reached
+    wave : numpy.ndarray
+        indices of cells reached by the last wave
+    pending : deque
+        cells of the last wave not yet returned by next_step
+
+    Methods
+    -------
+    reset( ) -> None
+        restores default values for internal data
+    next_step( ) -> (True,False, None)
+        return next cell of the current wave, computes new wave when needed
+    solve(trace=None) -> SearchResult
+        expand waves until end is reached without touching the grid
+    distances(source) -> numpy.ndarray
+        return (rows, cols) int32 array of distances from source
+    """
+    def __init__(self, cols, rows):
+        """
+        Parameters
+        ----------
+        cols : int
+            number of columns in the grid
+        rows : int
+            number of rows in the grid
+        """
+        if np is None:
+            raise ImportError("Wavefront needs numpy")
+        super().__init__(cols, rows)
+        self.wave = None
+        self.pending = deque()
+    def resize(self, cols, rows):
+        super().resize(cols, rows)
+        self.wave = None
+        self.pending = deque()
+    def pad(self, index):
+        """return index of cell in the padded grid"""
+        return (index // self.cols + 1) * (self.cols + 2) + index % self.cols + 1
+    def unpad(self, index):
+        """return index of cell of the padded grid in the grid"""
+        pc = self.cols + 2
+        return (index // pc - 1) * self.cols + index % pc - 1
+    def begin(self, source):
+        """
+        prepare masks for a search from source
+
+        wall mask is read straight from the grid buffer
+        """
+        rows, cols = self.rows, self.cols
+        cells = np.frombuffer(self.grid.cells, dtype=np.uint8).reshape(rows, cols)
+        free = np.zeros((rows + 2, cols + 2), dtype=bool)
+        free[1:-1, 1:-1] = cells != WALL
+        self.free = free.ravel()
+        size = self.free.size
+        self.dist = np.full(size, -1, dtype=np.int32)
+        self.parent = np.full(size, -1, dtype=np.int32)
+        self.offsets = np.array([b * (cols + 2) + a for a, b in self.directions], dtype=np.int64)
+        s = self.pad(source)
+        self.free[s] = False
+        self.dist[s] = 0
+        self.parent[s] = s
+        self.wave = np.array([s], dtype=np.int64)
+        self.depth = 0
+    def expand_wave(self):
+        """
+        reach all free cells next to the last wave
+
+        each new cell gets the first of its neighbours in the
+        wave as parent, return new wave (empty if nothing was reached)
+        """
+        wave = self.wave
+        k = len(self.offsets)
+        candidates = (wave[:, None] + self.offsets).ravel()
+        sources = np.repeat(wave, k)
+        keep = self.free[candidates]
+        candidates, first = np.unique(candidates[keep], return_index=True)
+        self.depth += 1
+        self.free[candidates] = False
+        self.dist[candidates] = self.depth
+        self.parent[candidates] = sources[keep][first]
+        self.wave = candidates
+        return candidates
+    def field(self, padded):
+        """return view of padded flat array as (rows, cols) array of the grid"""
+        return padded.reshape(self.rows + 2, self.cols + 2)[1:-1, 1:-1]
+    def distances(self, source):
+        """
+        return (rows, cols) int32 numpy array of distances from source
+        to every cell, -1 for cells which cannot be reached
+
+        Parameters
+        ----------
+        source : tuple(int, int)
+            position of the source node
+        """
+        self.begin(self.grid.index(*source))
+        while len(self.expand_wave()):
+            pass
+        return self.field(self.dist).copy()
+    def sweep(self, source):
+        """expand all waves from source and return DistanceField"""
+        dist = self.distances(source).ravel()
+        parent = self.field(self.parent).ravel()
+        reached = parent >= 0
+        pc = self.cols + 2
+        parent[reached] = (parent[reached] // pc - 1) * self.cols + parent[reached] % pc - 1
+        return DistanceField(self.cols, source, dist, parent)
+    def path_to(self, index):
+        """return cell indices of path from search source to index, empty if not reached"""
+        i = self.pad(index)
+        if self.dist[i] < 0:
+            return []
+        path = [i]
+        while self.parent[i] != i:
+            i = int(self.parent[i])
+            path.append(i)
+        path.reverse()
+        return [self.unpad(i) for i in path]
+    def reset(self):
+        self.reset_grid()
+        self.parents = dd()
+        self.end_found = False
+        self.pending = deque()
+        if self.start is not None:
+            self.begin(self.grid.index(*self.start))
+            self.push(int(self.wave[0]))
+    def push(self, index):
+        """put cell of the padded grid at the end of pending"""
+        self.pending.append(index)
+    def pop(self):
+        """remove and return first cell of pending"""
+        return self.pending.popleft()
+    def next_step(self):
+        """
+        return next cell of the current wave as a step of breadth first search
+
+        if cant find end return False
+        if found end in this step return True
+        else (x,y), color, content
+        """
+        if not self.pending:
+            if self.wave is None or not len(self.expand_wave()):
+                return False
+            for i in self.wave.tolist():
+                self.push(i)
+        u = self.unpad(self.pop())
+        node = (u % self.cols, u // self.cols)
+        code = self.grid.code(*node)
+        if code == END:
+            path = self.path_to(u)
+            cols = self.cols
+            for a, b in zip(path, path[1:]):
+                self.parents[(b % cols, b // cols)] = (a % cols, a // cols)
+            self.end_found = True
+            return True
+        if code == EMPTY:
+            self.grid.set_code(*node, VISITED)
+        return node, CELL_COLOR.get(self.cell(*node)), str(self.dist[self.pad(u)])
+    def solve(self, trace=None):
+        """
+        expand waves from start until one reaches end
+
+        Parameters
+        ----------
+        trace : callable, optional
+            called with every expanded node (x, y)
+        """
+        self.check_placed()
+        cols = self.cols
+        start = self.grid.index(*self.start)
+        end = self.grid.index(*self.end)
+        self.begin(start)
+        target = self.pad(end)
+        expanded = 0
+        pushed = 1
+        while self.dist[target] < 0:
+            expanded += len(self.wave)
+            if trace is not None:
+                for i in self.wave.tolist():
+                    i = self.unpad(i)
+                    trace((i % cols, i // cols))
+            pushed += len(self.expand_wave())
+            if not len(self.wave):
+                return SearchResult(False, [], None, expanded, pushed)
+        path = [(i % cols, i // cols) for i in self.path_to(end)]
+        return SearchResult(True, path, len(path) - 1, expanded, pushed)
+    def cell_content(self, x, y):
+        return self.cell(x, y)
@@ -0,0 +1,327 @@
+import os
+import random
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from greedy import Greedy
+from bfs import Bfs
+from dfs import Dfs
+from dijkstra import Dijkstra
+from jps import Jps
+from bidirectional import BiBfs, BiDijkstra, BiAstar
+from dstar import Dstar
+from wavefront import Wavefront, np
+from scratch import MAX_GENERATION
+from events import *
+
+
+def make(alg_class, cols, rows, start, end, walls=(), costs=()):
+    alg = alg_class(cols, rows)
+    alg.load_data({"start": start, "end": end, "walls": list(walls), "costs": list(costs)})
+    alg.reset()
+    return alg
+
+def random_data(cols, rows, density, seed):
+    rng = random.Random(seed)
+    walls = [(x, y) for y in range(rows) for x in range(cols) if rng.random() < density]
+    walls = [w for w in walls if w not in [(0, 0), (cols - 1, rows - 1)]]
+    return {"start": (0, 0), "end": (cols - 1, rows - 1), "walls": walls}
+
+def path_cost(alg, path):
+    return sum(alg.cost(a, b) for a, b in zip(path, path[1:]))
+
+def valid_path(alg, path):
+    if path[0] != alg.start or path[-1] != alg.end:
+        return False
+    for a, b in zip(path, path[1:]):
+        if b not in alg.get_neighbours(a):
+            return False
+    return True
+
+def run_steps(alg):
+    steps = 0
+    while True:
+        res = alg.next_step()
+        if res is True or res is False:
+            return res, steps
+        steps += 1
+
+
+class TestAstar(unittest.TestCase):
+    def test_finds_shortest_path_around_wall(self):
+        walls = [(2, y) for y in range(4)]
+        alg = make(Astar, 5, 5, (0, 0), (4, 0), walls)
+        res, _ = run_steps(alg)
+        self.assertTrue(res)
+        self.assertEqual(len(alg.reconstruct_path()), 12)
+    def test_step_returns_node_color_content(self):
+        alg = make(Astar, 5, 5, (0, 0), (4, 4))
+        node, color, content = alg.next_step()
+        self.assertEqual(node, (0, 0))
+        self.assertEqual(content, "0,80")
+    def test_stuck_returns_false(self):
+        alg = make(Astar, 5, 5, (0, 0), (4, 4), [(1, 0), (0, 1), (1, 1)])
+        res, steps = run_steps(alg)
+        self.assertFalse(res)
+        self.assertEqual(steps, 1)
+    def test_ties_break_on_h(self):
+        alg = make(Astar, 10, 1, (0, 0), (9, 0))
+        res, steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertEqual(steps, 9)
+
+class TestGreedy(unittest.TestCase):
+    def test_goes_straight_on_open_grid(self):
+        alg = make(Greedy, 10, 10, (0, 0), (9, 0))
+        res, steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertEqual(steps, 9)
+    def test_finds_path_around_wall(self):
+        walls = [(2, y) for y in range(4)]
+        alg = make(Greedy, 5, 5, (0, 0), (4, 0), walls)
+        res, _ = run_steps(alg)
+        self.assertTrue(res)
+        path = alg.reconstruct_path()
+        self.assertEqual(path[0], (4, 0))
+        self.assertNotIn((2, 0), path)
+    def test_node_opened_once(self):
+        alg = make(Greedy, 5, 5, (0, 0), (4, 4), [(4, 3), (3, 4), (3, 3)])
+        res, steps = run_steps(alg)
+        self.assertFalse(res)
+        self.assertEqual(steps, 21)
+
+class TestJps(unittest.TestCase):
+    def test_optimal_in_both_neighbourhoods(self):
+        for moore in [False, True]:
+            for seed in range(20):
+                data = random_data(20, 15, 0.3, seed)
+                reference = make(Bfs, 20, 15, **data)
+                reference.set_directions(moore)
+                alg = make(Jps, 20, 15, **data)
+                alg.set_directions(moore)
+                expected = reference.solve()
+                res = alg.solve()
+                self.assertEqual(res.cost, expected.cost)
+                if res.found:
+                    self.assertTrue(valid_path(alg, res.path))
+    def test_steps_expand_only_jump_points(self):
+        alg = make(Jps, 20, 15, (0, 0), (19, 14))
+        alg.set_directions(True)
+        res, steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertLess(steps, 5)
+        path = alg.reconstruct_path()
+        self.assertEqual(len(path), 19)
+        self.assertEqual(path[0], (19, 14))
+
+class TestBidirectional(unittest.TestCase):
+    def test_optimal_in_both_neighbourhoods(self):
+        for alg_class in [BiBfs, BiDijkstra, BiAstar]:
+            for moore in [False, True]:
+                for seed in range(10):
+                    data = random_data(20, 15, 0.3, seed)
+                    reference = make(Dijkstra if alg_class.weighted else Bfs, 20, 15, **data)
+                    reference.set_directions(moore)
+                    alg = make(alg_class, 20, 15, **data)
+                    alg.set_directions(moore)
+                    res = alg.solve()
+                    self.assertEqual(res.cost, reference.solve().cost)
+                    if res.found:
+                        self.assertTrue(valid_path(alg, res.path))
+    def test_steps_show_both_frontiers(self):
+        alg = make(BiBfs, 9, 1, (0, 0), (8, 0))
+        res, steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertEqual(alg.cell(1, 0), "visited")
+        self.assertEqual(alg.cell(7, 0), "visited")
+        path = alg.reconstruct_path()
+        self.assertEqual(path, [(x, 0) for x in range(8, 0, -1)])
+        self.assertLess(steps, 9)
+    def test_no_path(self):
+        alg = make(BiAstar, 5, 5, (0, 0), (4, 4), [(2, y) for y in range(5)])
+        res, _ = run_steps(alg)
+        self.assertFalse(res)
+    def test_search_keeps_steps_and_grid(self):
+        data = random_data(20, 15, 0.3, 3)
+        for alg_class in [BiBfs, BiDijkstra, BiAstar]:
+            alg = make(alg_class, 20, 15, **data)
+            for _ in range(5):
+                alg.next_step()
+            cells = bytes(alg.grid.cells)
+            dist = [dict(d) for d in alg.dist]
+            res = alg.search(alg.start, alg.end, state=alg.new_state())
+            self.assertEqual(bytes(alg.grid.cells), cells)
+            self.assertEqual(alg.dist, dist)
+            self.assertIsNone(alg.scratch)
+            self.assertTrue(run_steps(alg)[0])
+            self.assertEqual(alg.best, res.cost)
+            self.assertEqual(alg.search(alg.end, alg.start).cost, res.cost)
+            self.assertEqual(alg.search(alg.start, alg.start).path, [alg.start])
+
+class TestDstar(unittest.TestCase):
+    def test_replans_after_wall_changes(self):
+        rng = random.Random(4)
+        for moore in [False, True]:
+            data = random_data(20, 15, 0.25, 2)
+            reference = make(Dijkstra, 20, 15, **data)
+            alg = make(Dstar, 20, 15, **data)
+            for a in [reference, alg]:
+                a.set_directions(moore)
+            for _ in range(20):
+                res = alg.solve()
+                self.assertEqual(res.cost, reference.solve().cost)
+                if res.found:
+                    self.assertTrue(valid_path(alg, res.path))
+                x, y = rng.randrange(1, 19), rng.randrange(1, 14)
+                value = "empty" if alg.cell(x, y) == "wall" else "wall"
+                for a in [reference, alg]:
+                    a.update_cell(x, y, value)
+    def test_repair_expands_less_than_first_search(self):
+        alg = make(Dstar, 30, 30, (0, 0), (29, 29))
+        first = alg.solve()
+        alg.update_cell(29, 15, "wall")
+        second = alg.solve()
+        self.assertEqual(second.cost, first.cost)
+        self.assertLess(second.expanded, first.expanded // 4)
+    def test_steps_keep_state_between_resets(self):
+        alg = make(Dstar, 10, 10, (0, 0), (9, 9))
+        res, steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertEqual(len(alg.reconstruct_path()), 18)
+        alg.update_cell(5, 5, "wall")
+        alg.reset()
+        res, repair_steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertLess(repair_steps, steps)
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestWavefront(unittest.TestCase):
+    def test_same_distances_as_bfs(self):
+        for moore in [False, True]:
+            for seed in range(5):
+                data = random_data(25, 20, 0.3, seed)
+                reference = make(Bfs, 25, 20, **data)
+                alg = make(Wavefront, 25, 20, **data)
+                for a in [reference, alg]:
+                    a.set_directions(moore)
+                expected = reference.distance_field((0, 0))
+                self.assertEqual(alg.distances((0, 0)).ravel().tolist(), list(expected.dist))
+                res = alg.solve()
+                self.assertEqual(res.cost, reference.solve().cost)
+                if res.found:
+                    self.assertTrue(valid_path(alg, res.path))
+                    self.assertEqual(alg.distance_field((0, 0)).path_to(alg.end), res.path)
+    def test_steps(self):
+        alg = make(Wavefront, 10, 10, (0, 0), (9, 9), [(5, y) for y in range(9)])
+        res, steps = run_steps(alg)
+        self.assertTrue(res)
+        self.assertEqual(len(alg.reconstruct_path()), make(Bfs, 10, 10, **alg.get_data()).solve().cost)
+
+class TestSolve(unittest.TestCase):
+    ALGORITHMS = [Bfs, Dfs, Dijkstra, Astar, Greedy, Jps]
+    OPTIMAL = [Bfs, Jps]
+    WEIGHTED = [Dijkstra, Astar]
+    def test_paths_are_valid_and_optimal(self):
+        for seed in range(10):
+            data = random_data(15, 12, 0.3, seed)
+            reference = make(Bfs, 15, 12, **data).solve()
+            for alg_class in self.ALGORITHMS:
+                alg = make(alg_class, 15, 12, **data)
+                res = alg.solve()
+                self.assertEqual(res.found, reference.found)
+                if not res.found:
+                    self.assertEqual(res.path, [])
+                    continue
+                self.assertTrue(valid_path(alg, res.path))
+                if alg_class in self.WEIGHTED:
+                    self.assertEqual(res.cost, path_cost(alg, res.path))
+                    self.assertEqual(res.cost, 10 * reference.cost, alg_class.__name__)
+                else:
+                    self.assertEqual(res.cost, len(res.path) - 1)
+                if alg_class in self.OPTIMAL:
+                    self.assertEqual(res.cost, reference.cost, alg_class.__name__)
+    def test_weighted_terrain(self):
+        for seed in range(6):
+            rng = random.Random(seed)
+            data = random_data(15, 12, 0.2, seed)
+            costs = [(x, y, rng.randint(1, 9)) for y in range(12) for x in range(15)]
+            for moore in [False, True]:
+                reference = make(Dijkstra, 15, 12, costs=costs, **data)
+                alg = make(Astar, 15, 12, costs=costs, **data)
+                for a in [reference, alg]:
+                    a.set_directions(moore)
+                expected = reference.solve()
+                res = alg.solve()
+                self.assertEqual(res.cost, expected.cost)
+                if res.found:
+                    self.assertEqual(res.cost, path_cost(alg, res.path))
+                    self.assertLessEqual(res.expanded, expected.expanded)
+                alg.reset()
+                if run_steps(alg)[0]:
+                    self.assertEqual(alg.g[alg.end], expected.cost)
+                for alg_class in [BiDijkstra, BiAstar, Dstar]:
+                    alg = make(alg_class, 15, 12, costs=costs, **data)
+                    alg.set_directions(moore)
+                    res = alg.solve()
+                    self.assertEqual(res.cost, expected.cost, alg_class.__name__)
+                    if res.found:
+                        self.assertEqual(res.cost, path_cost(alg, res.path))
+                    alg.reset()
+                    if run_steps(alg)[0]:
+                        self.assertEqual(path_cost(alg, [alg.start] + alg.reconstruct_path()[::-1]), expected.cost)
+    def test_solve_does_not_touch_grid(self):
+        data = random_data(10, 10, 0.2, 1)
+        for alg_class in self.ALGORITHMS:
+            alg = make(alg_class, 10, 10, **data)
+            before = bytes(alg.grid.cells)
+            alg.solve()
+            self.assertEqual(bytes(alg.grid.cells), before)
+    def test_trace_sees_expanded_nodes(self):
+        alg = make(Astar, 10, 1, (0, 0), (9, 0))
+        traced = []
+        res = alg.solve(trace=traced.append)
+        self.assertEqual(traced, [(x, 0) for x in range(9)])
+        self.assertEqual(res.expanded, 9)
+    def test_repeated_searches_reuse_stamped_buffers(self):
+        data = random_data(15, 12, 0.3, 4)
+        for alg_class in self.ALGORITHMS:
+            alg = make(alg_class, 15, 12, **data)
+            expected = alg.solve()
+            scratch = alg.scratch
+            scratch.generation = MAX_GENERATION - 1
+            for _ in range(3):
+                self.assertEqual(alg.solve(), expected)
+            self.assertIs(alg.scratch, scratch)
+            self.assertEqual(scratch.generation, 2)
+            if alg_class is Jps:
+                continue
+            state = alg.step_state
+            first = run_steps(alg)
+            alg.reset()
+            self.assertEqual(run_steps(alg), first)
+            self.assertIs(alg.step_state, state)
+    def test_events_match_search(self):
+        data = random_data(15, 12, 0.3, 5)
+        for alg_class in self.ALGORITHMS:
+            alg = make(alg_class, 15, 12, **data)
+            expected = alg.solve()
+            events = list(alg.events())
+            kind, cell, value = events[-1]
+            self.assertEqual((kind, cell, value), (FOUND, 12 * 15 - 1, expected.cost) if expected.found
+                             else (EXHAUSTED, 12 * 15 - 1, expected.expanded))
+            if alg_class is Jps:
+                continue
+            self.assertEqual(sum(kind == EXPAND for kind, _, _ in events), expected.expanded)
+            self.assertEqual(run_events(alg.events(), 15), expected)
+            self.assertEqual(list(unbatched(batched(events, 7))), events)
+            if np is not None:
+                buffers = list(batched(events, 7, numpy=True))
+                self.assertEqual(buffers[0].shape, (7, 3))
+                self.assertEqual(list(unbatched(buffers)), events)
+    def test_solve_requires_start_and_end(self):
+        with self.assertRaises(ValueError):
+            Bfs(3, 3).solve()
+
+if __name__ == '__main__':
+    unittest.main()
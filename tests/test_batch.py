@@ -0,0 +1,121 @@
+import os
+import random
+import sys
+import threading
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from bfs import Bfs
+from dijkstra import Dijkstra
+from batch import *
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.alg = Astar(20, 15)
+        walls = [(x, y) for y in range(15) for x in range(20) if rng.random() < 0.25]
+        costs = [(x, y, rng.randint(1, 5)) for y in range(15) for x in range(20)]
+        self.alg.load_data({"start": (0, 0), "end": (19, 14), "walls": walls, "costs": costs})
+        self.reference = Dijkstra(20, 15)
+        self.reference.load_data(self.alg.get_data())
+        free = [(x, y) for y in range(15) for x in range(20) if (x, y) not in set(walls)]
+        self.pairs = [(rng.choice(free), rng.choice(free)) for _ in range(40)]
+    def expected(self):
+        return [r.cost for r in self.reference.solve_pairs(self.pairs)]
+    def test_solve_pairs_matches_single_solves(self):
+        costs = [r.cost for r in self.alg.solve_pairs(self.pairs)]
+        self.assertEqual(costs, self.expected())
+        self.assertEqual(self.alg.start, (0, 0))
+        self.assertEqual(self.alg.end, (19, 14))
+    def test_buffers_are_reused(self):
+        results = self.alg.solve_pairs(self.pairs)
+        next(results)
+        scratch = self.alg.scratch
+        list(results)
+        self.assertIs(self.alg.scratch, scratch)
+    def test_wall_endpoint_is_not_found(self):
+        wall = next(iter(self.alg.grid.walls()))
+        res, = self.alg.solve_pairs([((0, 0), wall)])
+        self.assertFalse(res.found)
+    def test_concurrent_searches(self):
+        results = [None, None]
+        def run(i, pairs):
+            state = self.alg.new_state()
+            results[i] = [self.alg.search(s, e, state=state).cost for s, e in pairs]
+        threads = [threading.Thread(target=run, args=(i, self.pairs[i::2])) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        expected = self.expected()
+        self.assertEqual(results, [expected[0::2], expected[1::2]])
+        self.assertEqual(self.alg.start, (0, 0))
+    def test_process_pool(self):
+        costs = [r.cost for r in solve_batch(self.alg, self.pairs, processes=2, chunksize=8)]
+        self.assertEqual(costs, self.expected())
+    def test_shared_map(self):
+        with SharedMap.from_grid(self.alg.grid) as shared:
+            alg = Astar(20, 15)
+            attach(alg, shared)
+            self.assertEqual(bytes(alg.grid.cells), bytes(self.alg.get_map().cells))
+            with self.assertRaises(TypeError):
+                alg.grid.cells[0] = WALL
+            self.assertEqual([r.cost for r in alg.solve_pairs(self.pairs)], self.expected())
+            del alg
+
+class TestDistanceField(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        walls = [(x, y) for y in range(15) for x in range(20) if rng.random() < 0.3]
+        walls = [w for w in walls if w != (0, 0)]
+        self.data = {"start": (0, 0), "end": (19, 14), "walls": walls}
+        self.targets = [(x, y) for y in range(15) for x in range(20)]
+    def test_matches_single_searches(self):
+        for alg_class in [Bfs, Dijkstra]:
+            alg = alg_class(20, 15)
+            alg.load_data(self.data)
+            expected = [r.cost for r in alg.solve_pairs(((0, 0), t) for t in self.targets)]
+            results = list(alg.solve_targets((0, 0), self.targets))
+            self.assertEqual([r.cost for r in results], expected)
+            for r in results:
+                if r.found:
+                    self.assertEqual(sum(alg.cost(a, b) for a, b in zip(r.path, r.path[1:]))
+                                     if alg_class is Dijkstra else len(r.path) - 1, r.cost)
+    def test_field_is_cached_until_walls_change(self):
+        alg = Bfs(20, 15)
+        alg.load_data(self.data)
+        field = alg.distance_field((0, 0))
+        self.assertIs(alg.distance_field((0, 0)), field)
+        alg.set_directions(True)
+        self.assertIsNot(alg.distance_field((0, 0)), field)
+        alg.set_directions(False)
+        self.assertIs(alg.distance_field((0, 0)), field)
+        alg.grid[14][0] = "wall" if alg.grid[14][0] == "empty" else "empty"
+        self.assertIsNot(alg.distance_field((0, 0)), field)
+        self.assertEqual(len(alg.fields), 1)
+    def test_wall_source(self):
+        alg = Bfs(20, 15)
+        alg.load_data(self.data)
+        wall = self.data["walls"][0]
+        with self.assertRaises(ValueError):
+            alg.distance_field(wall)
+        self.assertFalse(next(alg.solve_targets(wall, [(0, 0)])).found)
+    def test_outside_nodes(self):
+        alg = Bfs(20, 15)
+        alg.load_data(self.data)
+        field = alg.distance_field((0, 0))
+        for node in [(-1, 0), (20, 0), (0, 15), (19, -1)]:
+            with self.assertRaises(ValueError):
+                alg.distance_field(node)
+            with self.assertRaises(ValueError):
+                list(alg.solve_targets(node, [(0, 0)]))
+            with self.assertRaises(ValueError):
+                list(alg.solve_targets((0, 0), [node]))
+            with self.assertRaises(ValueError):
+                field.distance(node)
+            with self.assertRaises(ValueError):
+                field.path_to(node)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import random
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from grid import *
+from adjacency import DIRECTIONS
+from bfs import Bfs
+
+
+class TestGrid(unittest.TestCase):
+    def setUp(self):
+        self.grid = Grid(4, 3)
+    def test_new_grid_is_empty(self):
+        self.assertEqual(self.grid[2][3], "empty")
+        self.assertEqual(len(self.grid.cells), 12)
+    def test_row_view_writes_codes(self):
+        self.grid[1][2] = "wall"
+        self.assertEqual(self.grid.code(2, 1), WALL)
+        self.assertEqual(self.grid.cells[1 * 4 + 2], WALL)
+        self.assertEqual(self.grid[1][2], "wall")
+        self.assertEqual(list(self.grid[1]), ["empty", "empty", "wall", "empty"])
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.grid[3]
+        with self.assertRaises(IndexError):
+            self.grid[0][-1]
+        with self.assertRaises(IndexError):
+            self.grid.code(4, 0)
+    def test_unknown_name(self):
+        with self.assertRaises(KeyError):
+            self.grid[0][0] = "lava"
+    def test_clear_marks_keeps_walls_start_end(self):
+        for x, name in enumerate(["wall", "visited", "path", "start"]):
+            self.grid[0][x] = name
+        self.grid[1][0] = "end"
+        self.grid.clear_marks()
+        self.assertEqual(list(self.grid[0]), ["wall", "empty", "empty", "start"])
+        self.assertEqual(self.grid[1][0], "end")
+    def test_costs(self):
+        self.assertEqual(self.grid.cost(3, 2), 1)
+        version = self.grid.version
+        self.grid.set_cost(3, 2, 7)
+        self.grid.set_cost(3, 2, 7)
+        self.assertEqual(self.grid.cost(3, 2), 7)
+        self.assertEqual(self.grid.version, version + 1)
+        self.assertEqual(list(self.grid.weighted()), [(3, 2, 7)])
+        with self.assertRaises(ValueError):
+            self.grid.set_cost(0, 0, 0)
+    def test_walls(self):
+        self.grid[0][1] = "wall"
+        self.grid[2][3] = "wall"
+        self.assertEqual(list(self.grid.walls()), [(1, 0), (3, 2)])
+
+
+class TestAdjacency(unittest.TestCase):
+    def expected(self, grid):
+        masks = bytearray()
+        for y in range(grid.rows):
+            for x in range(grid.cols):
+                mask = 0
+                for k, (a, b) in enumerate(DIRECTIONS):
+                    if 0 <= x + a < grid.cols and 0 <= y + b < grid.rows and grid.code(x + a, y + b) != WALL:
+                        mask |= 1 << k
+                masks.append(mask)
+        return masks
+    def test_build_and_patch(self):
+        rng = random.Random(2)
+        for cols, rows in [(7, 5), (1, 4), (6, 1), (1, 1)]:
+            grid = Grid(cols, rows)
+            for _ in range(cols * rows // 3):
+                grid.set_code(rng.randrange(cols), rng.randrange(rows), WALL)
+            self.assertEqual(grid.get_adjacency().masks, self.expected(grid))
+            for _ in range(30):
+                x, y = rng.randrange(cols), rng.randrange(rows)
+                grid.set_code(x, y, EMPTY if grid.code(x, y) == WALL else WALL)
+                self.assertEqual(grid.adjacency.masks, self.expected(grid))
+
+class TestAlgorithmGrid(unittest.TestCase):
+    def setUp(self):
+        self.alg = Bfs(3, 3)
+    def test_get_neighbours_with_no_walls(self):
+        self.assertEqual(set([(0,1),(1,0)]), set(self.alg.get_neighbours((0,0))))
+        self.assertEqual(set([(0,1),(1,0),(2,1),(1,2)]), set(self.alg.get_neighbours((1,1))))
+    def test_get_neighbours_with_walls(self):
+        self.alg.grid[0][1] = "wall"
+        self.assertEqual(set([(0,1)]), set(self.alg.get_neighbours((0,0))))
+    def test_data_round_trip(self):
+        data = {"start": (0, 0), "end": (2, 2), "walls": [(1, 0), (1, 1)], "costs": [(2, 0, 3)]}
+        self.alg.load_data(data)
+        self.assertEqual(self.alg.get_data(), data)
+        self.assertEqual(self.alg.cell(2, 2), "end")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from dijkstra import Dijkstra
+from hpa import Hpa
+
+
+class TestHpa(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        walls = [(x, y) for y in range(30) for x in range(40) if rng.random() < 0.3]
+        walls = [w for w in walls if w not in [(0, 0), (39, 29)]]
+        self.data = {"start": (0, 0), "end": (39, 29), "walls": walls}
+        self.rng = rng
+    def make(self, alg_class, moore, **kwargs):
+        alg = alg_class(40, 30, **kwargs)
+        alg.load_data(self.data)
+        alg.set_directions(moore)
+        return alg
+    def check_path(self, alg, res, optimal, pair=None):
+        start, end = pair or (alg.start, alg.end)
+        self.assertEqual(res.found, optimal.found)
+        if res.found:
+            self.assertEqual(res.path[0], start)
+            self.assertEqual(res.path[-1], end)
+            for a, b in zip(res.path, res.path[1:]):
+                self.assertIn(b, alg.get_neighbours(a))
+            self.assertEqual(res.cost, sum(map(alg.cost, res.path, res.path[1:])))
+            self.assertGreaterEqual(res.cost, optimal.cost)
+    def test_paths_are_valid(self):
+        for moore in [False, True]:
+            reference = self.make(Dijkstra, moore)
+            alg = self.make(Hpa, moore, cluster_size=5)
+            pairs = [((0, 0), (39, 29))] + [((self.rng.randrange(40), self.rng.randrange(30)),
+                                             (self.rng.randrange(40), self.rng.randrange(30))) for _ in range(30)]
+            for res, optimal, pair in zip(alg.solve_pairs(pairs), reference.solve_pairs(pairs), pairs):
+                self.check_path(alg, res, optimal, pair)
+    def test_wall_toggle_rebuilds_only_touched_clusters(self):
+        for moore in [False, True]:
+            alg = self.make(Hpa, moore, cluster_size=5)
+            alg.solve()
+            self.assertEqual(len(alg.graph.rebuilt), 48)
+            for _ in range(20):
+                x, y = self.rng.randrange(1, 39), self.rng.randrange(1, 29)
+                alg.update_cell(x, y, "empty" if alg.cell(x, y) == "wall" else "wall")
+                res = alg.solve()
+                self.assertLessEqual(len(alg.graph.rebuilt), 9)
+                fresh = Hpa(40, 30, cluster_size=5)
+                fresh.load_data(alg.get_data())
+                fresh.set_directions(moore)
+                self.assertEqual(res, fresh.solve())
+    def test_steps_and_reconstruct_path(self):
+        alg = self.make(Hpa, True)
+        expected = alg.solve()
+        alg.reset()
+        while True:
+            res = alg.next_step()
+            if res is True or res is False:
+                break
+        self.assertEqual(res, expected.found)
+        self.assertEqual(alg.reconstruct_path()[::-1], expected.path[1:])
+
+if __name__ == '__main__':
+    unittest.main()
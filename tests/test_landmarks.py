@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from greedy import Greedy
+from dijkstra import Dijkstra
+from landmarks import *
+
+
+def make(alg_class, data, moore):
+    alg = alg_class(25, 20)
+    alg.load_data(data)
+    alg.set_directions(moore)
+    return alg
+
+def random_data(seed):
+    rng = random.Random(seed)
+    walls = [(x, y) for y in range(20) for x in range(25)
+             if rng.random() < 0.3 and (x, y) not in [(0, 0), (24, 19)]]
+    costs = [(x, y, rng.randint(1, 6)) for y in range(20) for x in range(25)]
+    return {"start": (0, 0), "end": (24, 19), "walls": walls, "costs": costs}
+
+
+class TestLandmarks(unittest.TestCase):
+    def test_astar_stays_optimal(self):
+        for seed in range(5):
+            data = random_data(seed)
+            for moore in [False, True]:
+                reference = make(Dijkstra, data, moore)
+                alg = make(Astar, data, moore)
+                plain = alg.solve()
+                alg.set_landmarks(build_landmarks(alg.grid, moore, 4))
+                pairs = [(data["start"], data["end"])] + [
+                    ((x, y), (24 - x, 19 - y)) for x, y in [(3, 4), (10, 2), (20, 15)]]
+                for res, expected in zip(alg.solve_pairs(pairs), reference.solve_pairs(pairs)):
+                    self.assertEqual(res.cost, expected.cost)
+                self.assertLessEqual(alg.solve().expanded, plain.expanded)
+                alg.reset()
+                while alg.next_step() not in (True, False):
+                    pass
+                if plain.found:
+                    self.assertEqual(alg.g[alg.end], plain.cost)
+    def test_bound_is_admissible(self):
+        data = random_data(7)
+        alg = make(Dijkstra, data, True)
+        landmarks = build_landmarks(alg.grid, True, 3)
+        self.assertEqual(len(landmarks.nodes), 3)
+        h = landmarks.heuristic(alg.grid.index(*data["end"]))
+        for u in range(0, 500, 7):
+            res = next(alg.solve_pairs([((u % 25, u // 25), data["end"])]))
+            if res.found:
+                self.assertLessEqual(h(u), res.cost)
+    def test_save_and_load(self):
+        data = random_data(2)
+        alg = make(Greedy, data, False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "map")
+            built = landmarks_for(alg, path, 3)
+            self.assertTrue(os.path.exists(landmarks_path(path)))
+            loaded = load_landmarks(landmarks_path(path), alg.grid, False)
+            self.assertEqual(loaded.nodes, built.nodes)
+            for a, b in zip(loaded.forward + loaded.backward, built.forward + built.backward):
+                self.assertEqual(a.tolist(), b.tolist())
+            self.assertIsNone(load_landmarks(landmarks_path(path), alg.grid, True))
+            alg.set_landmarks(loaded)
+            self.assertTrue(alg.solve().found)
+            alg.update_cell(12, 10, "empty" if alg.cell(12, 10) == "wall" else "wall")
+            self.assertIsNone(alg.landmark_heuristic(0))
+            self.assertIsNone(load_landmarks(landmarks_path(path), alg.grid, False))
+
+if __name__ == '__main__':
+    unittest.main()
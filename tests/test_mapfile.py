@@ -0,0 +1,104 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from bfs import Bfs
+from landmarks import build_landmarks
+from mapfile import *
+
+
+class TestMapFile(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(4)
+        walls = [(x, y) for y in range(12) for x in range(17)
+                 if rng.random() < 0.25 and (x, y) not in [(0, 0), (16, 11)]]
+        costs = [(x, y, rng.randint(2, 9)) for y in range(12) for x in range(17) if rng.random() < 0.2]
+        self.data = {"walls": walls, "costs": costs, "start": (0, 0), "end": (16, 11)}
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "map")
+    def tearDown(self):
+        self.directory.cleanup()
+    def test_data_round_trip(self):
+        write_data(self.path, 17, 12, self.data)
+        map_file = MapFile(self.path)
+        self.assertEqual((map_file.cols, map_file.rows), (17, 12))
+        self.assertEqual(map_file.data(), self.data)
+        map_file.close()
+    def test_load_map_with_landmarks(self):
+        alg = Astar(17, 12)
+        alg.load_data(self.data)
+        alg.set_directions(True)
+        expected = alg.solve()
+        alg.update_cell(3, 3, "visited" if alg.cell(3, 3) == "empty" else alg.cell(3, 3))
+        save_map(self.path, alg, [build_landmarks(alg.grid, True, 2), build_landmarks(alg.grid, False, 2)])
+        loaded = Astar(5, 5)
+        loaded.set_directions(True)
+        map_file = load_map(self.path, loaded)
+        self.assertEqual(loaded.get_data(), self.data)
+        self.assertTrue(loaded.landmarks.moore)
+        self.assertIsNotNone(loaded.landmark_heuristic(0))
+        self.assertEqual(loaded.solve().cost, expected.cost)
+        loaded.set_landmarks(None)
+        map_file.close()
+    def test_array_views_mapping(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("needs numpy")
+        alg = Bfs(17, 12)
+        alg.load_data(self.data)
+        save_map(self.path, alg)
+        map_file = MapFile(self.path)
+        cells = map_file.array(CELLS)
+        self.assertEqual(cells.shape, (12, 17))
+        self.assertFalse(cells.flags.owndata)
+        self.assertEqual(cells.tobytes(), bytes(alg.grid.cells))
+        self.assertEqual(map_file.array(COSTS).tobytes(), bytes(alg.grid.costs))
+        del cells
+        map_file.close()
+    def test_bad_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a map file at all, just some text")
+        with self.assertRaises(ValueError):
+            MapFile(self.path)
+        write_data(self.path, 17, 12, self.data)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 10)
+        with self.assertRaises(ValueError):
+            MapFile(self.path)
+        for size in [HEADER.size - 3, aligned(HEADER.size) + SECTION.size - 5]:
+            write_data(self.path, 17, 12, self.data)
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+            with self.assertRaisesRegex(ValueError, "truncated map file"):
+                MapFile(self.path)
+    def test_bad_cells_and_nodes(self):
+        write_data(self.path, 17, 12, self.data)
+        with open(self.path, "r+b") as f:
+            f.seek(aligned(HEADER.size) + SECTION.size + 5)
+            f.write(bytes([6]))
+        with self.assertRaisesRegex(ValueError, "cell codes"):
+            MapFile(self.path)
+        grid = Grid(17, 12)
+        grid.set_code(2, 3, WALL)
+        for start in [(2, 3), (17, 0), (0, -2)]:
+            write_grid(self.path, grid, start, (16, 11))
+            with self.assertRaises(ValueError):
+                MapFile(self.path)
+    def test_load_map_keeps_constructor_settings(self):
+        from hpa import Hpa
+        alg = Hpa(17, 12)
+        alg.load_data(self.data)
+        save_map(self.path, alg)
+        loaded = Hpa(5, 5, cluster_size=4)
+        map_file = load_map(self.path, loaded)
+        map_file.close()
+        self.assertEqual((loaded.cols, loaded.rows, loaded.cluster_size), (17, 12, 4))
+        self.assertEqual(loaded.graph.size, 4)
+        self.assertEqual(loaded.solve().found, alg.solve().found)
+
+if __name__ == '__main__':
+    unittest.main()
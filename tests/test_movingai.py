@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from bfs import Bfs
+from astar import Astar
+from movingai import *
+
+MAP = """type octile
+height 4
+width 6
+map
+......
+.@@@T.
+..S.W.
+G.....
+"""
+SCEN = """version 1
+0\tsmall.map\t6\t4\t0\t0\t5\t0\t5.00000000
+1\tsmall.map\t6\t4\t0\t0\t5\t3\t6.82842712
+1\tsmall.map\t6\t4\t0\t3\t3\t2\t3.41421356
+"""
+
+
+class TestMovingAi(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.map = os.path.join(self.directory.name, "small.map")
+        self.scen = self.map + ".scen"
+        with open(self.map, "w") as f:
+            f.write(MAP)
+        with open(self.scen, "w") as f:
+            f.write(SCEN)
+    def tearDown(self):
+        self.directory.cleanup()
+    def test_load_map(self):
+        alg = Bfs(2, 2)
+        alg.set_directions(True)
+        load_movingai_map(self.map, alg)
+        self.assertEqual((alg.cols, alg.rows), (6, 4))
+        self.assertEqual(sorted(alg.grid.walls()), [(1, 1), (2, 1), (3, 1), (4, 1), (4, 2)])
+        self.assertIs(alg.directions, alg.directions8)
+    def test_scenarios(self):
+        scenarios = list(read_scenarios(self.scen))
+        self.assertEqual(len(scenarios), 3)
+        self.assertEqual(scenarios[1], Scenario(1, "small.map", 6, 4, (0, 0), (5, 3), 6.82842712))
+        alg = Astar(1, 1)
+        alg.set_directions(True)
+        load_movingai_map(self.map, alg)
+        for s in scenarios:
+            res = next(alg.solve_pairs([(s.start, s.end)]))
+            self.assertAlmostEqual(octile_length(res.path), s.optimal, places=6)
+    def test_runner(self):
+        import scenarios
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            scenarios.main([self.scen, "--algorithm", "bfs"])
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertIn("3 queries, 3 found", lines[-1])
+
+if __name__ == '__main__':
+    unittest.main()
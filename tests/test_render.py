@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from bfs import Bfs
+try:
+    from render import Renderer
+except ImportError:
+    Renderer = None
+
+
+class FakeWidget:
+    def __init__(self):
+        self.scheduled = []
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+    def after_cancel(self, pending):
+        pass
+
+
+class RecordingRenderer(Renderer or object):
+    def __init__(self, cols, rows):
+        super().__init__(FakeWidget(), cols, rows)
+        self.painted = []
+    def paint(self, index, color, text):
+        self.painted.append((index, text))
+    def cell_at(self, event):
+        return event
+
+
+@unittest.skipIf(Renderer is None, "needs tkinter")
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        self.alg = Bfs(6, 4)
+        self.alg.load_data({"start": (0, 0), "end": (5, 3), "walls": [(2, 1), (2, 2)]})
+        self.renderer = RecordingRenderer(6, 4)
+    def test_renderer_without_paint_is_rejected(self):
+        class Incomplete(Renderer):
+            def cell_at(self, event):
+                return event
+        with self.assertRaises(TypeError):
+            Incomplete(FakeWidget(), 6, 4)
+    def test_sync_paints_only_changed_cells(self):
+        self.renderer.sync(self.alg.grid)
+        self.renderer.flush()
+        self.assertEqual(sorted(self.renderer.painted), [(0, "start"), (8, "wall"), (14, "wall"), (23, "end")])
+        self.renderer.painted.clear()
+        self.alg.grid.cells[7] = 2
+        self.renderer.sync(self.alg.grid)
+        self.renderer.sync(self.alg.grid)
+        self.renderer.flush()
+        self.assertEqual(self.renderer.painted, [(7, "visited")])
+    def test_changes_are_drawn_once_per_frame(self):
+        renderer = self.renderer
+        for x in range(6):
+            renderer.set_cell(x, 1, "#000000", "3,4")
+        renderer.set_cell(0, 1, "#ffffff")
+        self.assertEqual(len(renderer.widget.scheduled), 1)
+        self.assertEqual(renderer.painted, [])
+        renderer.widget.scheduled[0]()
+        self.assertEqual(len(renderer.painted), 6)
+        renderer.painted.clear()
+        renderer.sync(self.alg.grid)
+        renderer.flush()
+        self.assertEqual(sorted(renderer.painted),
+                         [(0, "start"), (6, ""), (7, ""), (8, "wall"), (9, ""), (10, ""), (11, ""), (14, "wall"), (23, "end")])
+
+if __name__ == '__main__':
+    unittest.main()
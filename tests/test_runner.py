@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from runner import StepRunner, WorkerRunner, ReplayRunner
+from events import Trace, record, EXPAND
+
+
+class FakeWidget:
+    """calls callbacks scheduled by after in order, like an event loop without waiting"""
+    def __init__(self):
+        self.scheduled = {}
+        self.count = 0
+    def after(self, ms, callback):
+        self.count += 1
+        self.scheduled[self.count] = callback
+        return self.count
+    def after_cancel(self, pending):
+        del self.scheduled[pending]
+    def run(self, ticks=None):
+        while self.scheduled and ticks != 0:
+            self.scheduled.pop(min(self.scheduled))()
+            ticks = None if ticks is None else ticks - 1
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        walls = [(x, y) for y in range(30) for x in range(40)
+                 if rng.random() < 0.25 and (x, y) not in [(0, 0), (39, 29)]]
+        self.alg = Astar(40, 30)
+        self.alg.load_data({"start": (0, 0), "end": (39, 29), "walls": walls})
+        self.alg.reset()
+        self.expected = []
+        while True:
+            res = self.alg.next_step()
+            if res is True or res is False:
+                break
+            self.expected.append(res[0])
+        self.end = res
+        self.alg.reset()
+        self.widget = FakeWidget()
+        self.steps = []
+        self.finished = []
+    def make(self, runner_class, **kwargs):
+        return runner_class(self.alg, self.widget, self.steps.extend, self.finished.append, **kwargs)
+    def test_batches_grow_and_match_steps(self):
+        runner = self.make(StepRunner, fps=1)
+        runner.start()
+        self.widget.run()
+        self.assertEqual([r[0] for r in self.steps], self.expected)
+        self.assertEqual(self.finished, [self.end])
+        self.assertGreater(runner.batch, 1)
+    def test_pause_resume_cancel(self):
+        runner = self.make(StepRunner)
+        runner.start()
+        self.widget.run(3)
+        runner.pause()
+        done = len(self.steps)
+        self.widget.run()
+        self.assertEqual(len(self.steps), done)
+        runner.resume()
+        self.widget.run(1)
+        self.assertGreater(len(self.steps), done)
+        runner.cancel()
+        self.assertEqual(self.finished, [None])
+        self.assertFalse(self.widget.scheduled)
+    def test_workers(self):
+        for worker in ["thread", "process"]:
+            with self.subTest(worker=worker):
+                self.alg.reset()
+                self.steps.clear()
+                self.finished.clear()
+                runner = self.make(WorkerRunner, worker=worker)
+                runner.start()
+                while runner.state != "finished":
+                    self.widget.run(1)
+                self.assertEqual([r[0] for r in self.steps], self.expected)
+                self.assertEqual(self.finished, [self.end])
+                if worker == "process":
+                    self.assertEqual(runner.path[0], (39, 29))
+                    self.assertEqual(self.alg.grid.code(*self.expected[-1]), 2)
+    def test_replay(self):
+        expected = self.alg.solve()
+        expanded = [(cell % 40, cell // 40) for kind, cell, _ in self.alg.events() if kind == EXPAND]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.trace")
+            record(self.alg, path, size=64)
+            trace = Trace(path)
+            self.assertEqual(trace.data(), self.alg.get_data())
+            runner = self.make(ReplayRunner, events=trace.events())
+            runner.start()
+            self.widget.run()
+            trace.close()
+        self.assertEqual([r[0] for r in self.steps], expanded[1:])
+        self.assertEqual(self.finished, [True])
+        self.assertEqual(runner.path[::-1], expected.path[1:])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from dijkstra import Dijkstra
+from grid import Grid, WALL
+from service import *
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.walls = [(x, y) for y in range(15) for x in range(20) if rng.random() < 0.25 and (x, y) != (0, 0)]
+        self.reference = Dijkstra(20, 15)
+        self.reference.load_data({"start": (0, 0), "end": (19, 14), "walls": self.walls})
+        free = [(x, y) for y in range(15) for x in range(20) if (x, y) not in set(self.walls)]
+        self.pairs = [(rng.choice(free), rng.choice(free)) for _ in range(20)]
+    def make_grid(self):
+        grid = Grid(20, 15)
+        for x, y in self.walls:
+            grid.set_code(x, y, WALL)
+        return grid
+    def expected(self, pairs):
+        return [r.cost for r in self.reference.solve_pairs(pairs)]
+    def test_queries_match_reference(self):
+        async def run():
+            with PathService(workers=2) as service:
+                service.add_map("m", self.make_grid())
+                results = await asyncio.gather(*(service.query("m", s, e, "dijkstra") for s, e in self.pairs))
+                return [r.cost for r in results]
+        self.assertEqual(asyncio.run(run()), self.expected(self.pairs))
+    def test_coalescing_and_cache(self):
+        s, e = self.pairs[0]
+        async def run():
+            with PathService(workers=2) as service:
+                service.add_map("m", self.make_grid())
+                first = await asyncio.gather(*(service.query("m", s, e) for _ in range(5)))
+                again = await service.query("m", s, e)
+                return service.stats, first, again
+        stats, first, again = asyncio.run(run())
+        self.assertEqual(stats, {"queries": 6, "hits": 1, "coalesced": 4, "solved": 1})
+        self.assertTrue(all(r is first[0] for r in first))
+        self.assertIs(again, first[0])
+    def test_wall_change_invalidates_cache(self):
+        async def run():
+            with PathService() as service:
+                service.add_map("open", Grid(20, 15))
+                service.add_map("m", self.make_grid())
+                before = await service.query("open", (0, 0), (19, 0), "bfs")
+                await service.query("m", *self.pairs[0], "bfs")
+                service.set_cells("open", walls=[before.path[5]])
+                cached = list(service.cache)
+                after = await service.query("open", (0, 0), (19, 0), "bfs")
+                return before, after, cached, service.stats
+        before, after, cached, stats = asyncio.run(run())
+        self.assertEqual([key[0] for key in cached], ["m"])
+        self.assertEqual(stats["solved"], 3)
+        self.assertEqual(before.cost, 19)
+        self.assertEqual(after.cost, 21)
+    def test_failed_update_changes_nothing(self):
+        async def run():
+            with PathService() as service:
+                service.add_map("open", Grid(20, 15))
+                before = await service.query("open", (0, 0), (4, 0), "bfs")
+                version = service.maps["open"].grid.version
+                for changes in [{"walls": [(2, 0), (99, 99)]}, {"walls": [(2, 0)], "costs": [(3, 0, 0)]},
+                                {"walls": [(2, 0)], "free": [(1.5, 0)]}]:
+                    with self.assertRaises((IndexError, ValueError, TypeError)):
+                        service.set_cells("open", **changes)
+                self.assertEqual(service.maps["open"].grid.version, version)
+                again = await service.query("open", (0, 0), (4, 0), "bfs")
+                service.set_cells("open", walls=[(2, 0)])
+                after = await service.query("open", (0, 0), (4, 0), "bfs")
+                return before, again, after
+        before, again, after = asyncio.run(run())
+        self.assertIs(again, before)
+        self.assertNotIn((2, 0), after.path)
+        self.assertEqual(after.cost, 6)
+    def test_process_executor(self):
+        async def run():
+            with PathService("process", workers=1) as service:
+                service.add_map("m", self.make_grid())
+                costs = [(await service.query("m", s, e, "dijkstra")).cost for s, e in self.pairs[:5]]
+                service.set_cells("m", free=self.walls)
+                free = await service.query("m", (0, 0), (19, 14), "dijkstra")
+                return costs, free
+        costs, free = asyncio.run(run())
+        self.assertEqual(costs, self.expected(self.pairs[:5]))
+        self.assertEqual(free.cost, 19 * 10 + 14 * 10)
+    def test_protocol(self):
+        async def run(path):
+            with PathService() as service:
+                server = await service.serve(path=path)
+                async with server:
+                    reader, writer = await asyncio.open_unix_connection(path)
+                    requests = [
+                        {"id": 1, "op": "map", "map": "m", "cols": 20, "rows": 15, "walls": self.walls},
+                        {"id": 2, "map": "m", "start": self.pairs[0][0], "end": self.pairs[0][1],
+                         "algorithm": "dijkstra"},
+                        {"id": 3, "map": "nope", "start": [0, 0], "end": [1, 1]},
+                        {"id": 4, "map": "m", "start": [0, 0], "end": [99, 1]},
+                        {"id": 7, "map": "m", "start": self.pairs[2][0], "end": self.pairs[2][1],
+                         "algorithm": "bidirectional dijkstra"},
+                        {"id": 5, "op": "walls", "map": "m", "walls": [self.pairs[1][0]]},
+                        {"id": 6, "map": "m", "start": [0, 0], "end": [1, 0], "moore": "false"},
+                    ]
+                    responses = {}
+                    for message in requests:
+                        writer.write(json.dumps(message).encode() + b"\n")
+                        await writer.drain()
+                        response = json.loads(await reader.readline())
+                        responses[response["id"]] = response
+                    writer.write(b"not json\n")
+                    responses["bad"] = json.loads(await reader.readline())
+                    writer.close()
+                    await writer.wait_closed()
+                    return responses
+        with tempfile.TemporaryDirectory() as directory:
+            responses = asyncio.run(run(os.path.join(directory, "paths.sock")))
+        self.assertEqual(responses[2]["cost"], self.expected(self.pairs[:1])[0])
+        self.assertEqual(responses[2]["path"][0], list(self.pairs[0][0]))
+        self.assertIn("unknown map", responses[3]["error"])
+        self.assertIn("IndexError", responses[4]["error"])
+        self.assertGreater(responses[5]["version"], responses[1]["version"])
+        self.assertIn("error", responses["bad"])
+        self.assertIn("moore", responses[6]["error"])
+        self.assertEqual(responses[7]["cost"], self.expected(self.pairs[2:3])[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
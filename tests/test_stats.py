@@ -0,0 +1,83 @@
+import cProfile
+import os
+import random
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+from astar import Astar
+from bfs import Bfs
+from dijkstra import Dijkstra
+from jps import Jps
+from stats import SearchStats
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        walls = [(x, y) for y in range(20) for x in range(30)
+                 if rng.random() < 0.25 and (x, y) not in [(0, 0), (29, 19)]]
+        costs = [(x, y, rng.randint(1, 6)) for y in range(20) for x in range(30)]
+        self.data = {"start": (0, 0), "end": (29, 19), "walls": walls, "costs": costs}
+    def make(self, alg_class):
+        alg = alg_class(30, 20)
+        alg.load_data(self.data)
+        alg.set_directions(True)
+        return alg
+    def test_solve_counters(self):
+        alg = self.make(Astar)
+        expected = alg.solve()
+        profiler = cProfile.Profile()
+        stats = alg.enable_stats(profiler)
+        res = alg.solve()
+        self.assertEqual(res, expected)
+        self.assertEqual(stats.searches, 1)
+        self.assertEqual((stats.expanded, stats.pushed), (res.expanded, res.pushed))
+        self.assertEqual(stats.popped, stats.expanded + stats.stale + 1)
+        scratch = alg.scratch
+        self.assertGreater(stats.reopened, 0)
+        self.assertEqual(stats.pushed - stats.reopened, scratch.seen.count(scratch.generation))
+        self.assertGreater(stats.neighbours, stats.expanded)
+        self.assertGreater(stats.times["solve"], 0)
+        self.assertLessEqual(stats.times["search"], stats.times["solve"])
+        self.assertTrue(profiler.getstats())
+    def test_own_solve(self):
+        alg = self.make(Jps)
+        expected = alg.solve()
+        profiler = cProfile.Profile()
+        stats = alg.enable_stats(profiler)
+        self.assertEqual(alg.search(alg.start, alg.end), expected)
+        self.assertEqual(alg.solve(), expected)
+        self.assertEqual(stats.searches, 2)
+        self.assertEqual(stats.expanded, 2 * expected.expanded)
+        self.assertGreater(stats.times["solve"], 0)
+        self.assertTrue(profiler.getstats())
+    def test_steps_and_disable(self):
+        alg = self.make(Bfs)
+        stats = alg.enable_stats()
+        alg.reset()
+        steps = 0
+        while alg.next_step() not in [True, False]:
+            steps += 1
+        self.assertEqual(stats.steps, steps + 1)
+        self.assertEqual(stats.expanded, steps)
+        self.assertGreater(stats.times["step"], 0)
+        self.assertGreater(stats.pushed, steps)
+        self.assertGreater(stats.popped, steps)
+        self.assertIs(alg.disable_stats(), stats)
+        self.assertIsNone(alg.stats)
+        self.assertNotIn("next_step", vars(alg))
+        alg.solve()
+        self.assertEqual(stats.searches, 0)
+        stats.reset()
+        self.assertEqual(stats.as_dict()["steps"], 0)
+    def test_step_frontier(self):
+        alg = self.make(Dijkstra)
+        stats = alg.enable_stats()
+        alg.reset()
+        while alg.next_step() not in [True, False]:
+            pass
+        self.assertEqual(stats.pushed - stats.popped, len(alg.heap_queue))
+        self.assertGreater(stats.popped, stats.expanded)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks"))
+from suite import *
+
+
+class TestSuite(unittest.TestCase):
+    def record(self, **changes):
+        record = {"map": "open", "cols": 8, "rows": 6, "moore": False, "seed": 0, "algorithm": "bfs",
+                  "seconds": 0.5, "expanded": 20, "cost": 9}
+        record.update(changes)
+        return record
+    def test_compare(self):
+        baseline = [self.record(), self.record(algorithm="astar", cost=90)]
+        self.assertEqual(compare([self.record(seconds=0.55)], baseline), [])
+        problems = compare([self.record(seconds=1.0, expanded=21), self.record(algorithm="dfs")], baseline)
+        self.assertEqual(len(problems), 2)
+        self.assertIn("0.5000 s -> 1.0000 s", problems[0])
+        self.assertIn("expanded 20 -> 21", problems[1])
+    def test_regression_exit_code(self):
+        argv = ["--sizes", "8x6", "--maps", "open", "--algorithms", "bfs,astar", "--max-steps", "10"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(argv + ["--output", path])
+                main(argv + ["--baseline", path])
+                with open(path) as f:
+                    data = json.load(f)
+                self.assertEqual({r["algorithm"] for r in data["results"]}, {"bfs", "astar"})
+                self.assertTrue(all(r["optimal"] for r in data["results"]))
+                data["results"][0]["expanded"] += 1
+                with open(path, "w") as f:
+                    json.dump(data, f)
+                with self.assertRaises(SystemExit) as exit:
+                    main(argv + ["--baseline", path])
+        self.assertEqual(exit.exception.code, 1)
+    def test_maps_are_seeded(self):
+        for kind in KINDS:
+            cells, start, end = make_map(kind, 21, 15, 3)
+            self.assertEqual(make_map(kind, 21, 15, 3), (cells, start, end))
+            self.assertEqual(cells[start[1] * 21 + start[0]], EMPTY)
+            self.assertEqual(cells[end[1] * 21 + end[0]], EMPTY)
+
+if __name__ == '__main__':
+    unittest.main()